@@ -12,6 +12,7 @@ from celery import task
 from django_statsd.clients import statsd
 from signing_clients.apps import JarExtractor
 
+from lib.crypto.util import get_signing_session
 from mkt.versions.models import Version
 from mkt.site.storage_utils import (copy_stored_file, local_storage,
                                     private_storage, public_storage)
@@ -69,9 +70,9 @@ def _sign_app(src, dest, ids, reviewer, tempname, local=False):
     log.info('Calling service: %s' % active_endpoint)
     try:
         with statsd.timer('services.sign.app'):
-            response = requests.post(active_endpoint, timeout=timeout,
-                                     files={'file': ('zigbert.sf',
-                                                     str(jar.signatures))})
+            response = get_signing_session().post(
+                active_endpoint, timeout=timeout,
+                files={'file': ('zigbert.sf', str(jar.signatures))})
     except requests.exceptions.HTTPError, error:
         # Will occur when a 3xx or greater code is returned.
         log.error('Posting to app signing failed: %s, %s' % (
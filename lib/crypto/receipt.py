@@ -1,4 +1,5 @@
 import json
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
 from django_statsd.clients import statsd
@@ -7,6 +8,8 @@ import commonware.log
 import jwt
 import requests
 
+from lib.crypto.util import get_signing_session
+
 
 log = commonware.log.getLogger('z.crypto')
 
@@ -36,8 +39,9 @@ def sign(receipt):
 
     try:
         with statsd.timer('services.sign.receipt'):
-            req = requests.post(destination, data=data, headers=headers,
-                                timeout=timeout)
+            req = get_signing_session().post(destination, data=data,
+                                             headers=headers,
+                                             timeout=timeout)
     except requests.Timeout:
         statsd.incr('services.sign.receipt.timeout')
         log.error('Posting to receipt signing timed out')
@@ -57,6 +61,22 @@ def sign(receipt):
     return json.loads(req.content)['receipt']
 
 
+def sign_many(receipts):
+    """
+    Send the receipts to the signing service, concurrently over the pooled
+    connections of the signing session. Returns the signed receipts in the
+    same order, or raises SigningError if any of them could not be signed.
+    """
+    if len(receipts) < 2:
+        return map(sign, receipts)
+
+    pool = ThreadPool(min(len(receipts), settings.SIGNING_SERVER_POOL_SIZE))
+    try:
+        return pool.map(sign, receipts)
+    finally:
+        pool.close()
+
+
 def decode(receipt):
     """
     Decode and verify that the receipt is sound from a crypto point of view.
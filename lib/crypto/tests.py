@@ -11,7 +11,8 @@ from requests import Timeout
 
 import mkt.site.tests
 from lib.crypto import packaged
-from lib.crypto.receipt import crack, sign, SigningError
+from lib.crypto.receipt import crack, sign, sign_many, SigningError
+from lib.crypto.util import get_signing_session
 from mkt.site.storage_utils import copy_stored_file
 from mkt.site.fixtures import fixture
 from mkt.site.storage_utils import (local_storage, public_storage,
@@ -40,7 +41,7 @@ def mock_sign(version_id, reviewer=False):
     return path
 
 
-@mock.patch('lib.crypto.receipt.requests.post')
+@mock.patch('requests.Session.post')
 @mock.patch.object(settings, 'SIGNING_SERVER', 'http://localhost')
 class TestReceipt(mkt.site.tests.TestCase):
 
@@ -77,6 +78,24 @@ class TestReceipt(mkt.site.tests.TestCase):
         req.return_value = self.get_response(206)
         sign('x')
 
+    def test_session(self, req):
+        session = get_signing_session()
+        eq_(get_signing_session(), session)
+        adapter = session.get_adapter('https://localhost')
+        eq_(adapter._pool_maxsize, settings.SIGNING_SERVER_POOL_SIZE)
+        eq_(adapter.max_retries.total, settings.SIGNING_SERVER_RETRIES)
+
+    def test_sign_many(self, req):
+        req.side_effect = lambda url, data, **kw: mock.Mock(
+            status_code=200, content=json.dumps({'receipt': data + '-signed'}))
+        eq_(sign_many(['a', 'b', 'c']), ['a-signed', 'b-signed', 'c-signed'])
+        eq_(req.call_count, 3)
+
+    @raises(SigningError)
+    def test_sign_many_error(self, req):
+        req.side_effect = [self.get_response(200), self.get_response(403)]
+        sign_many(['a', 'b'])
+
 
 class TestCrack(mkt.site.tests.TestCase):
 
@@ -196,7 +215,7 @@ class TestPackaged(PackagedApp, mkt.site.tests.TestCase):
             'Unexpected endpoint returned.')
 
     @mock.patch.object(packaged, '_get_endpoint', lambda _: '/fake/url/')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_inject_ids(self, post):
         post().status_code = 200
         post().content = '{"zigbert.rsa": ""}'
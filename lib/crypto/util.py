@@ -1,7 +1,18 @@
 import os
+import threading
 
+from django.conf import settings
 
-__all__ = ['generate_key']
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+
+__all__ = ['generate_key', 'get_signing_session']
+
+
+_signing_session = None
+_signing_session_lock = threading.Lock()
 
 
 def generate_key(byte_length):
@@ -17,3 +28,30 @@ def generate_key(byte_length):
         raise ValueError('um, %s is probably not long enough for cryptography'
                          % byte_length)
     return os.urandom(byte_length).encode('hex')
+
+
+def get_signing_session():
+    """Return the HTTP session shared by the signing clients.
+
+    The session keeps up to settings.SIGNING_SERVER_POOL_SIZE connections per
+    signing server alive, so that signing requests don't pay for a new TCP
+    and TLS handshake each time. Failing connections and 502, 503 and 504
+    responses are retried settings.SIGNING_SERVER_RETRIES times, waiting
+    settings.SIGNING_SERVER_BACKOFF seconds, then twice as long each time.
+    Read timeouts are not retried.
+    """
+    global _signing_session
+    with _signing_session_lock:
+        if _signing_session is None:
+            retries = Retry(total=settings.SIGNING_SERVER_RETRIES, read=0,
+                            backoff_factor=settings.SIGNING_SERVER_BACKOFF,
+                            status_forcelist=(502, 503, 504),
+                            method_whitelist=frozenset(['POST']))
+            adapter = HTTPAdapter(
+                pool_maxsize=settings.SIGNING_SERVER_POOL_SIZE,
+                max_retries=retries)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _signing_session = session
+    return _signing_session
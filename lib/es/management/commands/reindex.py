@@ -69,6 +69,14 @@ def _print(msg, alias=''):
     sys.stdout.write(msg)
 
 
+def _wait_for_reindexing_state(minimum=0):
+    """
+    Sleep long enough for every process to notice that a reindexing was
+    flagged or unflagged, see lib.es.models.ReindexingState.
+    """
+    time.sleep(max(minimum, settings.ES_REINDEXING_CHECK_INTERVAL))
+
+
 @task
 def pre_index(new_index, old_index, alias, index_name, settings):
     """
@@ -83,7 +91,9 @@ def pre_index(new_index, old_index, alias, index_name, settings):
     _print('Flagging the database to start the reindexation.', alias)
     Reindexing.flag_reindexing(new_index=new_index, old_index=old_index,
                                alias=alias)
-    time.sleep(5)  # Give the celery worker some time to flag the DB.
+    # Give the celery worker some time to flag the DB, and every process the
+    # time to notice it and start writing to both indices.
+    _wait_for_reindexing_state(minimum=5)
 
     _print('Creating the mapping for index {index}.'.format(index=new_index),
            alias)
@@ -138,6 +148,9 @@ def post_index(new_index, old_index, alias, index_name, settings):
 
     _print('Unflagging the database.', alias)
     Reindexing.unflag_reindexing(alias=alias)
+    # Give every process the time to stop writing to the old index, or it
+    # would get created again right after we remove it.
+    _wait_for_reindexing_state()
 
     _print('Removing index {index}.'.format(index=old_index), alias)
     if old_index and ES.indices.exists(index=old_index):
@@ -1,7 +1,18 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 
+REINDEXING_VERSION_KEY = 'es:reindexing:version'
+
+
 class Reindexing(models.Model):
     """Used to flag when an elasticsearch reindexing is occuring."""
     start_date = models.DateTimeField(default=timezone.now)
@@ -40,10 +51,75 @@ class Reindexing(models.Model):
         Return the indices associated with an alias.
         If we are reindexing, there should be two indices returned.
         """
-        try:
-            reindex = cls.objects.get(alias=alias)
-            # Yes. Let's reindex on both indexes.
-            return [idx for idx in reindex.new_index, reindex.old_index
-                    if idx is not None]
-        except Reindexing.DoesNotExist:
-            return [alias]
+        return list(reindexing_state.indices().get(alias, [alias]))
+
+
+class ReindexingState(object):
+    """
+    A process-wide copy of the indices of every alias being reindexed, so
+    that indexing doesn't query the database on every write.
+
+    Flagging or unflagging a reindexing bumps a version shared through the
+    cache. Every process checks that version at most every
+    ES_REINDEXING_CHECK_INTERVAL seconds and reloads the reindexing table
+    when it changed, or when its copy is older than ES_REINDEXING_TIMEOUT.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop the local copy so the next lookup reloads it."""
+        self.version = None
+        self.checked = 0
+        self.loaded = 0
+        self._indices = {}
+
+    def invalidate(self):
+        """Bump the shared version and drop the local copy."""
+        cache.set(REINDEXING_VERSION_KEY, uuid.uuid4().hex, None)
+        self.reset()
+
+    def current_version(self):
+        version = cache.get(REINDEXING_VERSION_KEY)
+        if version is None:
+            cache.add(REINDEXING_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(REINDEXING_VERSION_KEY)
+        return version
+
+    def load(self):
+        # Read from the master: a lagging replica could miss a flagging
+        # we've just been told about, and we'd keep that until the timeout.
+        return dict((r.alias, [idx for idx in r.new_index, r.old_index
+                               if idx is not None])
+                    for r in Reindexing.objects.using('default'))
+
+    def indices(self):
+        """
+        Returns a dict of the indices to write to, keyed by the aliases being
+        reindexed, reloading it if it is stale.
+        """
+        now = time.time()
+        with self.lock:
+            if (self.version is None or now - self.checked >=
+                    settings.ES_REINDEXING_CHECK_INTERVAL):
+                version = self.current_version()
+                if (version != self.version or now - self.loaded >=
+                        settings.ES_REINDEXING_TIMEOUT):
+                    self._indices = self.load()
+                    self.version = version
+                    self.loaded = now
+                self.checked = now
+            return self._indices
+
+
+reindexing_state = ReindexingState()
+
+
+@receiver(post_save, sender=Reindexing,
+          dispatch_uid='reindexing_invalidate_save')
+@receiver(post_delete, sender=Reindexing,
+          dispatch_uid='reindexing_invalidate_delete')
+def invalidate_reindexing_state(sender, **kw):
+    reindexing_state.invalidate()
@@ -1,11 +1,19 @@
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+import mock
 from nose.tools import eq_
 
 import mkt.site.tests
-from lib.es.models import Reindexing
+from lib.es.models import (REINDEXING_VERSION_KEY, Reindexing,
+                           reindexing_state)
 
 
 class TestReindexing(mkt.site.tests.TestCase):
 
+    def setUp(self):
+        reindexing_state.reset()
+
     def test_flag_reindexing(self):
         assert Reindexing.objects.count() == 0
 
@@ -61,3 +69,34 @@ class TestReindexing(mkt.site.tests.TestCase):
 
         # Doesn't clash on other aliases.
         self.assertSetEqual(Reindexing.get_indices('other'), ['other'])
+
+    def test_get_indices_flag_unflag(self):
+        eq_(Reindexing.get_indices('foo'), ['foo'])
+        Reindexing.flag_reindexing('foo', 'bar', 'baz')
+        self.assertSetEqual(Reindexing.get_indices('foo'), ['bar', 'baz'])
+        Reindexing.unflag_reindexing(alias='foo')
+        eq_(Reindexing.get_indices('foo'), ['foo'])
+
+    def test_get_indices_from_master(self):
+        with mock.patch.object(Reindexing.objects, 'using',
+                               wraps=Reindexing.objects.using) as using:
+            eq_(Reindexing.get_indices('foo'), ['foo'])
+        using.assert_called_with('default')
+
+    @override_settings(ES_REINDEXING_CHECK_INTERVAL=60)
+    def test_get_indices_cached(self):
+        eq_(Reindexing.get_indices('foo'), ['foo'])
+        with self.assertNumQueries(0):
+            eq_(Reindexing.get_indices('foo'), ['foo'])
+
+    @override_settings(ES_REINDEXING_CHECK_INTERVAL=60)
+    def test_get_indices_other_process(self):
+        eq_(Reindexing.get_indices('foo'), ['foo'])
+        # Another process flags the reindexing: the row is created without
+        # touching our copy, only the shared version changes.
+        Reindexing.objects.bulk_create([
+            Reindexing(alias='foo', new_index='bar', old_index='baz')])
+        eq_(Reindexing.get_indices('foo'), ['foo'])
+        cache.set(REINDEXING_VERSION_KEY, 'other')
+        reindexing_state.checked = 0
+        self.assertSetEqual(Reindexing.get_indices('foo'), ['bar', 'baz'])
@@ -1,4 +1,11 @@
+import csv
 import logging
+import mmap
+import os
+import socket
+import struct
+import threading
+from collections import OrderedDict
 
 import requests
 from django_statsd.clients import statsd
@@ -7,6 +14,15 @@ from mkt import regions
 
 log = logging.getLogger('z.geoip')
 
+# Records of the local database: first IP and last IP of the range as
+# unsigned 32 bits integers, followed by the 2 letters country code.
+RECORD = struct.Struct('>II2s')
+START = struct.Struct('>I')
+
+# Local databases, by path, shared by all the GeoIP instances of the process.
+_databases = {}
+_databases_lock = threading.Lock()
+
 
 def is_public(ip):
     parts = map(int, ip.split('.'))
@@ -25,24 +41,192 @@ def is_public(ip):
     return True
 
 
+def ip_to_int(ip):
+    """Convert a dotted IPv4 address to an integer, or None if invalid."""
+    try:
+        return START.unpack(socket.inet_aton(ip))[0]
+    except (socket.error, TypeError):
+        return None
+
+
+def build_database(ranges, path):
+    """Write the local database used by LocalDatabase to `path`.
+
+    `ranges` is an iterable of (first IP, last IP, country code) tuples, IPs
+    being either dotted IPv4 addresses or integers. Ranges must not overlap.
+
+    """
+    records = []
+    for first, last, country_code in ranges:
+        if not isinstance(first, (int, long)):
+            first = ip_to_int(first)
+        if not isinstance(last, (int, long)):
+            last = ip_to_int(last)
+        if first is None or last is None or len(country_code) != 2:
+            continue
+        records.append((first, last, country_code.lower()))
+    records.sort()
+
+    # Write to a temporary file first so that processes currently using the
+    # database never see a half-written file.
+    tmp_path = '%s.tmp' % path
+    with open(tmp_path, 'wb') as f:
+        for record in records:
+            f.write(RECORD.pack(*record))
+    os.rename(tmp_path, path)
+    return len(records)
+
+
+def build_database_from_csv(csv_path, path):
+    """Build the local database from a "first IP,last IP,country code" CSV.
+
+    Rows that can't be parsed, like headers, are ignored.
+
+    """
+    with open(csv_path, 'rb') as f:
+        return build_database(
+            (row[0], row[1], row[2]) for row in csv.reader(f)
+            if len(row) >= 3)
+
+
+class LocalDatabase(object):
+    """IP ranges to country codes table, built by `build_database`.
+
+    The file is memory-mapped read-only so that all the processes on a server
+    share the same pages, and looked up with a binary search.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.count = size // RECORD.size
+            self.data = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                         if self.count else '')
+
+    def lookup(self, address):
+        """Return the country code for `address`, or None if not found."""
+        ip = ip_to_int(address)
+        if ip is None:
+            return None
+
+        # Find the last range starting before or at the address.
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if START.unpack_from(self.data, middle * RECORD.size)[0] <= ip:
+                low = middle + 1
+            else:
+                high = middle
+        if not low:
+            return None
+
+        first, last, country_code = RECORD.unpack_from(
+            self.data, (low - 1) * RECORD.size)
+        if ip <= last:
+            return country_code
+        return None
+
+
+def get_local_database(path):
+    """Return the LocalDatabase for `path`, or None if there isn't one."""
+    if not path:
+        return None
+    with _databases_lock:
+        if path not in _databases:
+            try:
+                _databases[path] = LocalDatabase(path)
+            except (IOError, OSError, ValueError) as e:
+                log.error('Could not load GeoIP database {0}: {1}'
+                          .format(path, e))
+                _databases[path] = None
+        return _databases[path]
+
+
+class LRUCache(object):
+    """A small thread-safe least recently used cache."""
+
+    def __init__(self, size):
+        self.size = size
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                return None
+            self.data[key] = value
+            return value
+
+    def set(self, key, value):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            if len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+
 class GeoIP:
-    """Call to geodude server to resolve an IP to Geo Info block."""
+    """Resolve an IP to a country code.
+
+    Uses the local database at settings.GEOIP_DB_PATH if there is one, and
+    calls the geodude server otherwise.
+
+    """
 
     def __init__(self, settings):
         self.timeout = float(getattr(settings, 'GEOIP_DEFAULT_TIMEOUT', .2))
         self.url = getattr(settings, 'GEOIP_URL', '')
         self.default_val = getattr(settings, 'GEOIP_DEFAULT_VAL',
                                    regions.RESTOFWORLD.slug).lower()
+        self.db = get_local_database(getattr(settings, 'GEOIP_DB_PATH', ''))
+        self.recent = LRUCache(int(getattr(settings, 'GEOIP_CACHE_SIZE', 0)))
+
+    def lookup_local(self, address):
+        """Resolve an IP address without making any network call.
+
+        Only the recent lookups and the local database are checked. Returns
+        None if neither knows the address.
+
+        """
+        if not is_public(address):
+            return None
+        country_code = self.recent.get(address)
+        if country_code:
+            statsd.incr('z.geoip.cache_hit')
+            return country_code
+        if self.db:
+            with statsd.timer('z.geoip.local'):
+                country_code = self.db.lookup(address)
+            if country_code:
+                statsd.incr('z.geoip.success')
+                self.recent.set(address, country_code)
+                return country_code
+            statsd.incr('z.geoip.not_found')
+        return None
 
     def lookup(self, address):
         """Resolve an IP address to a block of geo information.
 
-        If a given address is unresolvable or the geoip server is not defined,
-        return the default as defined by the settings, or "restofworld".
+        If a given address is unresolvable or neither the local database nor
+        the geoip server are defined, return the default as defined by the
+        settings, or "restofworld".
 
         """
         public_ip = is_public(address)
-        if self.url and public_ip:
+        if public_ip:
+            country_code = self.lookup_local(address)
+            if country_code:
+                return country_code
+
+        if self.db and public_ip:
+            log.info('GeoIP database has no entry for: {0}'.format(address))
+        elif self.url and public_ip:
             with statsd.timer('z.geoip'):
                 res = None
                 try:
@@ -62,6 +246,7 @@ class GeoIP:
                         'country_code', self.default_val).lower()
                     log.info(('Geodude lookup for {0} returned {1}'
                               .format(address, country_code)))
+                    self.recent.set(address, country_code)
                     return country_code
                     log.info('Geodude lookup returned non-200 response: {0}'
                              .format(res.status_code))
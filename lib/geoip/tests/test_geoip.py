@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 from random import randint
 
 import mock
@@ -6,12 +9,14 @@ from nose.tools import eq_
 
 import mkt.site.tests
 
-from lib.geoip import GeoIP
+from lib.geoip import build_database, GeoIP, LocalDatabase
 
 
-def generate_settings(url='', default='restofworld', timeout=0.2):
+def generate_settings(url='', default='restofworld', timeout=0.2, db_path='',
+                      cache_size=0):
     return mock.Mock(GEOIP_URL=url, GEOIP_DEFAULT_VAL=default,
-                     GEOIP_DEFAULT_TIMEOUT=timeout)
+                     GEOIP_DEFAULT_TIMEOUT=timeout, GEOIP_DB_PATH=db_path,
+                     GEOIP_CACHE_SIZE=cache_size)
 
 
 class GeoIPTest(mkt.site.tests.TestCase):
@@ -86,3 +91,76 @@ class GeoIPTest(mkt.site.tests.TestCase):
             result = geoip.lookup(ip)
             assert not mock_post.called
             eq_(result, 'restofworld')
+
+    @mock.patch('requests.post')
+    def test_cache(self, mock_post):
+        geoip = GeoIP(generate_settings(url='localhost', cache_size=1))
+        mock_post.return_value = mock.Mock(status_code=200, json=lambda: {
+            'country_code': 'US',
+        })
+        eq_(geoip.lookup('1.1.1.1'), 'us')
+        eq_(geoip.lookup('1.1.1.1'), 'us')
+        eq_(mock_post.call_count, 1)
+
+        # Only the most recent address is remembered.
+        eq_(geoip.lookup('2.2.2.2'), 'us')
+        eq_(geoip.lookup('1.1.1.1'), 'us')
+        eq_(mock_post.call_count, 3)
+
+    @mock.patch('requests.post')
+    def test_cache_failures(self, mock_post):
+        geoip = GeoIP(generate_settings(url='localhost', cache_size=10))
+        mock_post.side_effect = requests.Timeout
+        eq_(geoip.lookup('1.1.1.1'), 'restofworld')
+        eq_(geoip.lookup('1.1.1.1'), 'restofworld')
+        eq_(mock_post.call_count, 2)
+
+
+class LocalDatabaseTest(mkt.site.tests.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'geoip.db')
+        build_database([
+            ('2.0.0.0', '2.255.255.255', 'FR'),
+            ('1.0.0.0', '1.0.0.255', 'US'),
+            (50462976, 50463231, 'BR'),  # 3.2.1.0 - 3.2.1.255.
+            ('not', 'an ip', 'XX'),
+        ], self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_lookup(self):
+        db = LocalDatabase(self.path)
+        eq_(db.count, 3)
+        eq_(db.lookup('1.0.0.0'), 'us')
+        eq_(db.lookup('1.0.0.255'), 'us')
+        eq_(db.lookup('2.3.4.5'), 'fr')
+        eq_(db.lookup('3.2.1.42'), 'br')
+
+    def test_lookup_not_found(self):
+        db = LocalDatabase(self.path)
+        eq_(db.lookup('0.1.2.3'), None)
+        eq_(db.lookup('1.0.1.0'), None)
+        eq_(db.lookup('4.0.0.0'), None)
+        eq_(db.lookup('invalid'), None)
+
+    def test_empty(self):
+        build_database([], self.path)
+        eq_(LocalDatabase(self.path).lookup('1.0.0.1'), None)
+
+    @mock.patch('requests.post')
+    def test_geoip(self, mock_post):
+        geoip = GeoIP(generate_settings(url='localhost', db_path=self.path))
+        eq_(geoip.lookup('2.3.4.5'), 'fr')
+        eq_(geoip.lookup('4.0.0.0'), 'restofworld')
+        eq_(geoip.lookup('127.0.0.1'), 'restofworld')
+        assert not mock_post.called
+
+    @mock.patch('requests.post')
+    def test_geoip_missing_database(self, mock_post):
+        geoip = GeoIP(generate_settings(
+            db_path=os.path.join(self.tmp, 'missing.db')))
+        eq_(geoip.db, None)
+        eq_(geoip.lookup('2.3.4.5'), 'restofworld')
@@ -3,6 +3,9 @@ import threading
 from django.conf import settings
 
 import commonware.log
+import requests
+from django_statsd.clients import statsd
+from requests.adapters import HTTPAdapter
 
 from mkt.monolith.models import record_stat
 
@@ -30,18 +33,55 @@ def record_action(action, request, data=None):
     record_stat(action, request, **data)
 
 
-def get_monolith_client():
-    _locals = threading.local()
-    if not hasattr(_locals, 'monolith'):
-        server = getattr(settings, 'MONOLITH_SERVER', None)
-        index = getattr(settings, 'MONOLITH_INDEX', 'time_*')
-        if server is None:
-            raise ValueError('You need to configure MONOLITH_SERVER')
+class MonolithSession(requests.Session):
+    """A requests session applying settings.MONOLITH_TIMEOUT by default."""
+
+    def request(self, *args, **kw):
+        kw.setdefault('timeout', settings.MONOLITH_TIMEOUT)
+        return super(MonolithSession, self).request(*args, **kw)
+
+
+# Monolith clients of the current thread, keyed by server and index. Reusing
+# a client keeps its HTTP connections alive between queries. Clients aren't
+# shared between threads, as requests sessions aren't thread safe.
+_monolith_clients = threading.local()
+
 
-        statsd = {'statsd.host': getattr(settings, 'STATSD_HOST', 'localhost'),
-                  'statsd.port': getattr(settings, 'STATSD_PORT', 8125)}
+def get_monolith_client():
+    server = getattr(settings, 'MONOLITH_SERVER', None)
+    index = getattr(settings, 'MONOLITH_INDEX', 'time_*')
+    if server is None:
+        raise ValueError('You need to configure MONOLITH_SERVER')
+
+    clients = getattr(_monolith_clients, 'clients', None)
+    if clients is None:
+        clients = _monolith_clients.clients = {}
+
+    key = (server, index)
+    client = clients.get(key)
+    if client is None:
+        kw = {
+            'statsd.host': getattr(settings, 'STATSD_HOST', 'localhost'),
+            'statsd.port': getattr(settings, 'STATSD_PORT', 8125),
+        }
 
         from monolith.client import Client as MonolithClient
-        _locals.monolith = MonolithClient(server, index, **statsd)
+        client = MonolithClient(server, index, **kw)
+        # The client builds a plain session, without timeout nor pool size.
+        adapter = HTTPAdapter(pool_maxsize=settings.MONOLITH_POOL_SIZE)
+        client.session = MonolithSession()
+        client.session.mount('http://', adapter)
+        client.session.mount('https://', adapter)
+        clients[key] = client
+        log.info('Created Monolith client for %s' % server)
+        statsd.incr('metrics.monolith.clients')
+
+    return client
+
 
-    return _locals.monolith
+def reset_monolith_clients():
+    """
+    Forget the Monolith clients of the current thread, the next call creates
+    new ones.
+    """
+    _monolith_clients.clients = {}
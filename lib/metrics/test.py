@@ -1,8 +1,12 @@
 # -*- coding: utf8 -*-
+import threading
+
 import mock
+from nose.tools import eq_, ok_
 
 import mkt.site.tests
-from lib.metrics import record_action
+from lib.metrics import (get_monolith_client, record_action,
+                         reset_monolith_clients)
 
 
 class TestMetrics(mkt.site.tests.TestCase):
@@ -17,3 +21,60 @@ class TestMetrics(mkt.site.tests.TestCase):
         record_stat.assert_called_with(
             'install', request,
             **{'locale': 'en', 'src': 'foo', 'user-agent': 'py'})
+
+
+@mock.patch('monolith.client.Client')
+class TestMonolithClient(mkt.site.tests.TestCase):
+
+    def setUp(self):
+        reset_monolith_clients()
+
+    def test_reused(self, client_mock):
+        client = get_monolith_client()
+        eq_(get_monolith_client(), client)
+        eq_(client_mock.call_count, 1)
+
+    def test_per_thread(self, client_mock):
+        client_mock.side_effect = lambda *a, **kw: mock.Mock()
+        clients = []
+        thread = threading.Thread(
+            target=lambda: clients.append(get_monolith_client()))
+        thread.start()
+        thread.join()
+        ok_(get_monolith_client() != clients[0])
+        eq_(client_mock.call_count, 2)
+
+    def test_per_server(self, client_mock):
+        client_mock.side_effect = lambda *a, **kw: mock.Mock()
+        client = get_monolith_client()
+        with self.settings(MONOLITH_SERVER='http://other:9200'):
+            ok_(get_monolith_client() != client)
+        eq_(get_monolith_client(), client)
+        eq_(client_mock.call_count, 2)
+
+    @mock.patch('lib.metrics.statsd')
+    def test_stats(self, statsd_mock, client_mock):
+        get_monolith_client()
+        statsd_mock.incr.assert_called_with('metrics.monolith.clients')
+
+
+class TestMonolithSession(mkt.site.tests.TestCase):
+
+    def setUp(self):
+        reset_monolith_clients()
+
+    @mock.patch('requests.Session.request')
+    def test_session(self, request_mock):
+        with self.settings(MONOLITH_SERVER='http://monolith:9200',
+                           MONOLITH_TIMEOUT=3, MONOLITH_POOL_SIZE=4):
+            session = get_monolith_client().session
+            adapter = session.get_adapter('http://monolith:9200/time_*')
+            eq_(adapter._pool_maxsize, 4)
+            session.get('http://monolith:9200/time_*/_search')
+        eq_(request_mock.call_args[1]['timeout'], 3)
+
+    @mock.patch('requests.Session.request')
+    def test_session_explicit_timeout(self, request_mock):
+        session = get_monolith_client().session
+        session.get('http://monolith:9200/time_*/_search', timeout=1)
+        eq_(request_mock.call_args[1]['timeout'], 1)
@@ -23,11 +23,84 @@ def _get_task_queue():
 def _send_tasks(**kwargs):
     """Sends all delayed Celery tasks."""
     queue = _get_task_queue()
+    queue[:] = _coalesce_tasks(queue)
     while queue:
         cls, args, kwargs = queue.pop(0)
         cls.original_apply_async(*args, **kwargs)
 
 
+def _split_call(args, kwargs):
+    """Split `apply_async` arguments into (task args, task kwargs, options).
+
+    Returns None if the call can't be interpreted.
+
+    """
+    options = dict(kwargs)
+    if len(args) > 2:
+        return None
+    task_args = args[0] if args else options.pop('args', None)
+    task_kwargs = args[1] if len(args) > 1 else options.pop('kwargs', None)
+    return list(task_args or ()), dict(task_kwargs or {}), options
+
+
+def _coalesce_tasks(queue):
+    """Merge the queued calls of tasks declaring `merge_ids`.
+
+    Tasks can declare `merge_ids='list'` if their first positional argument
+    is a list of ids, or `merge_ids='varargs'` if all their positional
+    arguments are ids. Calls to the same task with the same other positional
+    arguments and options are merged into a single call with the union of
+    the ids. Keyword arguments are merged as well, the last call winning,
+    so mergeable tasks must not rely on them to tell calls apart.
+
+    Returns the new queue, in the order the tasks were first queued.
+
+    """
+    coalesced = []
+    merged = {}
+    for t in queue:
+        cls, args, kwargs = t
+        mode = getattr(cls, 'merge_ids', None)
+        call = _split_call(args, kwargs) if mode else None
+        if call is None or (mode == 'list' and not call[0]):
+            coalesced.append(t)
+            continue
+
+        task_args, task_kwargs, options = call
+        if mode == 'list':
+            ids, rest = task_args[0], tuple(task_args[1:])
+        else:
+            ids, rest = task_args, ()
+        key = (cls.name, rest, tuple(sorted(options.items())))
+        try:
+            entry = merged.get(key)
+        except TypeError:
+            # Unhashable arguments, we can't tell if they are the same.
+            coalesced.append(t)
+            continue
+
+        if entry is None:
+            entry = merged[key] = {'cls': cls, 'mode': mode, 'ids': [],
+                                   'rest': rest, 'kwargs': {},
+                                   'options': options}
+            coalesced.append(entry)
+        else:
+            log.debug('Merged task: %s' % (t,))
+        entry['ids'].extend(id_ for id_ in ids if id_ not in entry['ids'])
+        entry['kwargs'].update(task_kwargs)
+
+    for idx, entry in enumerate(coalesced):
+        if isinstance(entry, dict):
+            if entry['mode'] == 'list':
+                task_args = [entry['ids']] + list(entry['rest'])
+            else:
+                task_args = entry['ids']
+            coalesced[idx] = (entry['cls'],
+                              (tuple(task_args), entry['kwargs']),
+                              entry['options'])
+    return coalesced
+
+
 def _discard_tasks(**kwargs):
     """Discards all delayed Celery tasks."""
     _get_task_queue()[:] = []
@@ -54,8 +127,12 @@ class PostRequestTask(Task):
     This simply wraps celery's `@task` decorator and stores the task calls
     until after the request is finished, then fires them off.
 
+    Tasks taking ids can set `merge_ids` so that all their calls made during
+    the request are merged into one, see `_coalesce_tasks`.
+
     """
     abstract = True
+    merge_ids = None
 
     def original_apply_async(self, *args, **kwargs):
         return super(PostRequestTask, self).apply_async(*args, **kwargs)
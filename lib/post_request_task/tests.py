@@ -5,7 +5,8 @@ from celery.signals import task_postrun
 from mock import Mock, patch
 from nose.tools import eq_
 
-from lib.post_request_task.task import task, _get_task_queue, _discard_tasks
+from lib.post_request_task.task import (_discard_tasks, _get_task_queue,
+                                        _send_tasks, task)
 
 
 task_mock = Mock()
@@ -16,6 +17,16 @@ def test_task():
     task_mock()
 
 
+@task(merge_ids='list')
+def test_list_task(ids, other=None, **kw):
+    task_mock(ids, other, **kw)
+
+
+@task(merge_ids='varargs')
+def test_varargs_task(*ids, **kw):
+    task_mock(*ids, **kw)
+
+
 class TestTask(TestCase):
 
     def setUp(self):
@@ -93,3 +104,32 @@ class TestTask(TestCase):
             test_task.delay()
 
         self._verify_task_filled()
+
+    @patch('lib.post_request_task.task.PostRequestTask.original_apply_async')
+    def test_merge_list(self, _mock):
+        with self.settings(CELERY_ALWAYS_EAGER=False):
+            test_list_task.delay([1])
+            test_list_task.delay([1], using='default')
+            test_list_task.delay([2, 1])
+            test_list_task.delay([3], 'other')
+            test_task.delay()
+        eq_(len(_get_task_queue()), 5)
+
+        _send_tasks()
+        self._verify_task_empty()
+        eq_(_mock.call_args_list[0][0], (([1, 2], ), {'using': 'default'}))
+        eq_(_mock.call_args_list[1][0], (([3], 'other'), {}))
+        eq_(_mock.call_count, 3)
+
+    @patch('lib.post_request_task.task.PostRequestTask.original_apply_async')
+    def test_merge_varargs(self, _mock):
+        with self.settings(CELERY_ALWAYS_EAGER=False):
+            test_varargs_task.delay(1, using='default')
+            test_varargs_task.delay(2, 1, using='default')
+            test_varargs_task.apply_async(args=[3], countdown=5)
+
+        _send_tasks()
+        self._verify_task_empty()
+        eq_(_mock.call_count, 2)
+        eq_(_mock.call_args_list[0][0], ((1, 2), {'using': 'default'}))
+        eq_(_mock.call_args_list[1], (((3, ), {}), {'countdown': 5}))
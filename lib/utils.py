@@ -1,6 +1,8 @@
-import jwt
+import hashlib
 from urlparse import urljoin
 
+import jwt
+
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
@@ -104,3 +106,13 @@ def update_csp():
                 new.add(value)
 
         setattr(settings, key, tuple(new))
+
+
+def purchase_cache_key(kind, *ids):
+    """
+    Return the key under which the receipt verifier caches a purchase: kind
+    'app' with the app id and the uuid of the purchase, or kind 'inapp' with
+    the contribution id.
+    """
+    ids = u':'.join(unicode(id_) for id_ in ids).encode('utf-8')
+    return 'verify:purchase:%s:%s' % (kind, hashlib.md5(ids).hexdigest())
@@ -22,7 +22,8 @@ from multidb.middleware import PinningRouterMiddleware
 from oauthlib.common import Request
 from oauthlib.oauth1.rfc5849 import signature
 
-from mkt.api.models import Access, ACCESS_TOKEN, Token
+from mkt.api.models import (Access, ACCESS_TOKEN, get_principal,
+                            principal_key, set_principal, Token)
 from mkt.api.oauth import server, validator
 from mkt.carriers import get_carrier
 from mkt.users.models import UserProfile
@@ -84,12 +85,14 @@ class RestOAuthMiddleware(object):
                 log.warning(u'Cannot find APIAccess token with that key: %s'
                             % oauth_req.attempted_key)
                 return
-            uid = Token.objects.filter(
-                token_type=ACCESS_TOKEN,
-                key=oauth_req.resource_owner_key).values_list(
-                    'user_id', flat=True)[0]
-            request.user = UserProfile.objects.select_related(
-                'user').get(pk=uid)
+            key = principal_key('token', oauth_req.resource_owner_key)
+            principal = cached_principal(key)
+            if principal is None:
+                uid = Token.objects.filter(
+                    token_type=ACCESS_TOKEN,
+                    key=oauth_req.resource_owner_key).values_list(
+                        'user_id', flat=True)[0]
+                principal = load_principal(key, pk=uid)
         else:
             # This is 2-legged OAuth.
             log.info('Trying 2 legged OAuth')
@@ -104,20 +107,24 @@ class RestOAuthMiddleware(object):
             except ValueError:
                 log.warning('ValueError on verifying_request', exc_info=True)
                 return
-            uid = Access.objects.filter(
-                key=client_key).values_list(
-                    'user_id', flat=True)[0]
-            request.user = UserProfile.objects.select_related(
-                'user').get(pk=uid)
+            key = principal_key('consumer', client_key)
+            principal = cached_principal(key)
+            if principal is None:
+                uid = Access.objects.filter(
+                    key=client_key).values_list(
+                        'user_id', flat=True)[0]
+                principal = load_principal(key, pk=uid)
+        request.user, request.groups = principal
 
         # But you cannot have one of these roles.
         denied_groups = set(['Admins'])
-        roles = set(request.user.groups.values_list('name', flat=True))
+        roles = set(group.name for group in request.groups)
         if roles and roles.intersection(denied_groups):
             log.info(u'Attempt to use API with denied role, user: %s'
                      % request.user.pk)
             # Set request user back to Anonymous.
             request.user = AnonymousUser()
+            request.groups = ()
             return
 
         if request.user.is_authenticated():
@@ -130,6 +137,26 @@ class TwoLeggedOAuthError(Exception):
     pass
 
 
+def cached_principal(key):
+    """Returns the (user, groups) cached under `key`, if any."""
+    principal = get_principal(key)
+    if principal is not None:
+        statsd.incr('api.principal.hit')
+    return principal
+
+
+def load_principal(key, **kw):
+    """
+    Fetches the user matching `kw` and their groups, caching them under
+    `key` so that the next requests with the same credentials don't have to.
+    """
+    user = UserProfile.objects.get(**kw)
+    groups = list(user.groups.all())
+    set_principal(key, user, groups)
+    statsd.incr('api.principal.miss')
+    return user, groups
+
+
 def validate_2legged_oauth(oauth, uri, method, auth_header):
     """
     "Two-legged" OAuth authorization isn't standard and so not
@@ -181,6 +208,15 @@ class RestSharedSecretMiddleware(object):
             log.info('API request made without shared-secret auth token')
             return
         try:
+            key = principal_key('shared-secret', str(auth))
+            principal = cached_principal(key)
+            if principal is not None:
+                # Only validated auth strings are cached.
+                request.user, request.groups = principal
+                request.authed_from.append('RestSharedSecret')
+                log.info('Successful SharedSecret with user: %s'
+                         % request.user.pk)
+                return
             email, hm, unique_id = str(auth).split(',')
             consumer_id = hashlib.sha1(
                 email + settings.SECRET_KEY).hexdigest()
@@ -188,7 +224,8 @@ class RestSharedSecretMiddleware(object):
                                consumer_id, hashlib.sha512).hexdigest() == hm
             if matches:
                 try:
-                    request.user = UserProfile.objects.get(email=email)
+                    request.user, request.groups = load_principal(
+                        key, email=email)
                     request.authed_from.append('RestSharedSecret')
                 except UserProfile.DoesNotExist:
                     log.info('Auth token matches absent user (%s)' % email)
@@ -1,10 +1,18 @@
+import hashlib
 import time
+import uuid
 
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.crypto import get_random_string
 
 from aesfield.field import AESField
 
+from mkt.access.models import Group, GroupUser
 from mkt.site.models import ModelBase
 from mkt.users.models import UserProfile
 
@@ -72,3 +80,82 @@ class Nonce(ModelBase):
         db_table = 'oauth_nonce'
         unique_together = ('nonce', 'timestamp', 'client_key',
                            'request_token', 'access_token')
+
+
+def principal_key(kind, credential):
+    """
+    Returns the cache key of the principal authenticated by `credential`,
+    an OAuth token or consumer key or a shared-secret auth string.
+    """
+    if isinstance(credential, unicode):
+        credential = credential.encode('utf-8')
+    return 'api:principal:%s:%s' % (
+        kind, hashlib.sha1(settings.SECRET_KEY + credential).hexdigest())
+
+
+def principal_version(user_id):
+    key = 'api:principal:version:%s' % user_id
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_principal(key):
+    """
+    Returns the (user, groups) tuple cached under `key`, or None if there
+    isn't one or the user changed since it was cached.
+    """
+    principal = cache.get(key)
+    if (principal is None or
+            principal['version'] != principal_version(principal['user'].pk)):
+        return None
+    return principal['user'], principal['groups']
+
+
+def set_principal(key, user, groups):
+    cache.set(key, {'user': user, 'groups': list(groups),
+                    'version': principal_version(user.pk)},
+              settings.API_PRINCIPAL_CACHE_TIMEOUT)
+
+
+def invalidate_principals(*user_ids):
+    """Drop every cached principal of the given users."""
+    cache.set_many(dict(('api:principal:version:%s' % user_id,
+                         uuid.uuid4().hex) for user_id in user_ids), None)
+
+
+@receiver(post_save, sender=UserProfile,
+          dispatch_uid='principal_invalidate_user_save')
+@receiver(post_delete, sender=UserProfile,
+          dispatch_uid='principal_invalidate_user_delete')
+def invalidate_user_principals(sender, instance, **kw):
+    invalidate_principals(instance.pk)
+
+
+@receiver(post_save, sender=GroupUser,
+          dispatch_uid='principal_invalidate_groupuser_save')
+@receiver(post_delete, sender=GroupUser,
+          dispatch_uid='principal_invalidate_groupuser_delete')
+@receiver(post_delete, sender=Access,
+          dispatch_uid='principal_invalidate_access_delete')
+@receiver(post_delete, sender=Token,
+          dispatch_uid='principal_invalidate_token_delete')
+def invalidate_owner_principals(sender, instance, **kw):
+    if instance.user_id:
+        invalidate_principals(instance.user_id)
+
+
+@receiver(post_save, sender=Group,
+          dispatch_uid='principal_invalidate_group_save')
+def invalidate_group_principals(sender, instance, **kw):
+    user_ids = instance.users.values_list('pk', flat=True)
+    if user_ids:
+        invalidate_principals(*user_ids)
+
+
+@receiver(user_logged_out, dispatch_uid='principal_invalidate_logout')
+def invalidate_logout_principals(sender, request, user, **kw):
+    if user is not None and user.pk:
+        invalidate_principals(user.pk)
@@ -87,22 +87,49 @@ class CustomPagination(pagination.LimitOffsetPagination):
         # Modified from superclass method to skip an extra count call for ES
         # searches, since it provides .total in the response. (This is similar
         # to ESPaginator's behavior.)
+        if isinstance(queryset, Search):
+            page = self.get_search_page(queryset, request)
+            if page is None:
+                return None
+            return self.paginate_search_response(page.execute())
+
         self.limit = self.get_limit(request)
         if self.limit is None:
             return None
 
         self.offset = self.get_offset(request)
         page = queryset[self.offset:self.offset + self.limit]
-        if isinstance(page, Search):
-            page = page.execute()
-            self.count = page.hits.total
-        else:
-            self.count = self.count_override or pagination._get_count(queryset)
+        self.count = self.count_override or pagination._get_count(queryset)
         self.request = request
         if self.count > self.limit and self.template is not None:
             self.display_page_controls = True
         return list(page)
 
+    def get_search_page(self, search, request):
+        """
+        Return the slice of the ES `search` for the requested page, without
+        executing it, so that the caller can execute it along with other
+        searches. The response must then be passed to
+        paginate_search_response().
+        """
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        return search[self.offset:self.offset + self.limit]
+
+    def paginate_search_response(self, response):
+        """
+        Return the list of results from the ES `response` for the page
+        returned by get_search_page().
+        """
+        self.count = response.hits.total
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return list(response)
+
 
 class PageNumberPagination(pagination.PageNumberPagination):
 
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.signals import user_logged_out
 from django.test.client import RequestFactory
 
 from mock import Mock, patch
@@ -73,6 +74,21 @@ class TestRestOAuthAuthentication(TestCase):
         self.add_group_user(self.profile, 'App Reviewers')
         ok_(self.auth.authenticate(Request(self.call())))
 
+    def test_principal_cached(self):
+        eq_(self.auth.authenticate(Request(self.call())), (self.profile, None))
+        with patch('mkt.api.middleware.load_principal') as load_principal:
+            req = self.call()
+        ok_(not load_principal.called)
+        eq_(self.auth.authenticate(Request(req)), (self.profile, None))
+        eq_(req.groups, [])
+
+    def test_principal_invalidated_on_group_change(self):
+        ok_(self.auth.authenticate(Request(self.call())))
+        self.add_group_user(self.profile, 'Admins')
+        ok_(not self.auth.authenticate(Request(self.call())))
+        GroupUser.objects.filter(user=self.profile).delete()
+        ok_(self.auth.authenticate(Request(self.call())))
+
 
 class TestRestAnonymousAuthentication(TestCase):
 
@@ -136,6 +152,44 @@ class TestSharedSecretAuthentication(TestCase):
         ok_(req.user.is_authenticated())
         eq_(self.profile.pk, req.user.pk)
 
+    def call_shared_secret(self):
+        req = RequestFactory().post(
+            '/api/',
+            HTTP_AUTHORIZATION='mkt-shared-secret '
+            'cfinke@m.com,56b6f1a3dd735d962c56'
+            'ce7d8f46e02ec1d4748d2c00c407d75f0969d08bb'
+            '9c68c31b3371aa8130317815c89e5072e31bb94b4'
+            '121c5c165f3515838d4d6c60c4,165d631d3c3045'
+            '458b4516242dad7ae')
+        req.user = AnonymousUser()
+        for m in self.middlewares:
+            m().process_request(req)
+        return req
+
+    def test_session_auth_cached(self):
+        self.call_shared_secret()
+        with self.assertNumQueries(0):
+            req = self.call_shared_secret()
+        ok_(self.auth.authenticate(Request(req)))
+        eq_(self.profile.pk, req.user.pk)
+
+    def test_session_auth_invalidated_on_save(self):
+        self.call_shared_secret()
+        self.profile.update(display_name='Fred')
+        req = self.call_shared_secret()
+        eq_(req.user.display_name, 'Fred')
+
+    def test_session_auth_invalidated_on_logout(self):
+        req = self.call_shared_secret()
+        with patch('mkt.api.middleware.load_principal') as load_principal:
+            load_principal.return_value = (self.profile, [])
+            self.call_shared_secret()
+            ok_(not load_principal.called)
+            user_logged_out.send(sender=UserProfile, request=req,
+                                 user=self.profile)
+            self.call_shared_secret()
+            ok_(load_principal.called)
+
     def test_failed_session_auth(self):
         req = RequestFactory().post(
             '/api/',
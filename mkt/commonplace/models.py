@@ -1,8 +1,16 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.dispatch import receiver
+
+from waffle.models import Switch
 
 from mkt.site.models import ModelBase
 
 
+SHELL_CACHE_KEY = 'commonplace:shell:%s'
+
+
 class DeployBuildId(ModelBase):
     """
     After deployments are completely finished to all the webheads, build IDs
@@ -18,3 +26,22 @@ class DeployBuildId(ModelBase):
 
     class Meta:
         db_table = 'deploy_build_id'
+
+
+def clear_shell_cache(repos):
+    """Drop the cached frontend shell context of the given repos."""
+    cache.delete_many([SHELL_CACHE_KEY % repo for repo in repos])
+
+
+@receiver(models.signals.post_save, sender=DeployBuildId,
+          dispatch_uid='deploy_build_id_shell_cache')
+def clear_build_id_shell_cache(sender, instance, **kw):
+    clear_shell_cache([instance.repo])
+
+
+@receiver(models.signals.post_save, sender=Switch,
+          dispatch_uid='save_switch_shell_cache')
+@receiver(models.signals.post_delete, sender=Switch,
+          dispatch_uid='delete_switch_shell_cache')
+def clear_switch_shell_cache(sender, **kw):
+    clear_shell_cache(settings.FRONTEND_REPOS)
@@ -8,9 +8,11 @@ from django.test.utils import override_settings
 import mock
 from nose.tools import eq_, ok_
 from pyquery import PyQuery as pq
+from waffle.models import Switch
 
 import mkt.site.tests
 from mkt.commonplace.models import DeployBuildId
+from mkt.commonplace.views import get_shell_context
 
 
 class CommonplaceTestMixin(mkt.site.tests.TestCase):
@@ -286,6 +288,33 @@ class TestBuildId(CommonplaceTestMixin):
                 ok_(src.endswith('?b=0118999'))
 
 
+class TestShellContext(mkt.site.tests.TestCase):
+
+    def test_cached(self):
+        DeployBuildId.objects.create(repo='fireplace', build_id='0118999')
+        eq_(get_shell_context('fireplace')['BUILD_ID'], '0118999')
+        with self.assertNumQueries(0):
+            eq_(get_shell_context('fireplace')['BUILD_ID'], '0118999')
+
+    def test_build_id_change(self):
+        build_id = DeployBuildId.objects.create(repo='fireplace',
+                                                build_id='0118999')
+        get_shell_context('fireplace')
+        build_id.update(build_id='881999')
+        eq_(get_shell_context('fireplace')['BUILD_ID'], '881999')
+
+    def test_switch_change(self):
+        ok_('some-switch' not in
+            get_shell_context('commbadge')['waffle_switches'])
+        Switch.objects.create(name='some-switch', active=True)
+        ok_('some-switch' in
+            get_shell_context('commbadge')['waffle_switches'])
+
+    def test_copy(self):
+        get_shell_context('fireplace')['BUILD_ID'] = 'changed'
+        ok_(get_shell_context('fireplace')['BUILD_ID'] != 'changed')
+
+
 class TestLangAttrs(CommonplaceTestMixin):
 
     def test_lang_en(self):
@@ -3,6 +3,7 @@ import os
 from urlparse import urlparse
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import resolve
 from django.http import Http404
 from django.shortcuts import render
@@ -14,12 +15,16 @@ import newrelic.agent
 import waffle
 
 from mkt.account.helpers import fxa_auth_info
-from mkt.commonplace.models import DeployBuildId
+from mkt.commonplace.models import DeployBuildId, SHELL_CACHE_KEY
 from mkt.regions.middleware import RegionMiddleware
 from mkt.site.storage_utils import local_storage
 from mkt.webapps.models import Webapp
 
 
+# Shared between requests so that its recent GeoIP lookups are kept.
+region_middleware = RegionMiddleware()
+
+
 @gzip_page
 @cache_control(max_age=settings.CACHE_MIDDLEWARE_SECONDS)
 def commonplace(request, repo, **kwargs):
@@ -27,8 +32,6 @@ def commonplace(request, repo, **kwargs):
     if repo not in settings.FRONTEND_REPOS:
         raise Http404
 
-    BUILD_ID = get_build_id(repo)
-
     ua = request.META.get('HTTP_USER_AGENT', '').lower()
 
     include_splash = False
@@ -51,8 +54,8 @@ def commonplace(request, repo, **kwargs):
         'fxa_auth_url': fxa_auth_url,
     }
 
-    ctx = {
-        'BUILD_ID': BUILD_ID,
+    ctx = get_shell_context(repo)
+    ctx.update({
         'LANG': request.LANG,
         'DIR': lang_dir(request.LANG),
         'include_splash': include_splash,
@@ -61,7 +64,7 @@ def commonplace(request, repo, **kwargs):
         'site_settings': site_settings,
         'newrelic_header': newrelic.agent.get_browser_timing_header,
         'newrelic_footer': newrelic.agent.get_browser_timing_footer,
-    }
+    })
 
     if repo == 'fireplace':
         # For OpenGraph stuff.
@@ -69,17 +72,13 @@ def commonplace(request, repo, **kwargs):
         if resolved_url.url_name == 'detail':
             ctx = add_app_ctx(ctx, resolved_url.kwargs['app_slug'])
 
-    ctx['waffle_switches'] = list(
-        waffle.models.Switch.objects.filter(active=True)
-                                    .values_list('name', flat=True))
-
-    media_url = urlparse(settings.MEDIA_URL)
-    if media_url.netloc:
-        ctx['media_origin'] = media_url.scheme + '://' + media_url.netloc
-
     if detect_region_with_geoip:
-        region_middleware = RegionMiddleware()
-        ctx['geoip_region'] = region_middleware.region_from_request(request)
+        # Don't hold the page up on a GeoIP server call, fireplace looks the
+        # region up itself if it isn't in the page.
+        region = region_middleware.region_from_request(request,
+                                                       blocking=False)
+        if region:
+            ctx['geoip_region'] = region
 
     if repo in settings.REACT_REPOS:
         return render(request, 'commonplace/index_react.html', ctx)
@@ -131,6 +130,28 @@ def get_allowed_origins(request, include_loop=True):
     return json.dumps(allowed)
 
 
+def get_shell_context(repo):
+    """
+    Return the parts of the frontend shell context that don't depend on the
+    request. They are cached per repo until the build ID or a waffle switch
+    changes.
+    """
+    key = SHELL_CACHE_KEY % repo
+    ctx = cache.get(key)
+    if ctx is None:
+        ctx = {
+            'BUILD_ID': get_build_id(repo),
+            'waffle_switches': list(
+                waffle.models.Switch.objects.filter(active=True)
+                                            .values_list('name', flat=True)),
+        }
+        media_url = urlparse(settings.MEDIA_URL)
+        if media_url.netloc:
+            ctx['media_origin'] = media_url.scheme + '://' + media_url.netloc
+        cache.set(key, ctx, settings.COMMONPLACE_SHELL_CACHE_TIMEOUT)
+    return dict(ctx)
+
+
 def get_build_id(repo):
     try:
         # Get the build ID from the database (bug 1083185).
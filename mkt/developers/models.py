@@ -255,27 +255,24 @@ class GroupLog(ModelBase):
 
 class ActivityLogManager(ManagerBase):
 
-    def for_apps(self, apps):
-        vals = (AppLog.objects.filter(addon__in=apps)
-                .values_list('activity_log', flat=True))
+    def get_queryset(self):
+        qs = super(ActivityLogManager, self).get_queryset()
+        return qs.transform(ActivityLog.arguments_transformer)
 
-        if vals:
-            return self.filter(pk__in=list(vals))
-        else:
-            return self.none()
+    def for_apps(self, apps):
+        return self.filter(pk__in=AppLog.objects.filter(addon__in=apps)
+                                                .values('activity_log'))
 
     def for_version(self, version):
-        vals = (VersionLog.objects.filter(version=version)
-                .values_list('activity_log', flat=True))
-        return self.filter(pk__in=list(vals))
+        return self.filter(pk__in=VersionLog.objects.filter(version=version)
+                                                    .values('activity_log'))
 
     def for_group(self, group):
         return self.filter(grouplog__group=group)
 
     def for_user(self, user):
-        vals = (UserLog.objects.filter(user=user)
-                .values_list('activity_log', flat=True))
-        return self.filter(pk__in=list(vals))
+        return self.filter(pk__in=UserLog.objects.filter(user=user)
+                                                 .values('activity_log'))
 
     def for_developer(self):
         return self.exclude(action__in=mkt.LOG_ADMINS + mkt.LOG_HIDE_DEVELOPER)
@@ -360,9 +357,11 @@ class ActivityLog(ModelBase):
         # SafeFormatter escapes everything so this is safe.
         return jinja2.Markup(self.formatter.format(*args, **kw))
 
-    @property
-    def arguments(self):
-
+    def _load_arguments(self):
+        """
+        Returns the deserialized arguments as a list of (model_name, pk)
+        pairs, or None if they can't be deserialized.
+        """
         try:
             # d is a structure:
             # ``d = [{'addons.addon':12}, {'addons.addon':1}, ... ]``
@@ -370,23 +369,54 @@ class ActivityLog(ModelBase):
         except:
             log.debug('unserializing data from addon_log failed: %s' % self.id)
             return None
+        # Each item has only one element.
+        return [item.items()[0] for item in d]
 
-        objs = []
-        for item in d:
-            # item has only one element.
-            model_name, pk = item.items()[0]
-            if model_name in ('str', 'int', 'null'):
-                objs.append(pk)
-            else:
-                (app_label, model_name) = model_name.split('.')
-                model = apps.get_model(app_label, model_name)
-                # Cope with soft deleted models.
-                if hasattr(model, 'with_deleted'):
-                    objs.extend(model.with_deleted.filter(pk=pk))
-                else:
-                    objs.extend(model.objects.filter(pk=pk))
+    @staticmethod
+    def arguments_transformer(logs):
+        """
+        Resolves the arguments of all the logs at once, with one query per
+        model referenced, and memoizes them on each log.
+        """
+        loaded = [(l, l._load_arguments()) for l in logs]
+        pks_by_model = {}
+        for l, items in loaded:
+            for model_name, pk in items or []:
+                if model_name not in ('str', 'int', 'null'):
+                    pks_by_model.setdefault(model_name, []).append(pk)
+
+        objs_by_model = {}
+        for model_name, pks in pks_by_model.items():
+            (app_label, name) = model_name.split('.')
+            model = apps.get_model(app_label, name)
+            to_python = model._meta.pk.to_python
+            # Cope with soft deleted models.
+            manager = getattr(model, 'with_deleted', model.objects)
+            objs_by_model[model_name] = (
+                to_python, manager.in_bulk(set(map(to_python, pks))))
+
+        for l, items in loaded:
+            if items is None:
+                l._resolved_arguments = None
+                continue
+            objs = []
+            for model_name, pk in items:
+                if model_name in ('str', 'int', 'null'):
+                    objs.append(pk)
+                    continue
+                to_python, bulk = objs_by_model[model_name]
+                if to_python(pk) in bulk:
+                    objs.append(bulk[to_python(pk)])
+            l._resolved_arguments = objs
 
-        return objs
+    @property
+    def arguments(self):
+        if not hasattr(self, '_resolved_arguments'):
+            self.arguments_transformer([self])
+        if self._resolved_arguments is None:
+            return None
+        # Return a copy so that callers can't alter the memoized list.
+        return list(self._resolved_arguments)
 
     @arguments.setter
     def arguments(self, args=[]):
@@ -415,6 +445,8 @@ class ActivityLog(ModelBase):
                 serialize_me.append(dict(((unicode(arg._meta), arg.pk),)))
 
         self._arguments = json.dumps(serialize_me)
+        # Forget the arguments resolved from the previous value.
+        self.__dict__.pop('_resolved_arguments', None)
 
     @property
     def details(self):
@@ -437,8 +469,9 @@ class ActivityLog(ModelBase):
             format = log_type.format
 
         # We need to copy arguments so we can remove elements from it
-        # while we loop over self.arguments.
-        arguments = copy(self.arguments)
+        # while we loop over the original ones.
+        original_arguments = self.arguments
+        arguments = copy(original_arguments)
         addon = None
         review = None
         version = None
@@ -447,7 +480,7 @@ class ActivityLog(ModelBase):
         group = None
         website = None
 
-        for arg in self.arguments:
+        for arg in original_arguments:
             if isinstance(arg, Webapp) and not addon:
                 addon = self.f(u'<a href="{0}">{1}</a>',
                                arg.get_url_path(), arg.name)
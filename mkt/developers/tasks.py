@@ -20,7 +20,6 @@ import requests
 from appvalidator import validate_app, validate_packaged_app
 from celery import task
 from django_statsd.clients import statsd
-from PIL import Image
 from django.utils.translation import ugettext as _
 
 import mkt
@@ -34,8 +33,8 @@ from mkt.site.helpers import absolutify
 from mkt.site.mail import send_mail_jinja
 from mkt.site.storage_utils import (copy_stored_file, local_storage,
                                     private_storage, public_storage)
-from mkt.site.utils import (remove_icons, remove_promo_imgs, resize_image,
-                            strip_bom)
+from mkt.site.utils import (decode_image, remove_icons, remove_promo_imgs,
+                            resize_image_pyramid, strip_bom)
 from mkt.webapps.models import AddonExcludedRegion, Preview, Webapp
 from mkt.webapps.utils import iarc_get_app_info
 
@@ -151,6 +150,74 @@ def _hash_file(fd):
     return hashlib.md5(fd.read()).hexdigest()[:8]
 
 
+def _resize_sizes(src, targets, src_storage=private_storage):
+    """
+    Decodes src once and resizes it to every size in targets, a list of
+    (dst, size) pairs. Returns a list of (dst, image) pairs.
+    """
+    with statsd.timer('developers.tasks.images.decode'):
+        im = decode_image(src, src_storage=src_storage)
+    with statsd.timer('developers.tasks.images.resize'):
+        images = resize_image_pyramid(im, [size for dst, size in targets])
+    return [(dst, images[size]) for dst, size in targets]
+
+
+def _pngcrush_files(paths):
+    """
+    Runs a single Pngcrush process over all the local png files in paths.
+    Returns a dict of path -> optimized path for the files it produced.
+    """
+    suffix = '.opti.png'
+    cmd = [settings.PNGCRUSH_BIN, '-q', '-rem', 'alla', '-brute', '-reduce',
+           '-e', suffix] + list(paths)
+    try:
+        sp = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = sp.communicate()
+    except OSError, e:
+        log.error('Error optimizing images: %s; %s' % (paths, e))
+        return {}
+    if sp.returncode != 0:
+        log.error('Error optimizing images: %s; %s' % (paths, stderr.strip()))
+        return {}
+    optimized = {}
+    for path in paths:
+        opti_path = '%s%s' % (os.path.splitext(path)[0], suffix)
+        if os.path.exists(opti_path):
+            optimized[path] = opti_path
+    return optimized
+
+
+def _save_images(images, dst_storage=public_storage, optimize=True):
+    """
+    Encodes the (dst, image) pairs in images to png in a local temporary
+    directory, optionally runs them all through Pngcrush at once, then
+    copies them to dst_storage. Returns a dict of dst -> image size.
+
+    If Pngcrush fails the unoptimized images are stored instead.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with statsd.timer('developers.tasks.images.encode'):
+            local_paths = []
+            for i, (dst, im) in enumerate(images):
+                path = os.path.join(tmp_dir, '%s.png' % i)
+                im.save(path, 'png')
+                local_paths.append(path)
+        optimized = {}
+        if optimize:
+            with statsd.timer('developers.tasks.images.optimize'):
+                optimized = _pngcrush_files(local_paths)
+        with statsd.timer('developers.tasks.images.store'):
+            for path, (dst, im) in zip(local_paths, images):
+                copy_stored_file(optimized.get(path, path), dst,
+                                 src_storage=local_storage,
+                                 dst_storage=dst_storage)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return dict((dst, im.size) for dst, im in images)
+
+
 @post_request_task
 @use_master
 @set_modified_on
@@ -160,11 +227,9 @@ def resize_icon(src, dst, sizes, src_storage=private_storage,
     log.info('[1@None] Resizing icon: %s' % dst)
 
     try:
-        for s in sizes:
-            size_dst = '%s-%s.png' % (dst, s)
-            resize_image(src, size_dst, (s, s), remove_src=False,
-                         src_storage=src_storage, dst_storage=dst_storage)
-            pngcrush_image.delay(size_dst, storage=dst_storage, **kw)
+        targets = [('%s-%s.png' % (dst, s), (s, s)) for s in sizes]
+        _save_images(_resize_sizes(src, targets, src_storage=src_storage),
+                     dst_storage=dst_storage)
         with src_storage.open(src) as fd:
             icon_hash = _hash_file(fd)
         src_storage.delete(src)
@@ -182,11 +247,9 @@ def resize_promo_imgs(src, dst, sizes, **kw):
     """Resizes webapp/website promo imgs."""
     log.info('[1@None] Resizing promo imgs: %s' % dst)
     try:
-        for s in sizes:
-            size_dst = '%s-%s.png' % (dst, s)
-            # Crop only to the width, keeping the aspect ratio.
-            resize_image(src, size_dst, (s, 0), remove_src=False)
-            pngcrush_image.delay(size_dst, **kw)
+        # Crop only to the width, keeping the aspect ratio.
+        targets = [('%s-%s.png' % (dst, s), (s, 0)) for s in sizes]
+        _save_images(_resize_sizes(src, targets))
 
         with private_storage.open(src) as fd:
             promo_img_hash = _hash_file(fd)
@@ -260,23 +323,28 @@ def resize_preview(src, pk, **kw):
     try:
         thumbnail_size = APP_PREVIEW_SIZES[0][:2]
         image_size = APP_PREVIEW_SIZES[1][:2]
-        with private_storage.open(src, 'rb') as fp:
-            size = Image.open(fp).size
-        if size[0] > size[1]:
+        with statsd.timer('developers.tasks.images.decode'):
+            im = decode_image(src)
+        if im.size[0] > im.size[1]:
             # If the image is wider than tall, then reverse the wanted size
             # to keep the original aspect ratio while still resizing to
             # the correct dimensions.
             thumbnail_size = thumbnail_size[::-1]
             image_size = image_size[::-1]
 
+        targets = []
         if kw.get('generate_thumbnail', True):
-            sizes['thumbnail'] = resize_image(src, thumb_dst,
-                                              thumbnail_size,
-                                              remove_src=False)
+            targets.append(('thumbnail', thumb_dst, thumbnail_size))
         if kw.get('generate_image', True):
-            sizes['image'] = resize_image(src, full_dst,
-                                          image_size,
-                                          remove_src=False)
+            targets.append(('image', full_dst, image_size))
+        with statsd.timer('developers.tasks.images.resize'):
+            images = resize_image_pyramid(
+                im, [size for key, dst, size in targets])
+        # Previews were never run through Pngcrush, keep it that way.
+        _save_images([(dst, images[size]) for key, dst, size in targets],
+                     optimize=False)
+        for key, dst, size in targets:
+            sizes[key] = images[size].size
         instance.sizes = sizes
         instance.save()
         log.info('Preview resized to: %s' % thumb_dst)
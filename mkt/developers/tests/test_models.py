@@ -82,6 +82,48 @@ class TestActivityLogCount(mkt.site.tests.TestCase):
         eq_(len(ActivityLog.objects.for_developer()), 1)
 
 
+class TestActivityLogArguments(mkt.site.tests.TestCase):
+    fixtures = fixture('webapp_337141', 'user_2519')
+
+    def setUp(self):
+        self.user = UserProfile.objects.get(pk=2519)
+        self.app = Webapp.objects.get()
+        mkt.set_user(self.user)
+
+    def test_arguments(self):
+        log = mkt.log(mkt.LOG['EDIT_VERSION'], self.app,
+                      self.app.current_version)
+        log = ActivityLog.objects.get(pk=log.pk)
+        eq_(log.arguments, [self.app, self.app.current_version])
+
+    def test_arguments_deleted(self):
+        log = mkt.log(mkt.LOG['EDIT_VERSION'], self.app, 'foo')
+        self.app.update(status=mkt.STATUS_DELETED)
+        log = ActivityLog.objects.get(pk=log.pk)
+        eq_(log.arguments, [self.app, 'foo'])
+
+    def test_arguments_missing(self):
+        log = mkt.log(mkt.LOG['EDIT_VERSION'], (Webapp, 12345), 'foo')
+        log = ActivityLog.objects.get(pk=log.pk)
+        eq_(log.arguments, ['foo'])
+
+    def test_arguments_setter(self):
+        log = mkt.log(mkt.LOG['EDIT_VERSION'], self.app)
+        eq_(log.arguments, [self.app])
+        log.arguments = [self.user]
+        eq_(log.arguments, [self.user])
+
+    def test_arguments_resolved_in_bulk(self):
+        for x in range(5):
+            mkt.log(mkt.LOG['EDIT_VERSION'], self.app,
+                    self.app.current_version)
+        logs = list(ActivityLog.objects.select_related('user'))
+        eq_(len(logs), 5)
+        with self.assertNumQueries(0):
+            for log in logs:
+                eq_(log.arguments, [self.app, self.app.current_version])
+
+
 @override_settings(DEFAULT_PAYMENT_PROVIDER='bango',
                    PAYMENT_PROVIDERS=['bango'])
 class TestPaymentAccount(Patcher, mkt.site.tests.TestCase):
@@ -154,6 +154,32 @@ def _promo_img_uploader(resize_size, final_size):
     assert not private_storage.exists(src.name)
 
 
+@mock.patch('subprocess.Popen')
+def test_resize_icon_single_pngcrush(mock_popen):
+    mock_popen.return_value.configure_mock(
+        returncode=0, **{'communicate.return_value': ('output', 'error')})
+    dst_name = os.path.join(settings.ADDON_ICONS_PATH, '1234')
+    src = tempfile.NamedTemporaryFile(mode='r+w+b', suffix='.png',
+                                      delete=False)
+    copy_stored_file(get_image_path('mozilla.png'), src.name,
+                     src_storage=local_storage, dst_storage=private_storage)
+
+    val = tasks.resize_icon(src.name, dst_name, [32, 64, 128])
+    eq_(val, {'icon_hash': 'bb362450'})
+    # All the sizes are optimized by a single pngcrush process.
+    eq_(mock_popen.call_count, 1)
+    cmd = mock_popen.call_args[0][0]
+    eq_(cmd[:8], ['pngcrush', '-q', '-rem', 'alla', '-brute', '-reduce',
+                  '-e', '.opti.png'])
+    eq_(len(cmd[8:]), 3)
+    # pngcrush didn't produce anything, so the unoptimized images are kept.
+    for size in (32, 64, 128):
+        dst_image_filename = '%s-%s.png' % (dst_name, size)
+        with public_storage.open(dst_image_filename) as fp:
+            eq_(Image.open(fp).size[0], size)
+        public_storage.delete(dst_image_filename)
+
+
 class TestPngcrushImage(mkt.site.tests.TestCase):
 
     def setUp(self):
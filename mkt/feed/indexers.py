@@ -5,6 +5,7 @@ feed homepage and curation tool search.
 import mkt.carriers
 import mkt.feed.constants as feed
 import mkt.regions
+from mkt.feed.utils import invalidate_feed_cache
 from mkt.search.indexers import BaseIndexer
 from mkt.translations.models import attach_trans_dict
 from mkt.webapps.models import Webapp
@@ -21,6 +22,27 @@ def get_slug_multifield():
     }
 
 
+class FeedCacheIndexerMixin(object):
+    """
+    Invalidate the cached feed responses whenever documents are indexed or
+    unindexed.
+    """
+    @classmethod
+    def bulk_index(cls, *args, **kwargs):
+        super(FeedCacheIndexerMixin, cls).bulk_index(*args, **kwargs)
+        invalidate_feed_cache()
+
+    @classmethod
+    def bulk_unindex(cls, *args, **kwargs):
+        super(FeedCacheIndexerMixin, cls).bulk_unindex(*args, **kwargs)
+        invalidate_feed_cache()
+
+    @classmethod
+    def unindex(cls, *args, **kwargs):
+        super(FeedCacheIndexerMixin, cls).unindex(*args, **kwargs)
+        invalidate_feed_cache()
+
+
 class FeedAppIndexer(BaseIndexer):
     @classmethod
     def get_model(cls):
@@ -215,7 +237,7 @@ class FeedCollectionIndexer(BaseIndexer):
         return doc
 
 
-class FeedShelfIndexer(BaseIndexer):
+class FeedShelfIndexer(FeedCacheIndexerMixin, BaseIndexer):
     @classmethod
     def get_model(cls):
         from mkt.feed.models import FeedShelf
@@ -293,7 +315,7 @@ class FeedShelfIndexer(BaseIndexer):
         return doc
 
 
-class FeedItemIndexer(BaseIndexer):
+class FeedItemIndexer(FeedCacheIndexerMixin, BaseIndexer):
 
     chunk_size = 1000
 
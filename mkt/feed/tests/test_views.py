@@ -2,13 +2,16 @@
 import json
 import os
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 from django.utils.text import slugify
 
 import mock
 from elasticsearch_dsl.search import Search
 from mpconstants import collection_colors as coll_colors
 from nose.tools import eq_, ok_
+from rest_framework.response import Response
 
 import mkt
 import mkt.carriers
@@ -19,9 +22,11 @@ from mkt.constants import applications
 from mkt.feed.models import (FeedApp, FeedBrand, FeedCollection, FeedItem,
                              FeedShelf)
 from mkt.feed.tests.test_models import FeedAppMixin, FeedTestMixin
+from mkt.feed.utils import invalidate_feed_cache
 from mkt.feed.views import FeedView
 from mkt.fireplace.tests.test_views import assert_fireplace_app
 from mkt.operators.models import OperatorPermission
+from mkt.search.utils import multi_search
 from mkt.site.fixtures import fixture
 from mkt.site.tests import app_factory, ESTestCase, TestCase
 from mkt.tags.models import Tag
@@ -1262,6 +1267,13 @@ class TestFeedShelfPublishView(BaseTestFeedItemViewSet,
             mkt.regions.REGIONS_CHOICES_ID_DICT[self.shelf.region].slug)
         eq_(data['shelf']['id'], self.shelf.id)
 
+    @mock.patch('mkt.feed.views.invalidate_feed_cache')
+    def test_publish_invalidates_feed_cache(self, invalidate_mock):
+        self.feed_permission()
+        res = self.client.put(self.url)
+        eq_(res.status_code, 201)
+        ok_(invalidate_mock.called)
+
     def test_publish_anon(self):
         res = self.client.put(self.url)
         json.loads(res.content)
@@ -1368,6 +1380,9 @@ class TestFeedView(BaseTestFeedESView, BaseTestFeedItemViewSet):
         eq_(len(data['objects']), len(feed_items))
         eq_(len(data['websites']), 0)
         ok_(statsd_mock.called)
+        timers = [args[0] for args, kwargs in statsd_mock.call_args_list]
+        ok_('mkt.feed.view.feed_query' in timers)
+        ok_('mkt.feed.view.feed_website_query' in timers)
         return res, data
 
     def test_200_authed(self):
@@ -1410,6 +1425,96 @@ class TestFeedView(BaseTestFeedESView, BaseTestFeedItemViewSet):
         eq_(tags.count('featured-website-restofworld'), 6)
         eq_(tags.count('featured-website'), 5)
 
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cache(self):
+        self.feed_factory()
+        res, data = self._get()
+        eq_(res.status_code, 200)
+        with mock.patch('mkt.feed.views.FeedView._get') as _get:
+            res, cached_data = self._get()
+        ok_(not _get.called)
+        eq_(res.status_code, 200)
+        eq_(cached_data, data)
+
+        # A different carrier is a different feed.
+        with mock.patch('mkt.feed.views.FeedView._get') as _get:
+            _get.return_value = Response(status=404)
+            res, data = self._get(carrier='vimpelcom')
+        ok_(_get.called)
+        eq_(res.status_code, 404)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cache_stale_while_rebuilding(self):
+        self.feed_factory()
+        res, data = self._get()
+        invalidate_feed_cache()
+
+        # Another request is already rebuilding the feed: serve stale data.
+        with mock.patch('mkt.feed.utils.cache.add') as add:
+            add.return_value = False
+            with mock.patch('mkt.feed.views.FeedView._get') as _get:
+                res, stale_data = self._get()
+        ok_(not _get.called)
+        eq_(stale_data, data)
+
+        # Otherwise the feed is rebuilt.
+        with mock.patch('mkt.feed.views.FeedView._get') as _get:
+            _get.return_value = Response({'objects': []})
+            res, data = self._get()
+        ok_(_get.called)
+        eq_(data, {'objects': []})
+
+    @override_settings(FEED_CACHE_TIMEOUT=60, FEED_CACHE_REBUILD_WAIT=0)
+    @mock.patch('mkt.feed.utils.cache.delete')
+    @mock.patch('mkt.feed.utils.cache.add')
+    def test_cache_cold_miss_while_rebuilding(self, add, delete):
+        # Another request is already rebuilding the feed and there is no
+        # stale data: neither rebuild it too nor release the other's lock.
+        add.return_value = False
+        with mock.patch('mkt.feed.views.FeedView._get') as _get:
+            res, data = self._get()
+        ok_(not _get.called)
+        ok_(not delete.called)
+        eq_(res.status_code, 503)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    @mock.patch('mkt.feed.utils.time.sleep')
+    def test_cache_cold_miss_waits_for_rebuild(self, sleep):
+        self.feed_factory()
+        res, data = self._get()
+
+        # The response isn't cached yet when the request comes in, and
+        # another request rebuilds it meanwhile.
+        real_get = cache.get
+        missed = []
+
+        def get(key, *args, **kwargs):
+            if key.startswith('feed:response:') and not missed:
+                missed.append(key)
+                return None
+            return real_get(key, *args, **kwargs)
+
+        with mock.patch('mkt.feed.utils.cache.get', side_effect=get):
+            with mock.patch('mkt.feed.utils.cache.add') as add:
+                add.return_value = False
+                with mock.patch('mkt.feed.views.FeedView._get') as _get:
+                    res, waited_data = self._get()
+        ok_(not _get.called)
+        eq_(sleep.call_count, 1)
+        eq_(res.status_code, 200)
+        eq_(waited_data, data)
+
+    @mock.patch('mkt.feed.views.multi_search', wraps=multi_search)
+    def test_feed_and_websites_single_request(self, multi_search_mock):
+        self.feed_factory()
+        self.featured_mow_factory(n_row=1)
+        res, data = self._get(region='us')
+        eq_(res.status_code, 200)
+        eq_(len(data['websites']), 0)
+        eq_(multi_search_mock.call_count, 1)
+        # Region feed, RESTOFWORLD fallback feed and featured websites.
+        eq_(len(multi_search_mock.call_args[0][1]), 3)
+
     def test_websites_prefer_regional(self):
         """
         Ensure that all regionally featured websites are returned before any
@@ -0,0 +1,86 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework import status as http_status
+
+from mkt.site.utils import cache_ns_key
+
+
+FEED_CACHE_NAMESPACE = 'feed'
+# How long, in seconds, to sleep between checks for a feed being rebuilt.
+FEED_CACHE_POLL_INTERVAL = 0.1
+
+
+def get_feed_cache_version():
+    """Return the current version of the feed cache."""
+    return cache_ns_key(FEED_CACHE_NAMESPACE)
+
+
+def invalidate_feed_cache():
+    """
+    Mark every cached feed response as stale. Stale responses are still
+    served while they are being rebuilt, see `get_cached_feed`.
+    """
+    cache_ns_key(FEED_CACHE_NAMESPACE, increment=True)
+
+
+def get_feed_cache_key(*parts):
+    return 'feed:response:%s' % hashlib.md5(
+        u':'.join(map(unicode, parts)).encode('utf-8')).hexdigest()
+
+
+def get_cached_feed(key, rebuild):
+    """
+    Return a (status, data) tuple for the feed response cached under `key`,
+    calling `rebuild` to build it when needed.
+
+    Responses are fresh for settings.FEED_CACHE_TIMEOUT seconds or until the
+    feed cache is invalidated. Only one request at a time calls `rebuild`,
+    so that a cache invalidation, expiration or eviction during a traffic
+    spike doesn't hammer ES. While it runs, the other requests get the stale
+    response, kept for settings.FEED_CACHE_STALE_TIMEOUT more seconds. If
+    there is none, they wait up to settings.FEED_CACHE_REBUILD_WAIT seconds
+    for the rebuilt one and get a 503 if it isn't there by then.
+    """
+    version = get_feed_cache_version()
+    lock_key = '%s:rebuild' % key
+    cached = cache.get(key)
+    if cached is not None:
+        cached_version, fresh_until, status, data = cached
+        if cached_version == version and time.time() < fresh_until:
+            return status, data
+
+    if not cache.add(lock_key, 1, settings.FEED_CACHE_TIMEOUT):
+        # Another request is rebuilding the feed.
+        if cached is None:
+            cached = _wait_for_feed(key)
+        if cached is None:
+            return http_status.HTTP_503_SERVICE_UNAVAILABLE, None
+        return cached[2], cached[3]
+
+    try:
+        status, data = rebuild()
+        cache.set(key,
+                  (version, time.time() + settings.FEED_CACHE_TIMEOUT, status,
+                   data),
+                  settings.FEED_CACHE_TIMEOUT +
+                  settings.FEED_CACHE_STALE_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return status, data
+
+
+def _wait_for_feed(key):
+    """
+    Poll the cache for the feed response under `key` for up to
+    settings.FEED_CACHE_REBUILD_WAIT seconds. Return None if it's not there.
+    """
+    deadline = time.time() + settings.FEED_CACHE_REBUILD_WAIT
+    while time.time() < deadline:
+        time.sleep(FEED_CACHE_POLL_INTERVAL)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
@@ -14,6 +14,7 @@ from django.conf import settings
 from django.core.files.base import File
 from django.db.models import Q
 from django.db.transaction import non_atomic_requests
+from django.utils import translation
 from django.utils.datastructures import MultiValueDictKeyError
 from django.http import Http404
 from django.views.decorators.cache import cache_control
@@ -39,6 +40,7 @@ from mkt.api.authentication import (RestAnonymousAuthentication,
                                     RestSharedSecretAuthentication)
 from mkt.api.base import CORSMixin, MarketplaceView, SlugOrIdMixin
 from mkt.api.permissions import AllowReadOnly, AnyOf, GroupPermission
+from mkt.constants.applications import get_device_id
 from mkt.constants.carriers import CARRIER_MAP
 from mkt.constants.regions import REGIONS_DICT
 from mkt.developers.tasks import pngcrush_image
@@ -46,6 +48,8 @@ from mkt.feed.indexers import FeedItemIndexer
 from mkt.operators.models import OperatorPermission
 from mkt.search.filters import (DeviceTypeFilter, ProfileFilter,
                                 PublicContentFilter, RegionFilter)
+from mkt.features.utils import load_feature_profile
+from mkt.search.utils import multi_search
 from mkt.site.storage_utils import public_storage
 from mkt.site.utils import get_file_response
 from mkt.webapps.indexers import WebappIndexer
@@ -55,6 +59,7 @@ from mkt.websites.serializers import ESWebsiteSerializer
 
 from .models import FeedApp, FeedBrand, FeedCollection, FeedItem, FeedShelf
 from .permissions import FeedPermission
+from .utils import get_cached_feed, get_feed_cache_key, invalidate_feed_cache
 from .serializers import (FeedAppESSerializer, FeedAppSerializer,
                           FeedBrandESSerializer, FeedBrandSerializer,
                           FeedCollectionESSerializer, FeedCollectionSerializer,
@@ -530,6 +535,7 @@ class FeedShelfPublishView(FeedShelfPermissionMixin, CORSMixin, APIView):
         FeedItem.objects.filter(**feed_item_kwargs).delete()
         feed_item = FeedItem.objects.create(shelf_id=shelf.id,
                                             **feed_item_kwargs)
+        invalidate_feed_cache()
 
         # Return.
         serializer = FeedItemSerializer(feed_item, context={
@@ -550,6 +556,7 @@ class FeedShelfPublishView(FeedShelfPermissionMixin, CORSMixin, APIView):
             'region': shelf.region
         }
         FeedItem.objects.filter(**feed_item_kwargs).delete()
+        invalidate_feed_cache()
 
         # Return.
         return response.Response(status=status.HTTP_204_NO_CONTENT)
@@ -801,7 +808,8 @@ class FeedElementSearchView(BaseFeedESView):
 class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
     """
     THE feed view. It hits ES with:
-    - a weighted function score query to get feed items
+    - a weighted function score query to get feed items, sent along with the
+      RESTOFWORLD fallback query and the featured websites query
     - a filter to deserialize feed elements
     - a filter to deserialize apps
     """
@@ -884,10 +892,11 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
         """
         return int(datetime.now().strftime('%Y%m%d'))
 
-    def get_featured_websites(self):
+    def get_featured_websites_query(self):
         """
-        Get up to 11 featured MOWs for the request's region. If less than 11
-        are available, make up the difference with globally-featured MOWs.
+        Build ES query for up to 11 featured MOWs for the request's region.
+        If less than 11 are available, make up the difference with
+        globally-featured MOWs.
         """
         REGION_TAG = 'featured-website-%s' % self.request.REGION.slug
         region_filter = es_filter.Term(tags=REGION_TAG)
@@ -901,65 +910,30 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
                 es_function.BoostFactor(value=100.0, filter=region_filter)
             ],
         )
-        es = Search(using=WebsiteIndexer.get_es())[:11]
-        results = es.query(mow_query).execute().hits
-        return ESWebsiteSerializer(results, many=True).data
+        es = Search(using=WebsiteIndexer.get_es(),
+                    index=WebsiteIndexer.get_index())[:11]
+        return es.query(mow_query)
 
-    def _check_empty_feed(self, items, rest_of_world):
+    def get_featured_websites(self, results=None):
         """
-        Return -1 if feed is empty and we are already falling back to RoW.
-        Return 0 if feed is empty and we are not falling back to RoW yet.
-        Return 1 if at least one feed item and the only feed item is not shelf.
+        Get the serialized featured MOWs. `results` is the response to the
+        query from get_featured_websites_query(), if already executed.
         """
-        if not items or (len(items) == 1 and items[0].get('shelf')):
-            # Empty feed.
-            if rest_of_world:
-                return -1
-            return 0
-        return 1
-
-    def _handle_empty_feed(self, empty_feed_code, region, request, args,
-                           kwargs):
+        if results is None:
+            results = self.get_featured_websites_query().execute()
+        return ESWebsiteSerializer(results.hits, many=True).data
+
+    def _check_empty_feed(self, items):
         """
-        If feed is empty, this method handles appropriately what to return.
-        If empty_feed_code == 0: try to fallback to RoW.
-        If empty_feed_code == -1: 404.
+        Return False if feed is empty or if the only feed item is a shelf.
         """
-        if empty_feed_code == 0:
-            return self._get(request, rest_of_world=True,
-                             original_region=region, *args, **kwargs)
-        return response.Response(status=status.HTTP_404_NOT_FOUND)
-
-    def _get(self, request, rest_of_world=False, original_region=None,
-             *args, **kwargs):
-        es = FeedItemIndexer.get_es()
-
-        # Parse region.
-        if rest_of_world:
-            region = mkt.regions.RESTOFWORLD.id
-        else:
-            region = request.REGION.id
-        # Parse carrier.
-        carrier = None
-        q = request.query_params
-        if q.get('carrier') and q['carrier'] in mkt.carriers.CARRIER_MAP:
-            carrier = mkt.carriers.CARRIER_MAP[q['carrier']].id
-
-        # Fetch FeedItems.
-        sq = self.get_es_feed_query(FeedItemIndexer.search(using=es),
-                                    region=region, carrier=carrier,
-                                    original_region=original_region)
-        # The paginator triggers the ES request.
-        with statsd.timer('mkt.feed.view.feed_query'):
-            feed_items = self.paginate_queryset(sq)
-        feed_ok = self._check_empty_feed(feed_items, rest_of_world)
-        if feed_ok != 1:
-            return self._handle_empty_feed(feed_ok, region, request, args,
-                                           kwargs)
-
-        # Build the meta object.
-        meta = (self.paginator.get_paginated_response(feed_items).data['meta'])
+        return bool(items) and not (len(items) == 1 and items[0].get('shelf'))
 
+    def _serialize_feed_items(self, request, es, feed_items):
+        """
+        Fetch the feed elements and apps for `feed_items`, serialize them and
+        filter out feed items without enough apps.
+        """
         # Set up serializer context.
         feed_element_map = {
             feed.FEED_TYPE_APP: {},
@@ -996,27 +970,95 @@ class FeedView(MarketplaceView, BaseFeedESView, generics.GenericAPIView):
 
         # Filter excluded apps. If there are feed items that have all their
         # apps excluded, they will be removed from the feed.
-        feed_items = self.filter_feed_items(request, feed_items)
-        feed_ok = self._check_empty_feed(feed_items, rest_of_world)
-        if feed_ok != 1:
-            if not rest_of_world:
-                log.warning('Feed empty for region {0}. Requerying feed with '
-                            'region=RESTOFWORLD'.format(region))
-            return self._handle_empty_feed(feed_ok, region, request, args,
-                                           kwargs)
-
-        with statsd.timer('mkt.feed.view.feed_website_query'):
-            websites = self.get_featured_websites()
-
-        return response.Response({
-            'meta': meta,
-            'objects': feed_items,
-            'websites': websites
-        }, status=status.HTTP_200_OK)
+        return self.filter_feed_items(request, feed_items)
+
+    def _get(self, request, *args, **kwargs):
+        es = FeedItemIndexer.get_es()
+
+        # Parse region.
+        region = request.REGION.id
+        # Parse carrier.
+        carrier = None
+        q = request.query_params
+        if q.get('carrier') and q['carrier'] in mkt.carriers.CARRIER_MAP:
+            carrier = mkt.carriers.CARRIER_MAP[q['carrier']].id
+
+        # Build the FeedItems queries: one for the region and, if the feed
+        # for that region turns out to be empty, one for RESTOFWORLD that
+        # keeps the original region shelf atop the feed.
+        feed_queries = [self.paginator.get_search_page(
+            self.get_es_feed_query(FeedItemIndexer.search(using=es),
+                                   region=region, carrier=carrier), request)]
+        if region != mkt.regions.RESTOFWORLD.id:
+            feed_queries.append(self.paginator.get_search_page(
+                self.get_es_feed_query(FeedItemIndexer.search(using=es),
+                                       region=mkt.regions.RESTOFWORLD.id,
+                                       carrier=carrier,
+                                       original_region=region), request))
+
+        # Fetch FeedItems and the featured websites, which don't depend on
+        # each other, in a single request.
+        with statsd.timer('mkt.feed.view.feed_query'):
+            results = multi_search(
+                es, feed_queries + [self.get_featured_websites_query()])
+        website_results = results.pop()
+
+        for rest_of_world, feed_results in enumerate(results):
+            feed_items = self.paginator.paginate_search_response(feed_results)
+            if not self._check_empty_feed(feed_items):
+                # Empty feed, fall back to RESTOFWORLD.
+                continue
+
+            # Build the meta object.
+            meta = (self.paginator.get_paginated_response(feed_items)
+                    .data['meta'])
+
+            feed_items = self._serialize_feed_items(request, es, feed_items)
+            if not self._check_empty_feed(feed_items):
+                if not rest_of_world:
+                    log.warning('Feed empty for region {0}. Requerying feed '
+                                'with region=RESTOFWORLD'.format(region))
+                continue
+
+            with statsd.timer('mkt.feed.view.feed_website_query'):
+                websites = self.get_featured_websites(website_results)
+
+            return response.Response({
+                'meta': meta,
+                'objects': feed_items,
+                'websites': websites
+            }, status=status.HTTP_200_OK)
+
+        return response.Response(status=status.HTTP_404_NOT_FOUND)
+
+    def get_cache_key(self, request):
+        """
+        Return the key of the cached response for this request. The feed is
+        the same for every request with the same region, carrier, device,
+        feature profile, language and pagination.
+        """
+        q = request.query_params
+        load_feature_profile(request)
+        profile = (request.feature_profile.to_signature()
+                   if request.feature_profile else None)
+        return get_feed_cache_key(
+            request.REGION.id, q.get('carrier'), get_device_id(request),
+            profile, translation.get_language(), q.get('filtering', '1'),
+            q.get('limit'), q.get('offset'), self._get_daily_seed())
 
     def get(self, request, *args, **kwargs):
         with statsd.timer('mkt.feed.view'):
-            return self._get(request, *args, **kwargs)
+            if not settings.FEED_CACHE_TIMEOUT:
+                return self._get(request, *args, **kwargs)
+
+            def rebuild():
+                statsd.incr('mkt.feed.view.cache_rebuild')
+                res = self._get(request, *args, **kwargs)
+                return res.status_code, res.data
+
+            status_code, data = get_cached_feed(self.get_cache_key(request),
+                                                rebuild)
+            return response.Response(data, status=status_code)
 
 
 class FeedElementGetView(BaseFeedESView):
@@ -1201,7 +1201,8 @@ class TestActivity(mkt.site.tests.TestCase):
 
     def test_display(self):
         mkt.log(mkt.LOG.PURCHASE_ADDON, self.app, user=self.user)
-        mkt.log(mkt.LOG.ADMIN_USER_EDITED, self.user, 'spite', user=self.user)
+        mkt.log(mkt.LOG.ADMIN_USER_EDITED, self.user, 'spite', user=self.user,
+                created=self.days_ago(1))
         self.login(self.reviewer)
         res = self.client.get(self.url)
         eq_(res.status_code, 200)
@@ -1209,6 +1210,22 @@ class TestActivity(mkt.site.tests.TestCase):
         assert 'purchased' in doc('li.item').eq(0).text()
         assert 'edited' in doc('li.item').eq(1).text()
 
+    def test_pagination(self):
+        for x in range(51):
+            mkt.log(mkt.LOG.PURCHASE_ADDON, self.app, user=self.user)
+        self.login(self.reviewer)
+        res = self.client.get(self.url)
+        eq_(res.status_code, 200)
+        doc = pq(res.content)
+        eq_(len(doc('#activity-info ol').eq(0)('li.item')), 50)
+        next_url = doc('.paginator .next').eq(0).attr('href')
+        ok_('before=' in next_url)
+
+        res = self.client.get(next_url)
+        eq_(res.status_code, 200)
+        doc = pq(res.content)
+        eq_(len(doc('#activity-info ol').eq(0)('li.item')), 1)
+
 
 class TestAppActivity(mkt.site.tests.TestCase):
     fixtures = fixture('webapp_337141', 'users')
@@ -42,7 +42,7 @@ from mkt.reviewers.models import QUEUE_TARAKO
 from mkt.search.filters import SearchQueryFilter
 from mkt.search.views import SearchView
 from mkt.site.decorators import json_view, permission_required
-from mkt.site.utils import paginate
+from mkt.site.utils import keyset_paginate, paginate
 from mkt.tags.models import attach_tags
 from mkt.users.models import UserProfile
 from mkt.webapps.models import Webapp
@@ -376,8 +376,9 @@ def app_activity(request, addon_id):
     admin_items = ActivityLog.objects.for_apps([app]).filter(
         action__in=mkt.LOG_HIDE_DEVELOPER)
 
-    user_items = paginate(request, user_items, per_page=20)
-    admin_items = paginate(request, admin_items, per_page=20)
+    user_items = keyset_paginate(request, user_items, per_page=20)
+    admin_items = keyset_paginate(request, admin_items, per_page=20,
+                                  param='admin_before')
 
     return render(request, 'lookup/app_activity.html', {
         'admin_items': admin_items, 'app': app, 'user_items': user_items})
@@ -414,11 +415,14 @@ def user_activity(request, user_id):
     products = purchase_list(request, user)
     is_admin = acl.action_allowed(request, 'Users', 'Edit')
 
-    user_items = ActivityLog.objects.for_user(user).exclude(
-        action__in=mkt.LOG_HIDE_DEVELOPER)
-    admin_items = ActivityLog.objects.for_user(user).filter(
-        action__in=mkt.LOG_HIDE_DEVELOPER)
     mkt.log(mkt.LOG.ADMIN_VIEWED_LOG, request.user, user=user)
+    user_items = keyset_paginate(
+        request, ActivityLog.objects.for_user(user).exclude(
+            action__in=mkt.LOG_HIDE_DEVELOPER), per_page=50)
+    admin_items = keyset_paginate(
+        request, ActivityLog.objects.for_user(user).filter(
+            action__in=mkt.LOG_HIDE_DEVELOPER), per_page=50,
+        param='admin_before')
     return render(request, 'lookup/user_activity.html',
                   {'pager': products, 'account': user, 'is_admin': is_admin,
                    'single': bool(None),
@@ -1,8 +1,19 @@
 import datetime
 import hashlib
 import json
+import logging
+import threading
+import time
 
-from django.db import models
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, models
+
+from celery.signals import task_postrun
+from django_statsd.clients import statsd
+
+
+log = logging.getLogger('z.monolith')
 
 
 class MonolithRecord(models.Model):
@@ -33,8 +44,72 @@ def get_user_hash(request):
     return hashlib.sha1('-'.join(map(str, (ip, ua, session_key)))).hexdigest()
 
 
+class RecordBuffer(object):
+    """Per-process buffer of MonolithRecords waiting to be written.
+
+    Records are written with a single bulk insert when there are
+    settings.MONOLITH_BUFFER_FLUSH_SIZE of them, when the oldest one has
+    waited for settings.MONOLITH_BUFFER_FLUSH_INTERVAL seconds, or at the end
+    of the request or task. Records added while
+    settings.MONOLITH_BUFFER_MAX_SIZE of them are waiting are dropped.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.oldest = None
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            if len(self.records) >= settings.MONOLITH_BUFFER_MAX_SIZE:
+                statsd.incr('monolith.record.dropped')
+                return False
+            self.records.append(record)
+            if self.oldest is None:
+                self.oldest = time.time()
+            should_flush = (
+                len(self.records) >= settings.MONOLITH_BUFFER_FLUSH_SIZE or
+                time.time() - self.oldest >=
+                settings.MONOLITH_BUFFER_FLUSH_INTERVAL)
+        if should_flush:
+            self.flush()
+        return True
+
+    def flush(self):
+        with self.lock:
+            records, self.records = self.records, []
+            self.oldest = None
+        if not records:
+            return
+        try:
+            with statsd.timer('monolith.record.flush'):
+                MonolithRecord.objects.bulk_create(records)
+        except DatabaseError:
+            log.exception('Could not write %s monolith records.'
+                          % len(records))
+            statsd.incr('monolith.record.dropped', len(records))
+        else:
+            statsd.incr('monolith.record.written', len(records))
+
+
+record_buffer = RecordBuffer()
+
+
+def _flush_record_buffer(**kwargs):
+    record_buffer.flush()
+
+
+request_finished.connect(_flush_record_buffer,
+                         dispatch_uid='monolith_request_finished')
+task_postrun.connect(_flush_record_buffer,
+                     dispatch_uid='monolith_task_postrun')
+
+
 def record_stat(key, request, **data):
-    """Create a new record in the database with the given values.
+    """Create a new record with the given values.
+
+    The record is buffered and written to the database later, see
+    RecordBuffer.
 
     :param key:
         The type of stats you're sending, e.g. "app.install".
@@ -57,5 +132,5 @@ def record_stat(key, request, **data):
 
     record = MonolithRecord(key=key, user_hash=get_user_hash(request),
                             recorded=recorded, value=json.dumps(data))
-    record.save()
+    record_buffer.add(record)
     return record
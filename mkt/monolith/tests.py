@@ -6,14 +6,18 @@ from collections import namedtuple
 import mock
 from nose.tools import eq_, ok_
 
+from django.core.signals import request_finished
 from django.core.urlresolvers import reverse
 from django.test import client
+from django.test.utils import override_settings
 
 from mkt.api.tests.test_oauth import RestOAuth
-from mkt.monolith.models import MonolithRecord, record_stat
-from mkt.monolith.views import daterange
+from mkt.monolith.models import MonolithRecord, record_buffer, record_stat
+from mkt.monolith.views import _get_query_result, daterange
+from mkt.ratings.models import Review
 from mkt.site.fixtures import fixture
-from mkt.site.tests import TestCase
+from mkt.site.tests import app_factory, TestCase
+from mkt.users.models import UserProfile
 
 
 class RequestFactory(client.RequestFactory):
@@ -64,6 +68,40 @@ class TestModels(TestCase):
         with self.assertRaises(ValueError):
             record_stat('app.install', self.request)
 
+    @override_settings(MONOLITH_BUFFER_FLUSH_SIZE=3,
+                       MONOLITH_BUFFER_FLUSH_INTERVAL=60)
+    def test_record_stat_buffered(self):
+        record_stat('app.install', self.request, value=1)
+        record_stat('app.install', self.request, value=2)
+        eq_(MonolithRecord.objects.count(), 0)
+
+        with self.assertNumQueries(1):
+            record_stat('app.install', self.request, value=3)
+        eq_(MonolithRecord.objects.count(), 3)
+
+    @override_settings(MONOLITH_BUFFER_FLUSH_SIZE=10,
+                       MONOLITH_BUFFER_FLUSH_INTERVAL=60)
+    def test_record_stat_flushed_at_request_finished(self):
+        record_stat('app.install', self.request, value=1)
+        record_stat('app.install', self.request, value=2)
+        eq_(MonolithRecord.objects.count(), 0)
+
+        request_finished.send(sender=self.__class__)
+        eq_(sorted(MonolithRecord.objects.values_list('value', flat=True)),
+            [json.dumps({'value': 1}), json.dumps({'value': 2})])
+
+    @override_settings(MONOLITH_BUFFER_FLUSH_SIZE=10,
+                       MONOLITH_BUFFER_FLUSH_INTERVAL=60,
+                       MONOLITH_BUFFER_MAX_SIZE=1)
+    @mock.patch('mkt.monolith.models.statsd')
+    def test_record_stat_buffer_full(self, statsd):
+        record_stat('app.install', self.request, value=1)
+        record_stat('app.install', self.request, value=2)
+        statsd.incr.assert_called_with('monolith.record.dropped')
+
+        record_buffer.flush()
+        eq_(MonolithRecord.objects.get().value, json.dumps({'value': 1}))
+
 
 class TestMonolithResource(RestOAuth):
     fixtures = fixture('user_2519')
@@ -225,3 +263,55 @@ class TestDateRange(TestCase):
         eq_(len(range), 7)
         eq_(range[0], self.week_ago)
         ok_(self.today not in range)
+
+
+class TestGetQueryResult(TestCase):
+    fixtures = fixture('user_2519', 'user_999')
+
+    def setUp(self):
+        self.app1 = app_factory()
+        self.app2 = app_factory()
+        self.today = datetime.date.today()
+        self.start = self.today - datetime.timedelta(days=3)
+        self.user1 = UserProfile.objects.get(pk=2519)
+        self.user2 = UserProfile.objects.get(pk=999)
+
+    def review(self, app, user, rating, days_ago):
+        review = Review.objects.create(addon=app, user=user, rating=rating)
+        review.update(created=self.days_ago(days_ago))
+        return review
+
+    def values(self, data):
+        return [(d['recorded'], d['value']['app-id'], d['value']['count'])
+                for d in data]
+
+    def test_slice(self):
+        self.review(self.app1, self.user1, 5, 5)
+        self.review(self.app1, self.user1, 5, 2)
+        self.review(self.app1, self.user2, 4, 2)
+        self.review(self.app2, self.user1, 1, 1)
+
+        with self.assertNumQueries(1):
+            data = _get_query_result('apps_ratings', self.start, self.today)
+        eq_(self.values(data), [
+            (self.start + datetime.timedelta(days=1), self.app1.pk, 2),
+            (self.start + datetime.timedelta(days=2), self.app2.pk, 1),
+        ])
+        eq_(data[0]['key'], 'apps_ratings')
+        eq_(data[0]['user_hash'], None)
+
+    def test_total(self):
+        self.review(self.app1, self.user1, 5, 5)
+        self.review(self.app1, self.user2, 2, 2)
+        self.review(self.app2, self.user1, 1, 1)
+
+        with self.assertNumQueries(2):
+            data = _get_query_result('apps_average_rating', self.start,
+                                     self.today)
+        day = lambda n: self.start + datetime.timedelta(days=n)
+        eq_(self.values(data), [
+            (day(0), self.app1.pk, 5.0),
+            (day(1), self.app1.pk, 3.5),
+            (day(2), self.app1.pk, 3.5),
+            (day(2), self.app2.pk, 1.0),
+        ])
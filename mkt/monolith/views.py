@@ -1,7 +1,9 @@
 import datetime
 import logging
+from collections import defaultdict
 
-from django.db.models import Avg, Count
+from django.db import connection
+from django.db.models import Count, Sum
 from rest_framework import status
 from rest_framework.exceptions import ParseError
 from rest_framework.generics import ListAPIView
@@ -22,35 +24,22 @@ log = logging.getLogger('z.monolith')
 
 # TODO: Move the stats that can be calculated on the fly from
 # apps/stats/tasks.py here.
+#
+# 'slice' stats count the objects created each day, per app. 'total' stats
+# average `field` over all the objects created up until each day, per app.
 STATS = {
     'apps_ratings': {
-        'qs': Review.objects
-        .filter(editorreview=0)
-        .values('addon')
-        .annotate(count=Count('addon')),
+        'qs': Review.objects.filter(editorreview=0),
         'type': 'slice',
-        'field_map': {
-            'count': 'count',
-            'app-id': 'addon'},
     },
     'apps_average_rating': {
-        'qs': Review.objects
-        .filter(editorreview=0)
-        .values('addon')
-        .annotate(avg=Avg('rating')),
+        'qs': Review.objects.filter(editorreview=0),
         'type': 'total',
-        'field_map': {
-            'count': 'avg',
-            'app-id': 'addon'},
+        'field': 'rating',
     },
     'apps_abuse_reports': {
-        'qs': AbuseReport.objects
-        .values('addon')
-        .annotate(count=Count('addon')),
+        'qs': AbuseReport.objects.all(),
         'type': 'slice',
-        'field_map': {
-            'count': 'count',
-            'app-id': 'addon'},
     }
 }
 
@@ -60,10 +49,34 @@ def daterange(start, end):
         yield start + datetime.timedelta(n)
 
 
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, basestring):
+        return datetime.datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
+
+def _group_by_day(qs, **aggregates):
+    """
+    Return the `aggregates` of `qs` for each day and app, as dicts with `day`,
+    `addon` and the aggregates names as keys, in a single query.
+    """
+    created = '%s.%s' % (connection.ops.quote_name(qs.model._meta.db_table),
+                         connection.ops.quote_name('created'))
+    day = connection.ops.date_trunc_sql('day', created)
+    rows = (qs.extra(select={'day': day})
+              .values('day', 'addon').annotate(**aggregates).order_by())
+    for row in rows:
+        row['day'] = _to_date(row['day'])
+        yield row
+
+
 def _get_query_result(key, start, end):
     # To do on-the-fly queries we have to produce results as if they
-    # were calculated daily, which means we need to iterate over each
-    # day in the range and perform an aggregation on this date.
+    # were calculated daily. Instead of performing an aggregation for each
+    # day in the range, we aggregate by day and app in one query and
+    # compute the running totals here.
 
     data = []
     today = datetime.date.today()
@@ -74,28 +87,47 @@ def _get_query_result(key, start, end):
         raise ParseError('`start` was not provided')
     if not end:
         end = today
+    start, end = _to_date(start), _to_date(end)
 
-    for day in daterange(start, end):
-        if stat['type'] == 'total':
-            # If it's a totalling queryset, we want to filter by the
-            # end date until the beginning of time to get the total
-            # objects up until this point in time.
-            date_filtered = stat['qs'].filter(
-                created__lt=(day + datetime.timedelta(days=1)))
-        else:
-            # Otherwise, we want to filter by both start/end to get
-            # counts on a specific day.
-            date_filtered = stat['qs'].filter(
-                created__gte=day,
-                created__lt=(day + datetime.timedelta(days=1)))
-
-        data.extend([{
+    def _record(day, app_id, count):
+        return {
             'key': key,
             'recorded': day,
             'user_hash': None,
-            'value': {'count': d.get(stat['field_map']['count']),
-                      'app-id': d.get(stat['field_map']['app-id'])}}
-                     for d in date_filtered])
+            'value': {'count': count, 'app-id': app_id}}
+
+    if stat['type'] == 'total':
+        # If it's a totalling stat, we want the objects from the beginning of
+        # time up until each day. Start with the totals before the range...
+        field = stat['field']
+        totals = dict(
+            (row['addon'], (row['sum'], row['count'])) for row in
+            stat['qs'].filter(created__lt=start).values('addon')
+                      .annotate(sum=Sum(field), count=Count(field))
+                      .order_by())
+        # ...then add each day of the range to them.
+        by_day = defaultdict(list)
+        for row in _group_by_day(
+                stat['qs'].filter(created__gte=start, created__lt=end),
+                sum=Sum(field), count=Count(field)):
+            by_day[row['day']].append(row)
+
+        for day in daterange(start, end):
+            for row in by_day.get(day, []):
+                total, count = totals.get(row['addon'], (0, 0))
+                totals[row['addon']] = (total + row['sum'],
+                                        count + row['count'])
+            data.extend(_record(day, app_id, float(total) / count)
+                        for app_id, (total, count) in sorted(totals.items())
+                        if count)
+    else:
+        # Otherwise, we want the counts on each specific day.
+        rows = _group_by_day(
+            stat['qs'].filter(created__gte=start, created__lt=end),
+            count=Count('addon'))
+        data.extend(_record(row['day'], row['addon'], row['count'])
+                    for row in sorted(rows, key=lambda row: (row['day'],
+                                                             row['addon'])))
 
     return data
 
@@ -1,3 +1,5 @@
+import threading
+import time
 import uuid
 
 from django.conf import settings
@@ -15,6 +17,7 @@ from django.utils.translation import ugettext_lazy as _
 
 import mkt
 from lib.constants import ALL_CURRENCIES
+from lib.utils import purchase_cache_key
 from mkt.constants import apps
 from mkt.constants.payments import (CARRIER_CHOICES, PAYMENT_METHOD_ALL,
                                     PAYMENT_METHOD_CHOICES, PROVIDER_CHOICES,
@@ -49,11 +52,95 @@ def price_key(data):
             .format(**data))
 
 
-class PriceManager(ManagerBase):
+PRICE_MATRIX_VERSION_KEY = 'prices:matrix:version'
+PRICE_MATRIX_KEY = 'prices:matrix:%s'
+
+
+class PriceMatrix(object):
+    """
+    A process-wide lookup table of every price currency, keyed by tier,
+    carrier, region and provider.
 
-    def get_queryset(self):
-        qs = super(PriceManager, self).get_queryset()
-        return qs.transform(Price.transformer)
+    There are a constrained number of price currencies, so they are loaded
+    once and shared between processes through the cache under a version key.
+    Saving or deleting a price tier or a price currency bumps the version and
+    every process reloads the table the next time it checks the version.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop the local copy of the table so the next lookup reloads it."""
+        self.version = None
+        self.checked = 0
+        self.currencies = {}
+        self.tiers = {}
+
+    def invalidate(self):
+        """Bump the shared version and drop the local copy of the table."""
+        cache.set(PRICE_MATRIX_VERSION_KEY, uuid.uuid4().hex, None)
+        self.reset()
+
+    def current_version(self):
+        version = cache.get(PRICE_MATRIX_VERSION_KEY)
+        if version is None:
+            cache.add(PRICE_MATRIX_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(PRICE_MATRIX_VERSION_KEY)
+        return version
+
+    def load(self, version):
+        key = PRICE_MATRIX_KEY % version
+        data = cache.get(key)
+        if data is None:
+            active = set(Price.objects.filter(active=True)
+                                      .values_list('id', flat=True))
+            data = (active, list(PriceCurrency.objects.order_by('id')))
+            cache.set(key, data, settings.PRICE_MATRIX_TIMEOUT)
+
+        active, rows = data
+        currencies, tiers = {}, {}
+        for row in rows:
+            row_data = model_to_dict(row)
+            tiers.setdefault(row.tier_id, []).append(row_data)
+            if row.tier_id in active:
+                currencies[price_key(row_data)] = row
+        return currencies, tiers
+
+    def tables(self):
+        """
+        Returns a tuple of the price currencies keyed by `price_key` and the
+        price currency dicts keyed by tier, reloading them if they are stale.
+        """
+        now = time.time()
+        with self.lock:
+            if (self.version is None or now - self.checked >=
+                    settings.PRICE_MATRIX_CHECK_INTERVAL):
+                version = self.current_version()
+                if version != self.version:
+                    self.currencies, self.tiers = self.load(version)
+                    self.version = version
+                self.checked = now
+            return self.currencies, self.tiers
+
+    def get_price_currency(self, tier, carrier, region, provider):
+        currencies = self.tables()[0]
+        return currencies.get(price_key({
+            'tier': tier, 'carrier': carrier,
+            'provider': provider, 'region': region
+        }))
+
+    def prices(self, tier, providers):
+        tiers = self.tables()[1]
+        return [dict(p) for p in tiers.get(tier, [])
+                if p['provider'] in providers]
+
+
+price_matrix = PriceMatrix()
+
+
+class PriceManager(ManagerBase):
 
     def active(self):
         return self.filter(active=True).order_by('price')
@@ -84,15 +171,6 @@ class Price(ModelBase):
         # Display the price in unamiguous USD, eg: 0.99 USD
         return '{0} USD'.format(self.price)
 
-    @staticmethod
-    def transformer(prices):
-        # There are a constrained number of price currencies, let's just
-        # get them all.
-        Price._currencies = dict(
-            (price_key(model_to_dict(p)), p)
-            for p in PriceCurrency.objects.filter(tier__active=True)
-        )
-
     def get_price_currency(self, carrier=None, region=None, provider=None):
         """
         Returns the PriceCurrency object or none.
@@ -107,20 +185,8 @@ class Price(ModelBase):
         # however we might need to think about this for the long term.
         provider = (provider or
                     ALL_PROVIDERS[settings.DEFAULT_PAYMENT_PROVIDER].provider)
-        if not hasattr(Price, '_currencies'):
-            Price.transformer([])
-
-        lookup = price_key({
-            'tier': self.id, 'carrier': carrier,
-            'provider': provider, 'region': region
-        })
-
-        try:
-            price_currency = Price._currencies[lookup]
-        except KeyError:
-            return None
-
-        return price_currency
+        return price_matrix.get_price_currency(self.id, carrier, region,
+                                               provider)
 
     def get_price_data(self, carrier=None, regions=None, provider=None):
         """
@@ -161,8 +227,7 @@ class Price(ModelBase):
             If not provided it will use settings.PAYMENT_PROVIDERS,
         """
         providers = [provider] if provider else default_providers()
-        return [model_to_dict(o) for o in
-                self.pricecurrency_set.filter(provider__in=providers)]
+        return price_matrix.prices(self.id, providers)
 
     def regions_by_name(self, provider=None):
         """A list of price regions sorted by name.
@@ -258,15 +323,26 @@ class PriceCurrency(ModelBase):
         return u'%s, %s: %s' % (self.tier, self.currency, self.price)
 
 
+@receiver(models.signals.post_save, sender=Price,
+          dispatch_uid='save_price_matrix')
+@receiver(models.signals.post_delete, sender=Price,
+          dispatch_uid='delete_price_matrix')
+def invalidate_price_matrix(sender, instance, **kw):
+    """Reload the price matrix when a tier is activated or deactivated."""
+    price_matrix.invalidate()
+
+
 @receiver(models.signals.post_save, sender=PriceCurrency,
           dispatch_uid='save_price_currency')
 @receiver(models.signals.post_delete, sender=PriceCurrency,
           dispatch_uid='delete_price_currency')
 def update_price_currency(sender, instance, **kw):
     """
-    Ensure that when PriceCurrencies are updated, all the apps that use them
+    Ensure that when PriceCurrencies are updated, the price matrix is reloaded
+    and all the apps that use them have their excluded regions recomputed and
     are re-indexed into ES so that the region information will be correct.
     """
+    price_matrix.invalidate()
     if kw.get('raw'):
         return
 
@@ -281,8 +357,8 @@ def update_price_currency(sender, instance, **kw):
                  .format(len(ids)))
 
         # Circular import sad face.
-        from mkt.webapps.tasks import index_webapps
-        index_webapps.delay(ids)
+        from mkt.webapps.tasks import update_excluded_regions
+        update_excluded_regions.delay(ids)
 
 
 class AddonPurchase(ModelBase):
@@ -367,6 +443,26 @@ def create_addon_purchase(sender, instance, **kw):
     cache.delete(memoize_key('users:purchase-ids', instance.user.pk))
 
 
+@receiver(models.signals.post_save, sender=AddonPurchase,
+          dispatch_uid='addon_purchase_verify_cache')
+@receiver(models.signals.post_delete, sender=AddonPurchase,
+          dispatch_uid='addon_purchase_verify_cache_delete')
+def invalidate_addon_purchase_cache(sender, instance, **kw):
+    """Make the receipt verifier look up the changed purchase again."""
+    cache.delete(purchase_cache_key('app', instance.addon_id, instance.uuid))
+
+
+@receiver(models.signals.post_save, sender=Contribution,
+          dispatch_uid='contribution_verify_cache')
+def invalidate_contribution_cache(sender, instance, **kw):
+    """
+    Make the receipt verifier look up the changed in-app purchase, and the one
+    it refunds, again.
+    """
+    cache.delete_many([purchase_cache_key('inapp', pk) for pk in
+                       (instance.pk, instance.related_id) if pk])
+
+
 class AddonPremium(ModelBase):
     """Additions to the Webapp model that only apply to Premium add-ons."""
     addon = models.OneToOneField('webapps.Webapp')
@@ -1,6 +1,7 @@
 import datetime
 from decimal import Decimal
 
+from django.core.cache import cache
 from django.utils import translation
 
 import mock
@@ -8,11 +9,13 @@ from nose.tools import eq_, ok_
 
 import mkt
 import mkt.site.tests
+from lib.utils import purchase_cache_key
 from mkt.constants import apps
 from mkt.constants.payments import PROVIDER_BANGO, PROVIDER_REFERENCE
 from mkt.constants.regions import (
     ALL_REGION_IDS, BRA, ESP, HUN, RESTOFWORLD, USA)
-from mkt.prices.models import AddonPremium, Price, PriceCurrency, Refund
+from mkt.prices.models import (AddonPremium, Price, PriceCurrency,
+                               PriceMatrix, Refund, price_matrix)
 from mkt.purchase.models import Contribution
 from mkt.site.fixtures import fixture
 from mkt.users.models import UserProfile
@@ -39,8 +42,6 @@ class TestPrice(mkt.site.tests.TestCase):
 
     def setUp(self):
         self.tier_one = Price.objects.get(pk=1)
-        if hasattr(Price, '_currencies'):
-            del Price._currencies  # needed to pick up fixtures.
 
     def test_active(self):
         Price.objects.get(pk=2).update(active=False)
@@ -96,7 +97,7 @@ class TestPrice(mkt.site.tests.TestCase):
     def test_transformer(self):
         price = Price.objects.get(pk=1)
         price.get_price_locale(regions=[RESTOFWORLD.id])
-        # Warm up Price._currencies.
+        # Warm up the price matrix.
         with self.assertNumQueries(0):
             eq_(price.get_price_locale(regions=[RESTOFWORLD.id]), u'$0.99')
 
@@ -177,6 +178,62 @@ class TestPrice(mkt.site.tests.TestCase):
                 PROVIDER_REFERENCE: [BRA, ESP, RESTOFWORLD]})
 
 
+class TestPriceMatrix(mkt.site.tests.TestCase):
+    fixtures = fixture('prices2')
+
+    def setUp(self):
+        self.tier_one = Price.objects.get(pk=1)
+        price_matrix.reset()
+
+    def test_prices_no_queries(self):
+        self.tier_one.prices()
+        with self.assertNumQueries(0):
+            eq_(len(self.tier_one.prices()), 2)
+            eq_(self.tier_one.get_price(regions=[RESTOFWORLD.id]),
+                Decimal('0.99'))
+
+    def test_shared_between_processes(self):
+        self.tier_one.prices()
+        other = PriceMatrix()
+        with self.assertNumQueries(0):
+            eq_(other.get_price_currency(1, None, RESTOFWORLD.id,
+                                         PROVIDER_REFERENCE).price,
+                Decimal('0.99'))
+        eq_(other.version, price_matrix.version)
+
+    def test_price_currency_save(self):
+        version = price_matrix.current_version()
+        PriceCurrency.objects.get(pk=5).update(price='0.89')
+        ok_(price_matrix.current_version() != version)
+        eq_(self.tier_one.get_price(regions=[RESTOFWORLD.id]),
+            Decimal('0.89'))
+
+    def test_price_currency_delete(self):
+        PriceCurrency.objects.get(pk=1).delete()
+        eq_(len(self.tier_one.prices()), 1)
+
+    def test_inactive_tier(self):
+        self.tier_one.update(active=False)
+        eq_(self.tier_one.get_price(regions=[RESTOFWORLD.id]), None)
+
+    def test_other_process_invalidated(self):
+        other = PriceMatrix()
+        other.tables()
+        PriceCurrency.objects.get(pk=5).update(price='0.89')
+        eq_(other.get_price_currency(1, None, RESTOFWORLD.id,
+                                     PROVIDER_REFERENCE).price,
+            Decimal('0.89'))
+
+    def test_check_interval(self):
+        other = PriceMatrix()
+        other.tables()
+        with self.settings(PRICE_MATRIX_CHECK_INTERVAL=60):
+            PriceCurrency.objects.get(pk=5).update(price='0.89')
+            eq_(other.get_price_currency(1, None, RESTOFWORLD.id,
+                                         PROVIDER_REFERENCE).price,
+                Decimal('0.99'))
+
+
 class TestPriceCurrencyChanges(mkt.site.tests.TestCase):
 
     def setUp(self):
@@ -184,15 +241,15 @@ class TestPriceCurrencyChanges(mkt.site.tests.TestCase):
         self.make_premium(self.addon)
         self.currency = self.addon.premium.price.pricecurrency_set.all()[0]
 
-    @mock.patch('mkt.webapps.tasks.index_webapps')
-    def test_save(self, index_webapps):
+    @mock.patch('mkt.webapps.tasks.update_excluded_regions')
+    def test_save(self, update_excluded_regions):
         self.currency.save()
-        eq_(index_webapps.delay.call_args[0][0], [self.addon.pk])
+        eq_(update_excluded_regions.delay.call_args[0][0], [self.addon.pk])
 
-    @mock.patch('mkt.webapps.tasks.index_webapps')
-    def test_delete(self, index_webapps):
+    @mock.patch('mkt.webapps.tasks.update_excluded_regions')
+    def test_delete(self, update_excluded_regions):
         self.currency.delete()
-        eq_(index_webapps.delay.call_args[0][0], [self.addon.pk])
+        eq_(update_excluded_regions.delay.call_args[0][0], [self.addon.pk])
 
 
 class ContributionMixin(object):
@@ -238,6 +295,22 @@ class TestContribution(ContributionMixin, mkt.site.tests.TestCase):
         assert self.purchased()
         eq_(self.type(), mkt.CONTRIB_PURCHASE)
 
+    def test_refund_invalidates_verify_cache(self):
+        self.create(mkt.CONTRIB_PURCHASE)
+        purchase = self.addon.addonpurchase_set.get(user=self.user)
+        key = purchase_cache_key('app', self.addon.pk, purchase.uuid)
+        cache.set(key, (mkt.CONTRIB_PURCHASE,))
+        self.create(mkt.CONTRIB_REFUND)
+        eq_(cache.get(key), None)
+
+    def test_inapp_refund_invalidates_verify_cache(self):
+        purchase = self.create(mkt.CONTRIB_PURCHASE)
+        key = purchase_cache_key('inapp', purchase.pk)
+        cache.set(key, ('guid', mkt.CONTRIB_PURCHASE))
+        Contribution.objects.create(type=mkt.CONTRIB_REFUND, addon=self.addon,
+                                    user=self.user, related=purchase)
+        eq_(cache.get(key), None)
+
     def test_really_cant_decide(self):
         self.create(mkt.CONTRIB_PURCHASE)
         self.create(mkt.CONTRIB_REFUND)
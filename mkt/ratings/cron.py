@@ -7,6 +7,7 @@ import cronjobs
 
 from mkt.site.mail import send_mail_jinja
 from mkt.ratings.models import Review
+from mkt.ratings.tasks import get_rating_averages
 
 
 cron_log = commonware.log.getLogger('mkt.ratings.cron')
@@ -42,3 +43,13 @@ def email_daily_ratings():
         send_mail_jinja(subject, 'ratings/emails/daily_digest.html',
                         context, recipient_list=author_emails,
                         perm_setting='app_new_review', async=True)
+
+
+@cronjobs.register
+def update_rating_averages():
+    """
+    Refresh the site-wide rating averages used to compute bayesian ratings.
+    """
+    avg = get_rating_averages(refresh=True)
+    cron_log.info('Rating averages: %(rating)s rating, %(reviews)s reviews.'
+                  % avg)
@@ -1,5 +1,7 @@
 import logging
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count, Avg, F
 
 from celery import task
@@ -12,6 +14,25 @@ from .models import Review
 
 log = logging.getLogger('z.task')
 
+RATING_AVERAGES_KEY = 'mkt:review:rating-averages'
+BAYESIAN_PENDING_KEY = 'mkt:review:bayesian-pending:%s'
+
+
+def get_rating_averages(refresh=False):
+    """
+    Return the site-wide average rating and average number of reviews of
+    apps, as a dict with `rating` and `reviews` keys.
+
+    They barely move when a review is posted, so they are cached instead of
+    being recomputed over the whole apps table for every review.
+    """
+    avg = None if refresh else cache.get(RATING_AVERAGES_KEY)
+    if avg is None:
+        avg = Webapp.objects.aggregate(rating=Avg('average_rating'),
+                                       reviews=Avg('total_reviews'))
+        cache.set(RATING_AVERAGES_KEY, avg, settings.RATING_AVERAGES_TIMEOUT)
+    return avg
+
 
 @task(rate_limit='50/m')
 def update_denorm(*pairs, **kw):
@@ -37,7 +58,7 @@ def update_denorm(*pairs, **kw):
             review.save()
 
 
-@post_request_task
+@post_request_task(merge_ids='varargs')
 def addon_review_aggregates(*addons, **kw):
     log.info('[%s@%s] Updating total reviews and average ratings.' %
              (len(addons), addon_review_aggregates.rate_limit))
@@ -52,30 +73,31 @@ def addon_review_aggregates(*addons, **kw):
         rating, reviews = stats.get(addon.id, [0, 0])
         addon.update(total_reviews=reviews, average_rating=rating)
 
-    # Delay bayesian calculations to avoid slave lag.
-    addon_bayesian_rating.apply_async(args=addons, countdown=5)
+    # Only schedule one bayesian calculation for a burst of reviews on the
+    # same app: the pending flag is cleared when the calculation starts.
+    pending = [addon for addon in addons
+               if cache.add(BAYESIAN_PENDING_KEY % addon, True,
+                            settings.RATING_BAYESIAN_DEBOUNCE)]
+    if pending:
+        # Delay bayesian calculations to avoid slave lag.
+        addon_bayesian_rating.apply_async(args=pending, countdown=5)
 
 
 @task
 def addon_bayesian_rating(*addons, **kw):
     log.info('[%s@%s] Updating bayesian ratings.' %
              (len(addons), addon_bayesian_rating.rate_limit))
+    cache.delete_many([BAYESIAN_PENDING_KEY % addon for addon in addons])
 
-    avg = Webapp.objects.aggregate(rating=Avg('average_rating'),
-                                   reviews=Avg('total_reviews'))
+    avg = get_rating_averages()
     # Rating can be NULL in the DB, so don't update it if it's not there.
     if avg['rating'] is None:
         return
     mc = avg['reviews'] * avg['rating']
-    for addon in Webapp.objects.filter(id__in=addons):
-        if addon.average_rating is None:
-            # Ignoring addons with no average rating.
-            continue
 
-        q = Webapp.objects.filter(id=addon.id)
-        if addon.total_reviews:
-            num = mc + F('total_reviews') * F('average_rating')
-            denom = avg['reviews'] + F('total_reviews')
-            q.update(bayesian_rating=num / denom)
-        else:
-            q.update(bayesian_rating=0)
+    # Ignoring addons with no average rating.
+    qs = Webapp.objects.filter(id__in=addons, average_rating__isnull=False)
+    num = mc + F('total_reviews') * F('average_rating')
+    denom = avg['reviews'] + F('total_reviews')
+    qs.filter(total_reviews__gt=0).update(bayesian_rating=num / denom)
+    qs.filter(total_reviews=0).update(bayesian_rating=0)
@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
 from django.utils.encoding import smart_str
 
 import mock
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 import mkt.site.tests
-from mkt.ratings.cron import email_daily_ratings
+from mkt.ratings.cron import email_daily_ratings, update_rating_averages
 from mkt.ratings.models import Review
+from mkt.ratings.tasks import RATING_AVERAGES_KEY
 from mkt.site.fixtures import fixture
 from mkt.webapps.models import AddonUser
 from mkt.users.models import UserProfile
@@ -54,3 +56,15 @@ class TestEmailDailyRatings(mkt.site.tests.TestCase):
         eq_(str(self.app2_review.body) in smart_str(mail.outbox[0].body), True)
         eq_(str(self.app2_review2.body) in smart_str(mail.outbox[0].body),
             True)
+
+
+class TestUpdateRatingAverages(mkt.site.tests.TestCase):
+
+    def test_refresh(self):
+        app = mkt.site.tests.app_factory()
+        cache.set(RATING_AVERAGES_KEY, {'rating': 1, 'reviews': 1})
+        app.update(average_rating=4, total_reviews=3)
+        update_rating_averages()
+        avg = cache.get(RATING_AVERAGES_KEY)
+        ok_(avg['rating'] > 1)
+        ok_(avg['reviews'] > 1)
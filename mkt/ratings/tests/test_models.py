@@ -1,9 +1,13 @@
+from django.core.cache import cache
+from django.db.models import Avg
+
 from mock import patch
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 import mkt.site.tests
 from mkt.ratings.models import check_spam, Review, Spam
-from mkt.ratings.tasks import addon_review_aggregates
+from mkt.ratings.tasks import (addon_bayesian_rating, addon_review_aggregates,
+                               get_rating_averages, RATING_AVERAGES_KEY)
 from mkt.site.fixtures import fixture
 from mkt.webapps.models import Webapp
 from mkt.users.models import UserProfile
@@ -41,6 +45,46 @@ class TestSpamTest(mkt.site.tests.TestCase):
         addon_review_aggregates(self.app.pk)
         assert index_webapps.called
 
+    @patch('mkt.ratings.tasks.addon_bayesian_rating.apply_async')
+    def test_review_aggregates_debounces_bayesian_rating(self, bayesian):
+        cache.clear()
+        addon_review_aggregates(self.app.pk)
+        addon_review_aggregates(self.app.pk)
+        eq_(bayesian.call_count, 1)
+        eq_(bayesian.call_args[1]['args'], [self.app.pk])
+
+        # Once the bayesian rating calculation has started, new reviews
+        # trigger another one.
+        addon_bayesian_rating(self.app.pk)
+        addon_review_aggregates(self.app.pk)
+        eq_(bayesian.call_count, 2)
+
+    def test_bayesian_rating(self):
+        cache.clear()
+        app2 = mkt.site.tests.app_factory()
+        self.app.update(average_rating=4, total_reviews=2)
+        app2.update(average_rating=2, total_reviews=0, bayesian_rating=3)
+        avg = Webapp.objects.aggregate(rating=Avg('average_rating'),
+                                       reviews=Avg('total_reviews'))
+        # One query for the averages, and one to update each kind of app.
+        with self.assertNumQueries(3):
+            addon_bayesian_rating(self.app.pk, app2.pk)
+        expected = ((avg['reviews'] * avg['rating'] + 2 * 4) /
+                    (avg['reviews'] + 2))
+        eq_(round(Webapp.objects.get(pk=self.app.pk).bayesian_rating, 4),
+            round(expected, 4))
+        eq_(Webapp.objects.get(pk=app2.pk).bayesian_rating, 0)
+
+    def test_rating_averages_cached(self):
+        cache.clear()
+        avg = get_rating_averages()
+        self.app.update(average_rating=5, total_reviews=1000)
+        with self.assertNumQueries(0):
+            eq_(get_rating_averages(), avg)
+        avg = get_rating_averages(refresh=True)
+        ok_(avg['reviews'] > 1)
+        eq_(cache.get(RATING_AVERAGES_KEY), avg)
+
     def test_soft_delete(self):
         Review.objects.all()[0].delete()
         eq_(Review.objects.count(), 1)
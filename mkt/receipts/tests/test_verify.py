@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import calendar
+import json
 import time
 import uuid
 from urllib import urlencode
@@ -12,6 +13,7 @@ import jwt
 import M2Crypto
 import mock
 from browserid.errors import ExpiredSignatureError
+from browserid.utils import encode_json_bytes
 from nose.tools import eq_, ok_
 from services import utils, verify
 
@@ -44,6 +46,9 @@ class ReceiptTest(mkt.site.tests.TestCase):
                                                  webapp=self.app)
         self.inapp.save()  # generates a GUID
         self.user = UserProfile.objects.get(pk=999)
+        verify._keys.clear()
+        verify._verifiers.clear()
+        verify.purchase_cache.local.clear()
 
     def sample_app_receipt(self):
         return create_receipt_data(self.app, self.user, 'some-uuid')
@@ -339,6 +344,111 @@ class TestVerify(ReceiptTest):
         eq_(res['status'], 'invalid')
         eq_(res['reason'], 'NO_PURCHASE')
 
+    @mock.patch.object(utils.settings,
+                       'WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT', 60)
+    def test_purchase_cached(self):
+        self.make_purchase()
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        with self.assertNumQueries(0):
+            eq_(self.verify_receipt_data(
+                self.sample_app_receipt())['status'], 'ok')
+
+        # Without the local cache, the shared cache is used.
+        verify.purchase_cache.local.clear()
+        with self.assertNumQueries(0):
+            eq_(self.verify_receipt_data(
+                self.sample_app_receipt())['status'], 'ok')
+
+    @mock.patch.object(utils.settings,
+                       'WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT', 60)
+    @mock.patch.object(utils.settings,
+                       'WEBAPPS_RECEIPT_PURCHASE_LOCAL_CACHE_TIMEOUT', 0)
+    def test_purchase_cache_invalidated(self):
+        purchase = self.make_purchase()
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        purchase.update(type=mkt.CONTRIB_REFUND)
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'refunded')
+
+    @mock.patch.object(utils.settings,
+                       'WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT', 60)
+    def test_inapp_purchase_cached(self):
+        contribution = self.make_inapp_contribution()
+        receipt = self.sample_inapp_receipt(contribution)
+        eq_(self.verify_receipt_data(receipt)['status'], 'ok')
+        with self.assertNumQueries(0):
+            eq_(self.verify_receipt_data(receipt)['status'], 'ok')
+
+    @mock.patch.object(utils.settings,
+                       'WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT', 60)
+    def test_batch_cached(self):
+        self.make_purchase()
+        eq_(self.verify_receipt_data(self.sample_app_receipt())['status'],
+            'ok')
+        with mock.patch.object(verify, 'decode_receipt',
+                               return_value=self.sample_app_receipt()):
+            with self.assertNumQueries(0):
+                res = verify.verify_batch(
+                    ['app'], RequestFactory().get('/verifyme/').META,
+                    cursor=connection.cursor())
+        eq_(res, [{'status': 'ok'}])
+
+    def test_batch(self):
+        self.make_contribution()
+        contribution = self.make_inapp_contribution()
+        no_purchase = self.sample_app_receipt()
+        no_purchase['user']['value'] = 'other-uuid'
+        receipts = {
+            'app': self.sample_app_receipt(),
+            'inapp': self.sample_inapp_receipt(contribution),
+            'no-purchase': no_purchase,
+        }
+
+        def decode(receipt):
+            if receipt not in receipts:
+                raise ValueError
+            return receipts[receipt]
+
+        with mock.patch.object(verify, 'decode_receipt', side_effect=decode):
+            with self.assertNumQueries(2):
+                res = verify.verify_batch(
+                    ['app', 'garbage', 'inapp', 'no-purchase'],
+                    RequestFactory().get('/verifyme/').META,
+                    cursor=connection.cursor())
+        eq_(res, [{'status': 'ok'},
+                  {'status': 'invalid', 'reason': 'ERROR_DECODING'},
+                  {'status': 'ok'},
+                  {'status': 'invalid', 'reason': 'NO_PURCHASE'}])
+
+    @mock.patch.object(utils.settings, 'WEBAPPS_RECEIPT_EXPIRED_SEND', True)
+    @mock.patch('services.verify.sign_many')
+    @mock.patch('services.verify.sign')
+    def test_batch_expired_signed_together(self, sign, sign_many):
+        sign_many.side_effect = lambda receipts: ['signed'] * len(receipts)
+        self.make_purchase()
+        receipt_data = self.sample_app_receipt()
+        receipt_data['exp'] = calendar.timegm(time.gmtime()) - 1000
+        with mock.patch.object(verify, 'decode_receipt',
+                               side_effect=lambda r: dict(receipt_data)):
+            res = verify.verify_batch(
+                ['a', 'b'], RequestFactory().get('/verifyme/').META,
+                cursor=connection.cursor())
+        eq_(res, [{'status': 'expired', 'receipt': 'signed'}] * 2)
+        eq_(sign_many.call_count, 1)
+        eq_(len(sign_many.call_args[0][0]), 2)
+        assert not sign.called
+
+    def test_batch_refunded(self):
+        self.make_purchase().update(type=mkt.CONTRIB_REFUND)
+        with mock.patch.object(verify, 'decode_receipt',
+                               return_value=self.sample_app_receipt()):
+            res = verify.verify_batch(
+                ['app'], RequestFactory().get('/verifyme/').META,
+                cursor=connection.cursor())
+        eq_(res, [{'status': 'refunded'}])
+
     def test_crack_receipt(self):
         # Check that we can decode our receipt and get a dictionary back.
         self.app.update(manifest_url='http://a.com')
@@ -357,6 +467,62 @@ class TestVerify(ReceiptTest):
                 self.app, self.user, str(uuid.uuid4())))
         assert trunion_verify.called
 
+    def test_crack_receipt_loads_key_once(self):
+        self.app.update(manifest_url='http://a.com')
+        purchase = self.make_purchase()
+        receipt = create_receipt(purchase.addon, purchase.user, purchase.uuid)
+        with mock.patch('services.verify.jwt.rsa_load',
+                        wraps=jwt.rsa_load) as rsa_load:
+            verify.decode_receipt(receipt)
+            eq_(verify.decode_receipt(receipt)['typ'], u'purchase-receipt')
+        eq_(rsa_load.call_count, 1)
+
+    @mock.patch.object(utils.settings, 'SIGNING_VALID_ISSUERS',
+                       ['marketplace.firefox.com'])
+    @mock.patch('services.verify.receipts.certs.ReceiptVerifier')
+    def test_receipt_verifier_reused(self, trunion_verify):
+        trunion_verify.side_effect = lambda **kw: mock.Mock()
+        verifier = verify.get_receipt_verifier('marketplace.firefox.com')
+        eq_(verify.get_receipt_verifier('marketplace.firefox.com'),
+            verifier)
+        eq_(trunion_verify.call_count, 1)
+        trunion_verify.assert_called_with(
+            valid_issuers=['marketplace.firefox.com'])
+
+        ok_(verify.get_receipt_verifier(None) != verifier)
+        eq_(trunion_verify.call_count, 2)
+
+    @mock.patch.object(utils.settings, 'WEBAPPS_RECEIPT_VERIFIER_TIMEOUT', 60)
+    @mock.patch('services.verify.time')
+    @mock.patch('services.verify.receipts.certs.ReceiptVerifier')
+    def test_receipt_verifier_expires(self, trunion_verify, time_mock):
+        trunion_verify.side_effect = lambda **kw: mock.Mock()
+        time_mock.return_value = 1000
+        verifier = verify.get_receipt_verifier('marketplace.firefox.com')
+        time_mock.return_value = 1059
+        eq_(verify.get_receipt_verifier('marketplace.firefox.com'),
+            verifier)
+        time_mock.return_value = 1060
+        ok_(verify.get_receipt_verifier('marketplace.firefox.com') !=
+            verifier)
+        eq_(trunion_verify.call_count, 2)
+
+    @mock.patch.object(utils.settings, 'SIGNING_VALID_ISSUERS',
+                       ['marketplace.firefox.com'])
+    def test_receipt_issuer(self):
+        def bundle(issuer):
+            cert = '.'.join([encode_json_bytes({'alg': 'RS256'}),
+                             encode_json_bytes({'iss': issuer}), 'c2ln'])
+            return cert + '~a.b.c'
+
+        eq_(verify.get_receipt_issuer(bundle('marketplace.firefox.com')),
+            'marketplace.firefox.com')
+        eq_(verify.get_receipt_issuer(
+            bundle('https://marketplace.firefox.com/')),
+            'https://marketplace.firefox.com/')
+        eq_(verify.get_receipt_issuer(bundle('evil.com')), None)
+        eq_(verify.get_receipt_issuer('borked~receipt'), None)
+
     def test_crack_borked_receipt(self):
         self.app.update(manifest_url='http://a.com')
         purchase = self.make_purchase()
@@ -442,6 +608,35 @@ class TestServices(mkt.site.tests.TestCase):
         with self.settings(SIGNING_SERVER_ACTIVE=''):
             eq_(verify.status_check({})[0], 500)
 
+    def batch_request(self, body):
+        data = {}
+        req = RequestFactory().post('/verifyme/batch/', body,
+                                    content_type='application/json')
+
+        def start_response(status, wsgi_headers):
+            data['status'] = status
+
+        data['body'] = ''.join(verify.application(req.META, start_response))
+        return data
+
+    @mock.patch.object(verify, 'verify_batch')
+    def test_batch_request(self, verify_batch):
+        verify_batch.return_value = [{'status': 'ok'}, {'status': 'invalid'}]
+        data = self.batch_request('["a", "b"]')
+        eq_(data['status'], '200 OK')
+        eq_(json.loads(data['body']),
+            [{'status': 'ok'}, {'status': 'invalid'}])
+        receipts, environ = verify_batch.call_args[0]
+        eq_(receipts, ['a', 'b'])
+        eq_(environ['PATH_INFO'], '/verifyme/')
+
+    def test_batch_request_invalid(self):
+        eq_(self.batch_request('not json')['status'], '400 Bad Request')
+        eq_(self.batch_request('{"a": "b"}')['status'], '400 Bad Request')
+        eq_(self.batch_request('[1]')['status'], '400 Bad Request')
+        too_many = json.dumps(['a'] * (verify.BATCH_MAX_RECEIPTS + 1))
+        eq_(self.batch_request(too_many)['status'], '400 Bad Request')
+
     def test_options_request_for_cors(self):
         data = {}
         req = RequestFactory().options('/verify')
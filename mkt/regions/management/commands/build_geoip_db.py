@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lib.geoip import build_database_from_csv
+
+
+class Command(BaseCommand):
+    help = """
+    Build the local GeoIP database from a CSV file of
+    "first IP,last IP,country code" rows.
+    Usage: build_geoip_db <csv file> [<database path>]
+    The database path defaults to settings.GEOIP_DB_PATH.
+    """
+    args = '<csv file> [<database path>]'
+
+    def handle(self, *args, **kw):
+        if not args:
+            raise CommandError('A CSV file is required.')
+        path = args[1] if len(args) > 1 else settings.GEOIP_DB_PATH
+        if not path:
+            raise CommandError('No database path given and '
+                               'settings.GEOIP_DB_PATH is not set.')
+        count = build_database_from_csv(args[0], path)
+        self.stdout.write('Wrote %s IP ranges to %s' % (count, path))
@@ -27,8 +27,16 @@ class RegionMiddleware(object):
         request.REGION = user_region
         mkt.regions.set_region(user_region)
 
-    def region_from_request(self, request):
+    def region_from_request(self, request, blocking=True):
+        """Return the region of the request's IP address.
+
+        With `blocking=False` only lookups that don't need the network are
+        made, and None is returned if the region isn't known locally.
+        """
         address = request.META.get('REMOTE_ADDR')
+        if not blocking:
+            ip_reg = self.geoip.lookup_local(address)
+            return parse_region(ip_reg) if ip_reg else None
         ip_reg = self.geoip.lookup(address)
         log.info('Geodude lookup for {0} returned {1}'
                  .format(address, ip_reg))
@@ -10,6 +10,7 @@ from mkt.users.models import UserProfile
 
 import mkt
 from mkt.api.tests.test_oauth import RestOAuth
+from mkt.regions.middleware import RegionMiddleware
 
 
 _langs = ['cs', 'de', 'en-US', 'es', 'fr', 'pl', 'pt-BR', 'pt-PT']
@@ -134,6 +135,18 @@ class TestRegionMiddleware(mkt.site.tests.TestCase):
         set_region.assert_called_with(mkt.regions.FRA)
         eq_(mock_lookup.call_count, 0)
 
+    @mock.patch('mkt.regions.middleware.GeoIP.lookup')
+    @mock.patch('mkt.regions.middleware.GeoIP.lookup_local')
+    def test_region_from_request_non_blocking(self, mock_local, mock_lookup):
+        request = mock.Mock(META={'REMOTE_ADDR': '8.8.8.8'})
+        middleware = RegionMiddleware()
+        mock_local.return_value = 'br'
+        eq_(middleware.region_from_request(request, blocking=False),
+            mkt.regions.BRA)
+        mock_local.return_value = None
+        eq_(middleware.region_from_request(request, blocking=False), None)
+        eq_(mock_lookup.call_count, 0)
+
 
 class TestRegionMiddlewarePersistence(RestOAuth):
     def test_save_region(self):
@@ -2,7 +2,8 @@
 from nose.tools import eq_
 
 from mkt.constants import regions
-from mkt.regions.utils import parse_region, remove_accents
+from mkt.regions.utils import (decode_region_bitmap, encode_region_bitmap,
+                               parse_region, remove_accents)
 
 
 def test_parse_region():
@@ -29,3 +30,16 @@ def test_remove_accents():
     # functions but shows that if the diacritic isn't found the
     # string remains un-molested.
     eq_(remove_accents(u'Włochy'), u'Włochy')
+
+
+def test_region_bitmap():
+    eq_(encode_region_bitmap([]), '')
+    eq_(encode_region_bitmap([1, 3]), '0101')
+    eq_(decode_region_bitmap('0101'), [1, 3])
+    eq_(decode_region_bitmap(''), [])
+    eq_(decode_region_bitmap(None), [])
+    eq_(encode_region_bitmap([1], [1, 3]), '0102')
+    eq_(decode_region_bitmap('0102'), [1, 3])
+    eq_(decode_region_bitmap('0102', flags='1'), [1])
+    ids = [regions.BRA.id, regions.DEU.id, regions.RESTOFWORLD.id]
+    eq_(decode_region_bitmap(encode_region_bitmap(ids)), sorted(ids))
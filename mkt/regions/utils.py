@@ -31,3 +31,28 @@ def remove_accents(input_str):
     """Remove accents from input."""
     nkfd_form = unicodedata.normalize('NFKD', unicode(input_str))
     return u''.join([c for c in nkfd_form if not unicodedata.combining(c)])
+
+
+def encode_region_bitmap(region_ids, unpriced_region_ids=()):
+    """
+    Encode region ids as a string of flags, where the flag at index N is '1'
+    if the region with id N is in `region_ids`, '2' if it is only in
+    `unpriced_region_ids` and '0' otherwise.
+
+    The flag for a region can be tested in SQL with
+    SUBSTRING(bitmap, region_id + 1, 1).
+    """
+    region_ids = set(region_ids)
+    all_ids = region_ids.union(unpriced_region_ids)
+    if not all_ids:
+        return ''
+    flags = ['0'] * (max(all_ids) + 1)
+    for region_id in all_ids:
+        flags[region_id] = '1' if region_id in region_ids else '2'
+    return ''.join(flags)
+
+
+def decode_region_bitmap(bitmap, flags='12'):
+    """Return the sorted region ids flagged with any of `flags`."""
+    return [region_id for region_id, flag in enumerate(bitmap or '')
+            if flag in flags]
@@ -8,7 +8,10 @@ import commonware.log
 
 import mkt
 import mkt.constants.comm as comm
+from mkt.abuse.models import AbuseReport
 from mkt.comm.utils import create_comm_note
+from mkt.files.models import File
+from mkt.ratings.models import ReviewFlag
 from mkt.site.models import ManagerBase, ModelBase
 from mkt.site.utils import cache_ns_key
 from mkt.tags.models import Tag
@@ -516,3 +519,43 @@ for model in (RereviewQueue, EscalationQueue):
     models.signals.post_delete.connect(
         update_search_index, sender=model,
         dispatch_uid='%s-delete-update-index' % model._meta.model_name)
+
+
+REVIEWER_QUEUE_STATS_KEY = 'reviewers:queue-stats'
+
+
+def clear_queue_stats(sender, **kwargs):
+    """
+    Drop the ReviewerQueueStats snapshots so that they are rebuilt the next
+    time a reviewer page needs them.
+    """
+    if not kwargs.get('raw'):
+        cache.delete_many(['%s:%s' % (REVIEWER_QUEUE_STATS_KEY, source)
+                           for source in ('db', 'es')])
+
+
+for model in (AbuseReport, AdditionalReview, EscalationQueue, RereviewQueue,
+              ReviewFlag):
+    models.signals.post_save.connect(
+        clear_queue_stats, sender=model,
+        dispatch_uid='%s-save-queue-stats' % model._meta.model_name)
+    models.signals.post_delete.connect(
+        clear_queue_stats, sender=model,
+        dispatch_uid='%s-delete-queue-stats' % model._meta.model_name)
+
+
+def watch_queue_fields(fields):
+    """
+    Return an on_change() callback that drops the ReviewerQueueStats
+    snapshots when an instance is created or one of `fields` changes.
+    """
+    def callback(old_attr={}, new_attr={}, instance=None, sender=None, **kw):
+        if any(old_attr.get(field) != new_attr.get(field)
+               for field in ('id',) + fields):
+            clear_queue_stats(sender, **kw)
+    callback.__name__ = 'clear_queue_stats'
+    return callback
+
+
+Webapp.on_change(watch_queue_fields(('status', 'disabled_by_user')))
+File.on_change(watch_queue_fields(('status',)))
@@ -1,7 +1,12 @@
 # -*- coding: utf8 -*-
-import mkt.site.tests
+from nose.tools import eq_
 
-from mkt.reviewers.utils import create_sort_link
+import mkt
+import mkt.site.tests
+from mkt.reviewers.models import EscalationQueue, RereviewQueue
+from mkt.reviewers.utils import create_sort_link, ReviewerQueueStats
+from mkt.site.utils import app_factory
+from mkt.versions.models import Version
 
 
 class TestCreateSortLink(mkt.site.tests.TestCase):
@@ -43,3 +48,70 @@ class TestCreateSortLink(mkt.site.tests.TestCase):
         assert 'sort=name' in link
         assert 'order=asc' in link
         assert 'text_query=Feliz+A%C3%B1o' in link
+
+
+class TestReviewerQueueStats(mkt.site.tests.TestCase):
+
+    def setUp(self):
+        self.apps = [app_factory(status=mkt.STATUS_PENDING,
+                                 file_kw={'status': mkt.STATUS_PENDING})
+                     for i in range(3)]
+
+    def test_build(self):
+        self.apps[0].latest_version.update(nomination=self.days_ago(1))
+        self.apps[1].latest_version.update(nomination=self.days_ago(8))
+        self.apps[2].latest_version.update(nomination=self.days_ago(15))
+        rq = RereviewQueue.objects.create(addon=app_factory())
+        rq.update(created=self.days_ago(6))
+
+        stats = ReviewerQueueStats.build()
+        eq_(stats.counts['pending'], 3)
+        eq_(stats.counts['rereview'], 1)
+        eq_(stats.counts['escalated'], 0)
+        eq_(stats.progress['pending'],
+            {'new': 1, 'med': 1, 'old': 1, 'week': 1})
+        eq_(stats.progress['rereview'],
+            {'new': 0, 'med': 1, 'old': 0, 'week': 1})
+
+    def test_aggregate_single_query(self):
+        self.apps[0].latest_version.update(nomination=self.days_ago(1))
+        self.apps[1].latest_version.update(nomination=self.days_ago(6))
+        self.apps[2].latest_version.update(nomination=None)
+        qs = Version.objects.filter(addon__in=self.apps)
+        with self.assertNumQueries(1):
+            count, progress = ReviewerQueueStats.aggregate(qs, 'nomination')
+        eq_(count, 3)
+        eq_(progress, {'new': 1, 'med': 1, 'old': 0, 'week': 2})
+
+    def test_aggregate_empty(self):
+        eq_(ReviewerQueueStats.aggregate(Version.objects.none(),
+                                         'nomination'),
+            (0, {'new': 0, 'med': 0, 'old': 0, 'week': 0}))
+
+    def test_cached(self):
+        with self.settings(REVIEWER_QUEUE_STATS_TIMEOUT=60):
+            eq_(ReviewerQueueStats.get().counts['pending'], 3)
+            with self.assertNumQueries(0):
+                eq_(ReviewerQueueStats.get().counts['pending'], 3)
+
+    def test_cleared_on_queue_change(self):
+        with self.settings(REVIEWER_QUEUE_STATS_TIMEOUT=60):
+            eq_(ReviewerQueueStats.get().counts['pending'], 3)
+            EscalationQueue.objects.create(addon=self.apps[0])
+            stats = ReviewerQueueStats.get()
+            eq_(stats.counts['pending'], 2)
+            eq_(stats.counts['escalated'], 1)
+
+    def test_cleared_on_status_change(self):
+        with self.settings(REVIEWER_QUEUE_STATS_TIMEOUT=60):
+            eq_(ReviewerQueueStats.get().counts['pending'], 3)
+            self.apps[0].update(status=mkt.STATUS_PUBLIC)
+            eq_(ReviewerQueueStats.get().counts['pending'], 2)
+
+    def test_kept_on_unrelated_change(self):
+        with self.settings(REVIEWER_QUEUE_STATS_TIMEOUT=60):
+            eq_(ReviewerQueueStats.get().counts['pending'], 3)
+            self.apps[0].update(total_reviews=1)
+            self.apps[0].latest_version.update(releasenotes='Fixes')
+            with self.assertNumQueries(0):
+                eq_(ReviewerQueueStats.get().counts['pending'], 3)
@@ -1,11 +1,13 @@
 import json
 import urllib
 from collections import OrderedDict
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connections
 from django.db.models import Q
+from django.db.models.sql import EmptyResultSet
 
 import commonware.log
 from elasticsearch_dsl import Search
@@ -19,7 +21,9 @@ from mkt.comm.utils import create_comm_note
 from mkt.constants import comm
 from mkt.files.models import File
 from mkt.ratings.models import Review
-from mkt.reviewers.models import EscalationQueue, RereviewQueue, ReviewerScore
+from mkt.reviewers.models import (QUEUE_TARAKO, REVIEWER_QUEUE_STATS_KEY,
+                                  AdditionalReview, EscalationQueue,
+                                  RereviewQueue, ReviewerScore)
 from mkt.site.helpers import product_as_dict
 from mkt.site.models import manual_order
 from mkt.site.utils import cached_property, JSONEncoder
@@ -848,3 +852,100 @@ class ReviewersQueuesHelper(object):
         order_by = ('-' if order == 'desc' else '') + sort_type
 
         return qs.sort(order_by)
+
+
+class ReviewerQueueStats(object):
+    """
+    A snapshot of the reviewer queue counts and progress stats.
+
+    Building it runs one aggregate query per queue. The snapshot is cached
+    until one of the queues changes or REVIEWER_QUEUE_STATS_TIMEOUT expires,
+    so reviewer pages don't have to count the queues on every load.
+    """
+    # The queues we track progress for, and the date they are bucketed by.
+    progress_fields = {
+        'pending': 'nomination',
+        'homescreen': 'nomination',
+        'rereview': 'created',
+        'escalated': 'created',
+        'updates': 'nomination',
+    }
+
+    def __init__(self, counts, progress):
+        self.counts = counts
+        self.progress = progress
+
+    @classmethod
+    def get(cls, use_es=False):
+        key = '%s:%s' % (REVIEWER_QUEUE_STATS_KEY, 'es' if use_es else 'db')
+        stats = cache.get(key)
+        if stats is None:
+            stats = cls.build(use_es=use_es)
+            cache.set(key, stats, settings.REVIEWER_QUEUE_STATS_TIMEOUT)
+        return stats
+
+    @classmethod
+    def aggregate(cls, qs, field):
+        """
+        Count the rows of a queue and bucket them by the `field` date with a
+        single conditional aggregate, rather than fetching every row.
+        """
+        now = datetime.now()
+        five, seven, ten = [now - timedelta(days=days) for days in (5, 7, 10)]
+        db = connections[qs.db]
+        quote = db.ops.quote_name
+        column = '%s.%s' % (quote(qs.model._meta.db_table),
+                            quote(qs.model._meta.get_field(field).column))
+        try:
+            sql, params = (qs.order_by().extra(select={'queue_date': column})
+                             .values_list('queue_date')
+                             .query.sql_with_params())
+        except EmptyResultSet:
+            return 0, {'new': 0, 'med': 0, 'old': 0, 'week': 0}
+        cursor = db.cursor()
+        cursor.execute(
+            'SELECT COUNT(*), '
+            'SUM(CASE WHEN queue_date > %%s THEN 1 ELSE 0 END), '
+            'SUM(CASE WHEN queue_date BETWEEN %%s AND %%s THEN 1 ELSE 0 END), '
+            'SUM(CASE WHEN queue_date < %%s THEN 1 ELSE 0 END), '
+            'SUM(CASE WHEN queue_date >= %%s THEN 1 ELSE 0 END) '
+            'FROM (%s) AS queue' % sql,
+            (five, ten, five, ten, seven) + tuple(params))
+        row = [int(value or 0) for value in cursor.fetchone()]
+        return row[0], dict(zip(('new', 'med', 'old', 'week'), row[1:]))
+
+    @classmethod
+    def build(cls, use_es=False):
+        helper = ReviewersQueuesHelper()
+        queues = {
+            'pending': helper.get_pending_queue(),
+            'homescreen': helper.get_homescreen_queue(),
+            'rereview': helper.get_rereview_queue(),
+            'escalated': helper.get_escalated_queue(),
+            'updates': helper.get_updates_queue(),
+        }
+
+        counts, progress = {}, {}
+        for name, qs in queues.items():
+            counts[name], progress[name] = cls.aggregate(
+                qs, cls.progress_fields[name])
+
+        if use_es:
+            es_helper = ReviewersQueuesHelper(use_es=True)
+            for name in queues:
+                counts[name] = getattr(
+                    es_helper, 'get_%s_queue' % name)().count()
+
+        counts.update({
+            'moderated': helper.get_moderated_queue().count(),
+            'abuse': helper.get_abuse_queue().count(),
+            'abusewebsites': helper.get_abuse_queue_websites().count(),
+            'region_cn': Webapp.objects.pending_in_region(
+                mkt.regions.CHN).count(),
+            'additional_tarako': (
+                AdditionalReview.objects
+                                .unreviewed(queue=QUEUE_TARAKO,
+                                            and_approved=True)
+                                .count()),
+        })
+        return cls(counts, progress)
@@ -52,7 +52,7 @@ from mkt.regions.utils import parse_region
 from mkt.reviewers.forms import (ApiReviewersSearchForm, ApproveRegionForm,
                                  ModerateLogDetailForm, ModerateLogForm,
                                  MOTDForm, TestedOnFormSet)
-from mkt.reviewers.models import (QUEUE_TARAKO, SHOWCASE_TAG, AdditionalReview,
+from mkt.reviewers.models import (SHOWCASE_TAG, AdditionalReview,
                                   CannedResponse, ReviewerScore)
 from mkt.reviewers.serializers import (AdditionalReviewSerializer,
                                        CannedResponseSerializer,
@@ -61,16 +61,16 @@ from mkt.reviewers.serializers import (AdditionalReviewSerializer,
                                        ReviewersESAppSerializer,
                                        ReviewingSerializer)
 from mkt.reviewers.utils import (AppsReviewing, ReviewApp,
-                                 ReviewersQueuesHelper, log_reviewer_action)
+                                 ReviewerQueueStats, ReviewersQueuesHelper,
+                                 log_reviewer_action)
 from mkt.search.filters import (ReviewerSearchFormFilter, SearchQueryFilter,
                                 SortingFilter)
 from mkt.search.views import SearchView
 from mkt.site.decorators import json_view, login_required, permission_required
 from mkt.site.helpers import absolutify, product_as_dict
 from mkt.site.mail import send_mail
-from mkt.site.utils import (JSONEncoder, days_ago, escape_all,
-                            get_file_response, paginate, redirect_for_login,
-                            smart_decode)
+from mkt.site.utils import (JSONEncoder, escape_all, get_file_response,
+                            paginate, redirect_for_login, smart_decode)
 from mkt.submit.forms import AppFeaturesForm
 from mkt.tags.models import Tag
 from mkt.users.models import UserProfile
@@ -156,31 +156,7 @@ def home(request):
 
 def queue_counts(request):
     use_es = waffle.switch_is_active('reviewer-tools-elasticsearch')
-    queues_helper = ReviewersQueuesHelper(use_es=use_es)
-
-    counts = {
-        'pending': queues_helper.get_pending_queue().count(),
-        'rereview': queues_helper.get_rereview_queue().count(),
-        'updates': queues_helper.get_updates_queue().count(),
-        'escalated': queues_helper.get_escalated_queue().count(),
-        'moderated': queues_helper.get_moderated_queue().count(),
-        'abuse': queues_helper.get_abuse_queue().count(),
-        'abusewebsites': queues_helper.get_abuse_queue_websites().count(),
-        'homescreen': queues_helper.get_homescreen_queue().count(),
-        'region_cn': Webapp.objects.pending_in_region(mkt.regions.CHN).count(),
-        'additional_tarako': (
-            AdditionalReview.objects
-                            .unreviewed(queue=QUEUE_TARAKO, and_approved=True)
-                            .count()),
-    }
-
-    rv = {}
-    if isinstance(type, basestring):
-        return counts[type]
-    for k, v in counts.items():
-        if not isinstance(type, list) or k in type:
-            rv[k] = v
-    return rv
+    return dict(ReviewerQueueStats.get(use_es=use_es).counts)
 
 
 def _progress():
@@ -189,41 +165,8 @@ def _progress():
     Return the number of apps still unreviewed for a given period of time and
     the percentage.
     """
-
-    queues_helper = ReviewersQueuesHelper()
-
-    base_filters = {
-        'pending': (queues_helper.get_pending_queue(),
-                    'nomination'),
-        'homescreen': (queues_helper.get_homescreen_queue(),
-                       'nomination'),
-        'rereview': (queues_helper.get_rereview_queue(),
-                     'created'),
-        'escalated': (queues_helper.get_escalated_queue(),
-                      'created'),
-        'updates': (queues_helper.get_updates_queue(),
-                    'nomination')
-    }
-
-    operators_and_values = {
-        'new': ('gt', days_ago(5)),
-        'med': ('range', (days_ago(10), days_ago(5))),
-        'old': ('lt', days_ago(10)),
-        'week': ('gte', days_ago(7))
-    }
-
-    types = base_filters.keys()
-    progress = {}
-
-    for t in types:
-        tmp = {}
-        base_query, field = base_filters[t]
-        for k in operators_and_values.keys():
-            operator, value = operators_and_values[k]
-            filter_ = {}
-            filter_['%s__%s' % (field, operator)] = value
-            tmp[k] = base_query.filter(**filter_).count()
-        progress[t] = tmp
+    progress = ReviewerQueueStats.get().progress
+    types = progress.keys()
 
     def pct(p, t):
         # Return the percent of (p)rogress out of (t)otal.
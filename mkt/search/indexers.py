@@ -28,6 +28,9 @@ class BaseIndexer(object):
     - get_mapping(cls)
     - extract_document(cls, pk=None, obj=None)
 
+    It can also implement attach_related_data(cls, objs) to fetch everything
+    extract_document() needs for a whole chunk of objects at once.
+
     """
     _es = {}
 
@@ -83,17 +86,24 @@ class BaseIndexer(object):
                  body=document, id=id_)
 
     @classmethod
-    def bulk_index(cls, documents, id_field='id', es=None, index=None):
-        """Index of a bunch of documents."""
+    def bulk_index(cls, documents, id_field='id', es=None, index=None,
+                   indices=None):
+        """
+        Index of a bunch of documents.
+
+        If `indices` is passed, every document is indexed in each of those
+        indices, still using a single bulk request.
+        """
         es = es or cls.get_es()
-        index = index or cls.get_index()
+        indices = indices or [index or cls.get_index()]
         type = cls.get_mapping_type_name()
 
         actions = [
-            {'_index': index, '_type': type, '_id': d['id'], '_source': d}
-            for d in documents]
+            {'_index': idx, '_type': type, '_id': d['id'], '_source': d}
+            for d in documents for idx in indices]
 
-        helpers.bulk(es, actions)
+        if actions:
+            helpers.bulk(es, actions)
 
     @classmethod
     def index_ids(cls, ids, no_delay=False):
@@ -115,6 +125,35 @@ class BaseIndexer(object):
         index = index or cls.get_index()
         es.delete(index=index, doc_type=cls.get_mapping_type_name(), id=id_)
 
+    @classmethod
+    def bulk_unindex(cls, ids, es=None, index=None, indices=None):
+        """
+        Remove a bunch of documents from the index(es) in a single bulk
+        request. Documents that are not in the index are ignored.
+        """
+        es = es or cls.get_es()
+        indices = indices or [index or cls.get_index()]
+        type = cls.get_mapping_type_name()
+
+        actions = [
+            {'_op_type': 'delete', '_index': idx, '_type': type, '_id': id_}
+            for id_ in ids for idx in indices]
+        if not actions:
+            return
+
+        success, errors = helpers.bulk(es, actions, raise_on_error=False)
+        for error in errors:
+            item = error.get('delete', {})
+            if item.get('status') == 404:
+                # Ignore if it's not there.
+                log.info(u'[%s:%s] object not found in index %s' %
+                         (cls.get_model()._meta.model_name, item.get('_id'),
+                          item.get('_index')))
+            else:
+                log.error(u'[%s:%s] error unindexing object: %s' %
+                          (cls.get_model()._meta.model_name, item.get('_id'),
+                           item))
+
     @classmethod
     def refresh_index(cls, es=None, index=None):
         """
@@ -285,32 +324,45 @@ class BaseIndexer(object):
         indices = Reindexing.get_indices(index)
 
         es = cls.get_es(urls=settings.ES_URLS)
-        for id_ in ids:
-            for idx in indices:
-                try:
-                    cls.unindex(id_=id_, es=es, index=idx)
-                except elasticsearch.exceptions.NotFoundError:
-                    # Ignore if it's not there.
-                    log.info(u'[%s:%s] object not found in index' %
-                             (cls.get_model()._meta.model_name, id_))
+        cls.bulk_unindex(ids, es=es, indices=indices)
 
     @classmethod
-    def run_indexing(cls, ids, ES, index=None, **kw):
-        """Used in reindex."""
-        sys.stdout.write('Indexing {0} {1}\n'.format(
-            len(ids), cls.get_model()._meta.model_name))
+    def attach_related_data(cls, objs):
+        """
+        Fetch the related data extract_document() needs for all `objs` in
+        bulk and attach it to the instances. Does nothing by default.
+        """
+        pass
 
-        # Fetch QS given the IDs.
-        docs = []
-        qs = cls.get_model().objects.filter(id__in=ids)
+    @classmethod
+    def extract_documents(cls, objs):
+        """
+        Extract the documents for a list of objects, prefetching their
+        related data in bulk first. Objects whose document can't be extracted
+        are logged and skipped.
+        """
+        objs = list(objs)
+        cls.attach_related_data(objs)
 
-        # For each object, extract document.
-        for obj in qs:
+        docs = []
+        for obj in objs:
             try:
                 docs.append(cls.extract_document(obj.id, obj=obj))
             except Exception as e:
-                sys.stdout.write('Failed to index {0} {1}: {2}\n'.format(
-                    cls.get_model()._meta.model_name, obj.id, e))
+                log.error(u'Failed to index {0} {1}: {2}'.format(
+                    cls.get_model()._meta.model_name, obj.id, repr(e)),
+                    exc_info=True)
+        return docs
+
+    @classmethod
+    def run_indexing(cls, ids, ES, index=None, **kw):
+        """Used in reindex."""
+        sys.stdout.write('Indexing {0} {1}\n'.format(
+            len(ids), cls.get_model()._meta.model_name))
+
+        # Fetch QS given the IDs and extract the documents.
+        docs = cls.extract_documents(
+            cls.get_model().objects.filter(id__in=ids))
 
         # Index.
         if docs:
@@ -423,9 +475,11 @@ class BaseIndexer(object):
         def get_dict(obj, prop):
             if obj.is_dummy_content_for_qa():
                 return {}
-            qs = getattr(obj, prop).filter(
-                region__in=MATURE_REGION_IDS + [ALL_REGIONS_ID])
-            return dict(qs.values_list('region', 'value'))
+            # Use all() so that prefetched values are used when available.
+            regions = MATURE_REGION_IDS + [ALL_REGIONS_ID]
+            return dict((item.region, item.value)
+                        for item in getattr(obj, prop).all()
+                        if item.region in regions)
 
         extend = {
             'boost': get_boost(obj),
@@ -500,7 +554,7 @@ class BaseIndexer(object):
         return extend_with_me
 
 
-@post_request_task(acks_late=True)
+@post_request_task(acks_late=True, merge_ids='list')
 @use_master
 def index(ids, indexer, **kw):
     """
@@ -514,7 +568,7 @@ def index(ids, indexer, **kw):
     indices = Reindexing.get_indices(indexer.get_index())
 
     es = indexer.get_es(urls=settings.ES_URLS)
-    for obj in indexer.get_indexable().filter(id__in=ids):
-        doc = indexer.extract_document(obj.id, obj)
-        for idx in indices:
-            indexer.index(doc, id_=obj.id, es=es, index=idx)
+    docs = indexer.extract_documents(
+        indexer.get_indexable().filter(id__in=ids))
+    # Send everything, to every index, in a single bulk request.
+    indexer.bulk_index(docs, es=es, indices=indices)
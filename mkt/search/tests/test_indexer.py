@@ -1,7 +1,10 @@
+import mock
 from nose.tools import eq_
 
-from mkt.search.indexers import BaseIndexer
+from mkt.search.indexers import BaseIndexer, index
+from mkt.site.fixtures import fixture
 from mkt.site.tests import TestCase
+from mkt.webapps.indexers import WebappIndexer
 
 
 class TestBaseIndexer(TestCase):
@@ -13,3 +16,28 @@ class TestBaseIndexer(TestCase):
         es1 = self.indexer().get_es()
         es2 = self.indexer().get_es()
         eq_(id(es1), id(es2))
+
+
+@mock.patch('mkt.search.indexers.helpers.bulk')
+@mock.patch('mkt.search.indexers.Reindexing')
+class TestBulkRequests(TestCase):
+    fixtures = fixture('webapp_337141')
+    mock_es = False
+
+    def test_index_single_request(self, reindexing, bulk):
+        reindexing.get_indices.return_value = ['new_index', 'old_index']
+        index([337141], WebappIndexer)
+        eq_(bulk.call_count, 1)
+        actions = bulk.call_args[0][1]
+        eq_(sorted((a['_index'], a['_id']) for a in actions),
+            [('new_index', 337141), ('old_index', 337141)])
+
+    def test_unindexer_single_request(self, reindexing, bulk):
+        reindexing.get_indices.return_value = ['new_index', 'old_index']
+        bulk.return_value = (3, [{'delete': {'_id': 2, 'status': 404}}])
+        WebappIndexer.unindexer([1, 2])
+        eq_(bulk.call_count, 1)
+        actions = bulk.call_args[0][1]
+        eq_(sorted((a['_op_type'], a['_index'], a['_id']) for a in actions),
+            [('delete', 'new_index', 1), ('delete', 'new_index', 2),
+             ('delete', 'old_index', 1), ('delete', 'old_index', 2)])
@@ -1,7 +1,7 @@
 from math import log10
 
-from django.core.exceptions import ObjectDoesNotExist
-
+from elasticsearch.exceptions import TransportError
+from elasticsearch_dsl.result import Response
 from elasticsearch_dsl.search import Search as dslSearch
 from django_statsd.clients import statsd
 
@@ -20,6 +20,36 @@ class Search(dslSearch):
             return results
 
 
+def multi_search(es, searches):
+    """
+    Execute several `Search` objects in a single `_msearch` request to ES and
+    return their responses, in the same order.
+    """
+    if not searches:
+        return []
+
+    body = []
+    for sq in searches:
+        header = {}
+        if sq._index:
+            header['index'] = sq._index
+        if sq._doc_type:
+            header['type'] = sq._doc_type
+        body.extend([header, sq.to_dict()])
+
+    with statsd.timer('search.multi_execute'):
+        responses = es.msearch(body=body)['responses']
+
+    results = []
+    for sq, response in zip(searches, responses):
+        if 'error' in response:
+            raise TransportError(500, response['error'])
+        result = Response(response, callbacks=sq._doc_type_map)
+        statsd.timing('search.took', result.took)
+        results.append(result)
+    return results
+
+
 def _property_value_by_region(obj, region=None, property=None):
     if obj.is_dummy_content_for_qa():
         # Apps and Websites set up by QA for testing should never be considered
@@ -31,10 +61,12 @@ def _property_value_by_region(obj, region=None, property=None):
     else:
         by_region = 0
 
-    try:
-        return getattr(obj, property).get(region=by_region).value
-    except ObjectDoesNotExist:
-        return 0
+    # Iterate over all() instead of using get() so that values prefetched by
+    # the indexers are used when available.
+    for item in getattr(obj, property).all():
+        if item.region == by_region:
+            return item.value
+    return 0
 
 
 def get_popularity(obj, region=None):
@@ -543,6 +543,11 @@ API_SHOW_TRACEBACKS = False
 # Whether to throttle API requests. Default is True. Disable where appropriate.
 API_THROTTLE = True
 
+# How many seconds the API auth middlewares keep the user and groups behind a
+# validated OAuth token or shared-secret in the cache. Profile saves, group
+# changes and logouts drop them before that.
+API_PRINCIPAL_CACHE_TIMEOUT = 60
+
 # The version we append to the app feature profile. Bump when we add new app
 # features to the `AppFeatures` model.
 APP_FEATURES_VERSION = 9
@@ -615,6 +620,11 @@ COMMONPLACE_REPOS = ['commbadge', 'fireplace', 'marketplace-stats',
 REACT_REPOS = ['marketplace-content-tools']
 FRONTEND_REPOS = COMMONPLACE_REPOS + REACT_REPOS
 
+# How long, in seconds, the request-independent parts of the frontend shell
+# (build ID, active switches) are cached. Deploying a new build ID or
+# changing a switch clears them.
+COMMONPLACE_SHELL_CACHE_TIMEOUT = 60 * 60
+
 # CSP Settings
 CSP_REPORT_URI = '/services/csp/report'
 CSP_REPORT_ONLY = True
@@ -705,6 +715,12 @@ ES_INDEXES = {
     'website': 'websites',
     # Adding an index? Also add the index to reindex.py.
 }
+# How often, in seconds, a process checks whether a reindexing was flagged or
+# unflagged, and how long at most it trusts its copy of the reindexing state.
+# The reindex command waits for the check interval after flagging and
+# unflagging so that every process writes to the right indices.
+ES_REINDEXING_CHECK_INTERVAL = 5
+ES_REINDEXING_TIMEOUT = 60 * 5
 ES_URLS = ['http://%s' % h for h in ES_HOSTS]
 ES_USE_PLUGINS = False
 ES_TIMEOUT = 30
@@ -712,6 +728,14 @@ ES_TIMEOUT = 30
 # When True include full tracebacks in JSON. This is useful for QA on preview.
 EXPOSE_VALIDATOR_TRACEBACKS = True
 
+# How long (in seconds) cached FeedView responses are fresh. Stale responses
+# keep being served for FEED_CACHE_STALE_TIMEOUT more seconds while a single
+# request rebuilds them. Requests that find no response at all wait up to
+# FEED_CACHE_REBUILD_WAIT seconds for it. Set to 0 to disable the feed cache.
+FEED_CACHE_TIMEOUT = 60
+FEED_CACHE_STALE_TIMEOUT = 60 * 10
+FEED_CACHE_REBUILD_WAIT = 2
+
 # The maximum file size that is shown inside the file viewer.
 FILE_VIEWER_SIZE_LIMIT = 1048576
 
@@ -776,6 +800,11 @@ os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 GEOIP_URL = ''
 GEOIP_DEFAULT_VAL = 'restofworld'
 GEOIP_DEFAULT_TIMEOUT = .2
+# Path to a local IP ranges to country database built with the
+# build_geoip_db command. When set, it's used instead of the GeoIP server.
+GEOIP_DB_PATH = ''
+# Number of recently looked up addresses to remember, per process.
+GEOIP_CACHE_SIZE = 10000
 
 # Credentials for accessing Google Analytics stats.
 GOOGLE_ANALYTICS_CREDENTIALS = {}
@@ -937,7 +966,18 @@ MINIFY_MOZMARKET = True
 # Monolith settings.
 MONOLITH_SERVER = os.getenv('MONOLITH_URL', 'http://localhost:9200')
 MONOLITH_INDEX = 'time_*'
+# Timeout, in seconds, of the queries made to the Monolith server, and how many
+# HTTP connections to it each thread keeps open.
+MONOLITH_TIMEOUT = 10
+MONOLITH_POOL_SIZE = 10
 MONOLITH_MAX_DATE_RANGE = 365
+# Monolith records are buffered in each process and written in bulk when there
+# are that many of them, when the oldest one is older than that many seconds,
+# or at the end of the request.
+MONOLITH_BUFFER_FLUSH_SIZE = 100
+MONOLITH_BUFFER_FLUSH_INTERVAL = 10
+# Records are dropped when that many are waiting to be written.
+MONOLITH_BUFFER_MAX_SIZE = 1000
 
 # The issuer for unverified Persona email addresses.
 # We only trust one issuer to grant us unverified emails.
@@ -983,6 +1023,13 @@ PRE_GENERATE_APKS = False
 PRE_GENERATE_APK_URL = (
     'https://apk-controller.dev.mozaws.net/application.apk')
 
+# How often, in seconds, a process checks the shared price matrix version to
+# pick up price tier changes made by other processes.
+PRICE_MATRIX_CHECK_INTERVAL = 60
+
+# How long the serialized price matrix is kept in the cache.
+PRICE_MATRIX_TIMEOUT = 60 * 60 * 24
+
 # Number of days the webpay product icon is valid for.
 # After this period, the icon will be re-fetched from its external URL.
 # If you change this value, update the docs:
@@ -993,9 +1040,20 @@ PRODUCT_ICON_EXPIRY = 1
 # doesn't show up as the most popular app. (See bug 1112731)
 QA_APP_ID = 0
 
+# How long the site-wide rating averages used for bayesian ratings are cached,
+# in seconds. They are also refreshed by the update_rating_averages cron.
+RATING_AVERAGES_TIMEOUT = 60 * 60 * 2
+# Reviews posted on an app within that many seconds of each other only trigger
+# one bayesian rating update.
+RATING_BAYESIAN_DEBOUNCE = 60
+
 # Read-only mode setup.
 READ_ONLY = False
 
+# How long, in seconds, the reviewer queue counts and progress stats are
+# cached. The snapshot is also dropped whenever a queue changes.
+REVIEWER_QUEUE_STATS_TIMEOUT = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_MODEL_SERIALIZER_CLASS':
         'rest_framework.serializers.HyperlinkedModelSerializer',
@@ -1080,6 +1138,14 @@ SIGNING_SERVER = os.getenv('SIGNING_SERVER', '')
 # is a temporary flag that we will remove.
 SIGNING_SERVER_ACTIVE = bool(SIGNING_SERVER)
 
+# How many connections to each signing server are kept alive per process.
+SIGNING_SERVER_POOL_SIZE = 10
+
+# How many times failing requests to the signing servers are retried, and the
+# delay before the first retry, in seconds. It doubles for each retry.
+SIGNING_SERVER_RETRIES = 2
+SIGNING_SERVER_BACKOFF = 0.1
+
 # And how long we'll give the server to respond.
 SIGNING_SERVER_TIMEOUT = 10
 
@@ -1181,6 +1247,17 @@ WEBAPPS_RECEIPT_EXPIRY_SECONDS = 60 * 60 * 24 * 182
 # The file contains a PEM-encoded RSA private key.
 WEBAPPS_RECEIPT_KEY = path('mkt/webapps/tests/sample.key')
 
+# How long the receipt verifier caches the purchases it looked up, in seconds,
+# in memcached and in each process. 0 disables the cache. Purchases are
+# removed from memcached when they change, but not from the processes.
+WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT = 60
+WEBAPPS_RECEIPT_PURCHASE_LOCAL_CACHE_TIMEOUT = 5
+WEBAPPS_RECEIPT_PURCHASE_LOCAL_CACHE_SIZE = 10000
+
+# How long the receipt verifier keeps the receipt keys and the issuer
+# certificates it loaded, in seconds, before loading them again.
+WEBAPPS_RECEIPT_VERIFIER_TIMEOUT = 60 * 5
+
 WEBAPPS_UNIQUE_BY_DOMAIN = False
 
 # Filter IP addresses of the allowed clients that can post email
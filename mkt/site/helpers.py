@@ -329,6 +329,12 @@ def impala_paginator(pager):
     return jinja2.Markup(t.render({'pager': pager}))
 
 
+@register.filter
+def keyset_paginator(pager):
+    t = env.get_template('site/keyset_paginator.html')
+    return jinja2.Markup(t.render({'pager': pager}))
+
+
 @register.filter
 def json(s):
     return jsonlib.dumps(s)
@@ -177,3 +177,30 @@ def move_stored_file(src_path, dst_path, src_storage=private_storage,
     copy_stored_file(src_path, dst_path,
                      src_storage=src_storage, dst_storage=dst_storage)
     src_storage.delete(src_path)
+
+
+def rename_stored_file(src_path, dst_path, storage=private_storage):
+    """
+    Rename a path (src_path) to another path (dst_path) on the same storage
+    (storage), without reading the file back.
+
+    Local files are renamed in place. S3 has no rename, so the key is copied
+    server side before the source is deleted.
+
+    Defaults to renaming on private storage.
+    """
+    if isinstance(storage, S3BotoStorage):
+        storage.bucket.copy_key(
+            storage._normalize_name(storage._clean_name(dst_path)),
+            storage.bucket_name,
+            storage._normalize_name(storage._clean_name(src_path)),
+            preserve_acl=True)
+        storage.delete(src_path)
+    else:
+        dst = storage.path(dst_path)
+        try:
+            os.makedirs(os.path.dirname(dst))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        os.rename(storage.path(src_path), dst)
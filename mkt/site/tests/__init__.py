@@ -248,6 +248,7 @@ ES_patchers = [mock.patch('elasticsearch.Elasticsearch'),
                mock.patch('mkt.webapps.indexers.WebappIndexer', spec=True),
                mock.patch('mkt.search.indexers.index', spec=True),
                mock.patch('mkt.search.indexers.BaseIndexer.unindex'),
+               mock.patch('mkt.search.indexers.BaseIndexer.bulk_unindex'),
                mock.patch('mkt.search.indexers.Reindexing', spec=True,
                           side_effect=lambda i: [i]),
                ]
@@ -667,8 +668,6 @@ class TestCase(MockEsMixin, MockBrowserIdMixin, ClassFixtureTestCase):
             PriceCurrency.objects.create(region=region, currency='USD',
                                          price=price, tier=price_obj,
                                          provider=PROVIDER_REFERENCE)
-        # Call Price transformer in order to repopulate _currencies cache.
-        Price.transformer([])
         return price_obj
 
     def make_premium(self, addon, price='1.00'):
@@ -676,8 +675,6 @@ class TestCase(MockEsMixin, MockBrowserIdMixin, ClassFixtureTestCase):
         addon.update(premium_type=mkt.ADDON_PREMIUM)
         addon._premium = AddonPremium.objects.create(addon=addon,
                                                      price=price_obj)
-        if hasattr(Price, '_currencies'):
-            del Price._currencies
         return addon._premium
 
     def create_sample(self, name=None, db=False, **kw):
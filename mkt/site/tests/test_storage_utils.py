@@ -12,6 +12,7 @@ from nose.tools import eq_
 from mkt.site.storage_utils import (copy_stored_file, get_private_storage,
                                     get_public_storage, local_storage,
                                     move_stored_file, private_storage,
+                                    rename_stored_file, S3BotoPrivateStorage,
                                     storage_is_remote, walk_storage)
 from mkt.site.tests import TestCase
 from mkt.site.utils import rm_local_tmp_dir
@@ -100,6 +101,21 @@ class TestFileOps(unittest.TestCase):
         eq_(self.contents(dst), '<contents>')
         eq_(private_storage.exists(src), False)
 
+    @mock.patch('mkt.site.storage_utils.shutil.copyfileobj')
+    def test_rename(self, copyfileobj):
+        src = self.newfile('src.txt', '<contents>')
+        dst = self.path('somedir/dst.txt')
+        rename_stored_file(src, dst, storage=private_storage)
+        eq_(self.contents(dst), '<contents>')
+        eq_(private_storage.exists(src), False)
+        assert not copyfileobj.called
+
+    def test_rename_replaces(self):
+        src = self.newfile('src.txt', '<new>')
+        dst = self.newfile('dst.txt', '<old>')
+        rename_stored_file(src, dst, storage=private_storage)
+        eq_(self.contents(dst), '<new>')
+
     def test_non_ascii(self):
         src = self.newfile(u'kristi\u0107.txt',
                            u'ivan kristi\u0107'.encode('utf8'))
@@ -126,6 +142,17 @@ class TestStorageClasses(TestCase):
         eq_(get_private_storage().__class__.__name__, 'LocalFileStorage')
         eq_(get_public_storage().__class__.__name__, 'LocalFileStorage')
 
+    def test_rename_stored_file_when_remote(self):
+        storage = S3BotoPrivateStorage()
+        storage.location = 'base'
+        with mock.patch.object(S3BotoPrivateStorage, 'bucket') as bucket, \
+                mock.patch.object(storage, 'delete') as delete:
+            rename_stored_file('dir/src.tgz', 'dir/dst.tgz', storage=storage)
+        bucket.copy_key.assert_called_with(
+            'base/dir/dst.tgz', storage.bucket_name, 'base/dir/src.tgz',
+            preserve_acl=True)
+        delete.assert_called_with('dir/src.tgz')
+
     @override_settings(
         DEFAULT_FILE_STORAGE='mkt.site.storage_utils.LocalFileStorage')
     @mock.patch('mkt.site.storage_utils.shutil.copyfileobj')
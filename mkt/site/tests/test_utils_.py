@@ -7,16 +7,21 @@ from os import path
 from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import ValidationError
+from django.test.client import RequestFactory
 
 import mock
-from nose.tools import assert_raises, eq_, raises
+from nose.tools import assert_raises, eq_, ok_, raises
 
 from mkt.site.storage_utils import (LocalFileStorage, copy_stored_file,
                                     local_storage, private_storage,
                                     public_storage, storage_is_remote)
 from mkt.site.tests import TestCase
-from mkt.site.utils import (ImageCheck, cache_ns_key, escape_all, resize_image,
-                            rm_local_tmp_dir, slug_validator, slugify)
+from mkt.site.utils import (ImageCheck, cache_ns_key, decode_image,
+                            escape_all, keyset_chunked, keyset_key,
+                            keyset_paginate, resize_image,
+                            resize_image_pyramid, rm_local_tmp_dir,
+                            slug_validator, slugify)
+from mkt.users.models import UserProfile
 
 
 def get_image_path(name):
@@ -101,6 +106,21 @@ def test_resize_transparency():
             public_storage.delete(dest)
 
 
+def test_resize_image_pyramid():
+    im = decode_image(get_image_path('mozilla.png'),
+                      src_storage=local_storage)
+    eq_(im.size, (339, 128))
+    images = resize_image_pyramid(im, [(32, 32), (1000, 1000), (100, 100),
+                                       (64, 0)])
+    expected = {(1000, 1000): (339, 128), (100, 100): (100, 37),
+                (64, 0): (64, 24), (32, 32): (32, 12)}
+    eq_(sorted(images), sorted(expected))
+    for size, (width, height) in expected.items():
+        eq_(images[size].size[0], width)
+        # Heights can be a wee bit fuzzy because of rounding.
+        assert -1 <= images[size].size[1] - height <= 1
+
+
 class TestLocalFileStorage(unittest.TestCase):
 
     def setUp(self):
@@ -204,6 +224,55 @@ class TestCacheNamespaces(unittest.TestCase):
         eq_(cache_ns_key(self.namespace), expected)
 
 
+class TestKeyset(TestCase):
+
+    def setUp(self):
+        self.users = []
+        for x in range(5):
+            user = UserProfile.objects.create(email='%s@example.com' % x)
+            # Two users share each created date, to exercise the pk part of
+            # the key.
+            user.update(created=self.days_ago(x / 2))
+            self.users.append(user)
+        self.qs = UserProfile.objects.filter(
+            pk__in=[u.pk for u in self.users])
+
+    def newest_first(self):
+        return sorted(self.users, key=lambda u: (u.reload().created, u.pk),
+                      reverse=True)
+
+    def test_paginate(self):
+        expected = self.newest_first()
+        page = keyset_paginate(RequestFactory().get('/foo'), self.qs,
+                               per_page=2)
+        eq_(list(page), expected[:2])
+        ok_(page.is_first)
+        ok_(page.has_next())
+
+        seen = list(page)
+        while page.has_next():
+            url = page.next_url()
+            eq_(url, '/foo?before=%s' % keyset_key(seen[-1]))
+            page = keyset_paginate(RequestFactory().get(url), self.qs,
+                                   per_page=2)
+            ok_(not page.is_first)
+            seen.extend(page)
+        eq_(seen, expected)
+        eq_(page.first_url(), '/foo')
+
+    def test_paginate_invalid_key(self):
+        page = keyset_paginate(RequestFactory().get('/foo?before=xx'),
+                               self.qs, per_page=10)
+        eq_(list(page), self.newest_first())
+        ok_(page.is_first)
+        ok_(not page.has_next())
+
+    def test_chunked(self):
+        chunks = list(keyset_chunked(self.qs, 2))
+        eq_([len(c) for c in chunks], [2, 2, 1])
+        eq_(sum(chunks, []), [u.pk for u in reversed(self.newest_first())])
+
+
 class TestEscapeAll(unittest.TestCase):
 
     def test_basics(self):
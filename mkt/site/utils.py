@@ -19,6 +19,7 @@ from django.core.cache import cache
 from django.core.serializers import json
 from django.core.urlresolvers import reverse
 from django.core.validators import validate_slug, ValidationError
+from django.db.models import Q
 from django.db.models.signals import post_save
 from django.http import HttpRequest
 from django.utils import translation
@@ -36,6 +37,7 @@ import pytz
 from cef import log_cef as _log_cef
 from easy_thumbnails import processors
 from elasticsearch_dsl.search import Search
+from jingo.helpers import urlparams
 from PIL import Image
 
 import mkt
@@ -137,6 +139,101 @@ def paginate(request, queryset, per_page=20, count=None):
     return paginated
 
 
+# Format of the created part of keyset pagination keys.
+KEYSET_DATE_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+class KeysetPage(object):
+    """A page of results returned by keyset_paginate()."""
+
+    def __init__(self, object_list, next_key, url, param, is_first=True):
+        self.object_list = object_list
+        self.next_key = next_key
+        self.url = url
+        self.param = param
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_key is not None
+
+    def next_url(self):
+        return urlparams(self.url, **{self.param: self.next_key})
+
+    def first_url(self):
+        return urlparams(self.url, **{self.param: None})
+
+
+def keyset_key(obj):
+    """Returns the keyset pagination key of obj, see keyset_paginate()."""
+    return '%s-%s' % (obj.created.strftime(KEYSET_DATE_FORMAT), obj.pk)
+
+
+def keyset_filter(queryset, key, descending=True):
+    """
+    Filters queryset down to the rows coming after key, a (created, pk) pair,
+    when ordered by (created, pk) in the given direction.
+    """
+    created, pk = key
+    if descending:
+        return queryset.filter(Q(created__lt=created) |
+                               Q(created=created, pk__lt=pk))
+    return queryset.filter(Q(created__gt=created) |
+                           Q(created=created, pk__gt=pk))
+
+
+def keyset_paginate(request, queryset, per_page=20, param='before'):
+    """
+    Get a page of ``queryset``, newest first, using keyset pagination on
+    (created, pk) instead of an offset: a page is fetched with a single
+    indexed range query no matter how deep it is, and no count is done.
+
+    The page starts after the key found in the ``param`` GET parameter,
+    which is the ``next_key`` of the previous page.
+    """
+    queryset = queryset.order_by('-created', '-pk')
+    try:
+        created, pk = request.GET.get(param, '').split('-')
+        key = (datetime.datetime.strptime(created, KEYSET_DATE_FORMAT),
+               int(pk))
+    except ValueError:
+        # Missing or invalid key, start from the first page.
+        key = None
+    if key:
+        queryset = keyset_filter(queryset, key)
+
+    object_list = list(queryset[:per_page + 1])
+    next_key = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_key = keyset_key(object_list[-1])
+    url = u'%s?%s' % (request.path, request.GET.urlencode())
+    return KeysetPage(object_list, next_key, url, param, is_first=not key)
+
+
+def keyset_chunked(queryset, n):
+    """
+    Yield successive lists of up to n pks from queryset, oldest first, using
+    keyset pagination on (created, pk) instead of loading every pk at once.
+    """
+    queryset = queryset.order_by('created', 'pk')
+    key = None
+    while True:
+        qs = queryset
+        if key:
+            qs = keyset_filter(qs, key, descending=False)
+        rows = list(qs.values_list('created', 'pk')[:n])
+        if not rows:
+            break
+        yield [pk for created, pk in rows]
+        key = rows[-1]
+
+
 class JSONEncoder(json.DjangoJSONEncoder):
 
     def default(self, obj):
@@ -228,6 +325,35 @@ def resize_image(src, dst, size=None, remove_src=True,
     return im.size
 
 
+def decode_image(src, src_storage=private_storage):
+    """
+    Opens and fully decodes the image at src, returning it as RGBA.
+    """
+    with src_storage.open(src, 'rb') as fp:
+        im = Image.open(fp)
+        im = im.convert('RGBA')
+    return im
+
+
+def resize_image_pyramid(im, sizes):
+    """
+    Resizes an already decoded image to each of sizes, returning a dict of
+    size -> image.
+
+    Sizes are processed from largest to smallest and each one is scaled down
+    from the previous output whenever that output is still big enough to
+    produce it, so the full resolution source is only resampled once.
+    """
+    images = {}
+    base = im
+    for size in sorted(set(sizes), key=lambda s: s[0] * (s[1] or s[0]),
+                       reverse=True):
+        if not any(0 < want <= have for want, have in zip(size, base.size)):
+            base = im
+        images[size] = base = processors.scale_and_crop(base, size)
+    return images
+
+
 def remove_icons(destination):
     for size in mkt.CONTENT_ICON_SIZES:
         filename = '%s-%s.png' % (destination, size)
@@ -8,6 +8,7 @@ from rest_framework.reverse import reverse
 from django.conf import settings
 
 import mkt
+from lib.metrics import reset_monolith_clients
 from mkt.api.tests.test_oauth import RestOAuth
 from mkt.purchase.models import Contribution
 from mkt.site.fixtures import fixture
@@ -19,6 +20,7 @@ class StatsAPITestMixin(object):
 
     def setUp(self):
         super(StatsAPITestMixin, self).setUp()
+        reset_monolith_clients()
         patches = [
             mock.patch('monolith.client.Client'),
             mock.patch.object(settings, 'MONOLITH_SERVER', 'http://0.0.0.0:0'),
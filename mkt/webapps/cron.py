@@ -4,6 +4,7 @@ import time
 from datetime import datetime
 
 from django.conf import settings
+from django.db import connection
 from django.db.models import Q
 
 import commonware.log
@@ -18,7 +19,7 @@ from mkt.files.models import File, FileUpload
 from mkt.site.decorators import use_master
 from mkt.site.storage_utils import (private_storage, public_storage,
                                     storage_is_remote, walk_storage)
-from mkt.site.utils import chunked, days_ago
+from mkt.site.utils import chunked, days_ago, keyset_chunked
 
 from .indexers import WebappIndexer
 from .models import Installed, Installs, Trending, Webapp
@@ -106,22 +107,53 @@ def clean_old_signed(seconds=60 * 60):
                 private_storage.delete(full)
 
 
-def _get_installs(app_id):
+def _query_apps(client, app_ids, aggregations):
     """
-    Calculate popularity of app for all regions and per region.
-
-    Returns value in the format of::
+    Run `aggregations` over the Monolith data of each app in `app_ids`, using
+    a single request.
 
-        {'all': <global installs>,
-         <region_slug>: <regional installs>,
-         ...}
+    Returns a dict of app id to the aggregations results of that app, without
+    entries for the apps with no data.
 
     """
+    query = {
+        'query': {
+            'filtered': {
+                'query': {'match_all': {}},
+                'filter': {'terms': {'app-id': list(app_ids)}}
+            }
+        },
+        'aggregations': {
+            'app': {
+                'terms': {
+                    'field': 'app-id',
+                    # Add size so we get all the apps, not just the top 10.
+                    'size': len(app_ids)
+                },
+                'aggregations': aggregations
+            }
+        },
+        'size': 0
+    }
+
+    try:
+        res = client.raw(query)
+    except ValueError as e:
+        task_log.error('Error response from Monolith: {0}'.format(e))
+        return {}
+
+    if 'aggregations' not in res:
+        task_log.error('No installs for apps {}'.format(app_ids))
+        return {}
+
+    return dict((int(bucket['key']), bucket)
+                for bucket in res['aggregations']['app']['buckets'])
+
+
+def _installs_aggregations():
     # How many days back do we include when calculating popularity.
     POPULARITY_PERIOD = 90
 
-    client = get_monolith_client()
-
     popular = {
         'filter': {
             'range': {
@@ -140,6 +172,48 @@ def _get_installs(app_id):
         }
     }
 
+    return {
+        'popular': popular,
+        'region': {
+            'terms': {
+                'field': 'region',
+                # Add size so we get all regions, not just the top 10.
+                'size': len(mkt.regions.ALL_REGIONS)
+            },
+            'aggregations': {
+                'popular': popular
+            }
+        }
+    }
+
+
+def _installs_scores(aggregations):
+    results = {
+        'all': aggregations['popular']['total_installs']['value']
+    }
+
+    if 'region' in aggregations:
+        for regional_res in aggregations['region']['buckets']:
+            region_slug = regional_res['key']
+            popular = regional_res['popular']['total_installs']['value']
+            results[region_slug] = popular
+
+    return results
+
+
+def _get_installs(app_id):
+    """
+    Calculate popularity of app for all regions and per region.
+
+    Returns value in the format of::
+
+        {'all': <global installs>,
+         <region_slug>: <regional installs>,
+         ...}
+
+    """
+    client = get_monolith_client()
+
     query = {
         'query': {
             'filtered': {
@@ -147,19 +221,7 @@ def _get_installs(app_id):
                 'filter': {'term': {'app-id': app_id}}
             }
         },
-        'aggregations': {
-            'popular': popular,
-            'region': {
-                'terms': {
-                    'field': 'region',
-                    # Add size so we get all regions, not just the top 10.
-                    'size': len(mkt.regions.ALL_REGIONS)
-                },
-                'aggregations': {
-                    'popular': popular
-                }
-            }
-        },
+        'aggregations': _installs_aggregations(),
         'size': 0
     }
 
@@ -173,87 +235,128 @@ def _get_installs(app_id):
         task_log.error('No installs for app {}'.format(app_id))
         return {}
 
-    results = {
-        'all': res['aggregations']['popular']['total_installs']['value']
-    }
+    return _installs_scores(res['aggregations'])
 
-    if 'region' in res['aggregations']:
-        for regional_res in res['aggregations']['region']['buckets']:
-            region_slug = regional_res['key']
-            popular = regional_res['popular']['total_installs']['value']
-            results[region_slug] = popular
 
-    return results
+def _get_installs_for_apps(app_ids):
+    """
+    Like `_get_installs` but for all the apps in `app_ids` at once.
 
+    Returns a dict of app id to the popularity of that app in the format of
+    `_get_installs`.
 
-@cronjobs.register
-@use_master
-def update_app_installs():
     """
-    Update app install counts for all published apps.
+    buckets = _query_apps(get_monolith_client(), app_ids,
+                          _installs_aggregations())
+    return dict((app_id, _installs_scores(bucket))
+                for app_id, bucket in buckets.items())
 
-    We break these into chunks so we can bulk index them. Each chunk will
-    process the apps in it and reindex them in bulk. After all the chunks are
-    processed we find records that haven't been updated and purge/reindex those
-    so we nullify their values.
 
+def _save_scores(model, app_ids, scores, now):
     """
-    chunk_size = 100
+    Save the `scores` of the apps in `app_ids` to `model`, which is either
+    Installs or Trending.
+
+    `scores` is a dict of app id to the scores of the app as returned by
+    `_get_installs` or `_get_trending`. Rows with a score <= 0 are deleted.
+
+    Returns the ids of the apps that have a score.
+
+    """
+    regions = [(0, 'all')] + [(region.id, region.slug) for region in
+                              mkt.regions.REGIONS_DICT.values()]
+    values = {}
+    for app_id in app_ids:
+        app_scores = scores.get(app_id, {})
+        for region_id, region_slug in regions:
+            value = app_scores.get(region_slug)
+            if value > 0:
+                values[(app_id, region_id)] = value
+    scored_ids = set(app_id for app_id, region_id in values)
+
+    to_create = []
+    to_update = []
+    to_touch = []
+    to_delete = []
+    existing = (model.objects.filter(addon__in=app_ids)
+                .values_list('id', 'addon', 'region', 'value'))
+    for pk, app_id, region_id, old_value in existing:
+        value = values.pop((app_id, region_id), None)
+        if value is None:
+            # The value is <= 0 so we can just ignore it.
+            to_delete.append(pk)
+        elif value == old_value:
+            to_touch.append(pk)
+        else:
+            to_update.append((pk, value))
+    for (app_id, region_id), value in values.items():
+        to_create.append(model(addon_id=app_id, region=region_id,
+                               value=value))
+
+    if to_delete:
+        model.objects.filter(pk__in=to_delete).delete()
+    # Force update `modified` even if no data changes so that these records
+    # are not purged.
+    if to_touch:
+        model.objects.filter(pk__in=to_touch).update(modified=now)
+    if to_update:
+        _bulk_update_values(model, to_update, now)
+    if to_create:
+        model.objects.bulk_create(to_create)
+
+    return scored_ids
+
+
+def _bulk_update_values(model, to_update, now):
+    """
+    Set the values of the `model` rows in `to_update`, a list of (pk, value)
+    pairs, with one UPDATE per chunk of rows.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    cursor = connection.cursor()
+    for chunk in chunked(to_update, 500):
+        cases = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+        ids = ', '.join(['%s'] * len(chunk))
+        sql = ('UPDATE %s SET value = CASE id %s END, modified = %%s '
+               'WHERE id IN (%s)' % (table, cases, ids))
+        params = [param for pair in chunk for param in pair]
+        params.append(now)
+        params.extend(pk for pk, value in chunk)
+        cursor.execute(sql, params)
+
+
+def _update_scores(model, get_scores):
+    """
+    Update `model`, either Installs or Trending, for all published apps.
+
+    We break the apps into chunks so we can fetch their scores from Monolith
+    with a single request per chunk, and save and reindex them in bulk. After
+    all the chunks are processed we find records that haven't been updated and
+    purge/reindex those so we nullify their values.
+
+    """
+    chunk_size = 500
+    index_chunk_size = 100
 
     ids = list(Webapp.objects.filter(status=mkt.STATUS_PUBLIC,
                                      disabled_by_user=False)
                      .values_list('id', flat=True))
 
     for chunk in chunked(ids, chunk_size):
+        now = datetime.now()
+        t_start = time.time()
 
-        count = 0
-        times = []
-        reindex_ids = []
-
-        for app in Webapp.objects.filter(id__in=chunk).no_transforms():
+        scores = get_scores(chunk)
+        t_fetched = time.time()
+        reindex_ids = _save_scores(model, chunk, scores, now)
 
-            reindex = False
-            count += 1
-            now = datetime.now()
-            t_start = time.time()
+        # Now reindex the apps that actually have a value.
+        for reindex_chunk in chunked(sorted(reindex_ids), index_chunk_size):
+            WebappIndexer.run_indexing(reindex_chunk)
 
-            scores = _get_installs(app.id)
-
-            # Update global installs, then per-region installs below.
-            value = scores.get('all')
-            if value > 0:
-                reindex = True
-                installs, created = app.popularity.get_or_create(
-                    region=0, defaults={'value': value})
-                if not created:
-                    installs.update(value=value, modified=now)
-            else:
-                # The value is <= 0 so we can just ignore it.
-                app.popularity.filter(region=0).delete()
-
-            for region in mkt.regions.REGIONS_DICT.values():
-                value = scores.get(region.slug)
-                if value > 0:
-                    reindex = True
-                    installs, created = app.popularity.get_or_create(
-                        region=region.id, defaults={'value': value})
-                    if not created:
-                        installs.update(value=value, modified=now)
-                else:
-                    # The value is <= 0 so we can just ignore it.
-                    app.popularity.filter(region=region.id).delete()
-
-            if reindex:
-                reindex_ids.append(app.id)
-
-            times.append(time.time() - t_start)
-
-        # Now reindex the apps that actually have a popularity value.
-        if reindex_ids:
-            WebappIndexer.run_indexing(reindex_ids)
-
-        log.info('Installs calculated for %s apps. Avg time overall: '
-                 '%0.2fs' % (count, sum(times) / count))
+        log.info('%s calculated for %s apps. Monolith: %0.2fs, overall: '
+                 '%0.2fs' % (model.__name__, len(chunk), t_fetched - t_start,
+                             time.time() - t_start))
 
     # Purge any records that were not updated.
     #
@@ -262,39 +365,31 @@ def update_app_installs():
     now = datetime.now()
     midnight = datetime(year=now.year, month=now.month, day=now.day)
 
-    qs = Installs.objects.filter(modified__lte=midnight)
+    qs = model.objects.filter(modified__lte=midnight)
     # First get the IDs so we know what to reindex.
-    purged_ids = qs.values_list('addon', flat=True).distinct()
+    purged_ids = list(qs.values_list('addon', flat=True).distinct())
     # Then delete them.
     qs.delete()
 
-    for ids in chunked(purged_ids, chunk_size):
+    for ids in chunked(purged_ids, index_chunk_size):
         WebappIndexer.run_indexing(ids)
 
 
-def _get_trending(app_id):
-    """
-    Calculate trending for app for all regions and per region.
-
-    a = installs from 8 days ago to 1 day ago
-    b = installs from 29 days ago to 9 days ago, averaged per week
-    trending = (a - b) / b if a > 100 and b > 1 else 0
-
-    Returns value in the format of::
+@cronjobs.register
+@use_master
+def update_app_installs():
+    """Update app install counts for all published apps."""
+    _update_scores(Installs, _get_installs_for_apps)
 
-        {'all': <global trending score>,
-         <region_slug>: <regional trending score>,
-         ...}
 
-    """
-    # How many app installs are required in the prior week to be considered
-    # "trending". Adjust this as total Marketplace app installs increases.
-    #
-    # Note: AMO uses 1000.0 for add-ons.
-    PRIOR_WEEK_INSTALL_THRESHOLD = 100.0
+# How many app installs are required in the prior week to be considered
+# "trending". Adjust this as total Marketplace app installs increases.
+#
+# Note: AMO uses 1000.0 for add-ons.
+PRIOR_WEEK_INSTALL_THRESHOLD = 100.0
 
-    client = get_monolith_client()
 
+def _trending_aggregations():
     week1 = {
         'filter': {
             'range': {
@@ -330,41 +425,24 @@ def _get_trending(app_id):
         }
     }
 
-    query = {
-        'query': {
-            'filtered': {
-                'query': {'match_all': {}},
-                'filter': {'term': {'app-id': app_id}}
+    return {
+        'week1': week1,
+        'week3': week3,
+        'region': {
+            'terms': {
+                'field': 'region',
+                # Add size so we get all regions, not just the top 10.
+                'size': len(mkt.regions.ALL_REGIONS)
+            },
+            'aggregations': {
+                'week1': week1,
+                'week3': week3
             }
-        },
-        'aggregations': {
-            'week1': week1,
-            'week3': week3,
-            'region': {
-                'terms': {
-                    'field': 'region',
-                    # Add size so we get all regions, not just the top 10.
-                    'size': len(mkt.regions.ALL_REGIONS)
-                },
-                'aggregations': {
-                    'week1': week1,
-                    'week3': week3
-                }
-            }
-        },
-        'size': 0
+        }
     }
 
-    try:
-        res = client.raw(query)
-    except ValueError as e:
-        task_log.error('Error response from Monolith: {0}'.format(e))
-        return {}
-
-    if 'aggregations' not in res:
-        task_log.error('No installs for app {}'.format(app_id))
-        return {}
 
+def _trending_scores(aggregations):
     def _score(week1, week3):
         # If last week app installs are < 100, this app isn't trending.
         if week1 < PRIOR_WEEK_INSTALL_THRESHOLD:
@@ -378,8 +456,8 @@ def _get_trending(app_id):
         return score
 
     # Global trending score.
-    week1 = res['aggregations']['week1']['total_installs']['value']
-    week3 = res['aggregations']['week3']['total_installs']['value'] / 3.0
+    week1 = aggregations['week1']['total_installs']['value']
+    week3 = aggregations['week3']['total_installs']['value'] / 3.0
 
     if week1 < PRIOR_WEEK_INSTALL_THRESHOLD:
         # If global installs over the last week aren't over 100, we
@@ -392,8 +470,8 @@ def _get_trending(app_id):
         'all': _score(week1, week3)
     }
 
-    if 'region' in res['aggregations']:
-        for regional_res in res['aggregations']['region']['buckets']:
+    if 'region' in aggregations:
+        for regional_res in aggregations['region']['buckets']:
             region_slug = regional_res['key']
             week1 = regional_res['week1']['total_installs']['value']
             week3 = regional_res['week3']['total_installs']['value'] / 3.0
@@ -402,92 +480,66 @@ def _get_trending(app_id):
     return results
 
 
-@cronjobs.register
-@use_master
-def update_app_trending():
+def _get_trending(app_id):
     """
-    Update trending for all published apps.
+    Calculate trending for app for all regions and per region.
 
-    We break these into chunks so we can bulk index them. Each chunk will
-    process the apps in it and reindex them in bulk. After all the chunks are
-    processed we find records that haven't been updated and purge/reindex those
-    so we nullify their values.
+    a = installs from 8 days ago to 1 day ago
+    b = installs from 29 days ago to 9 days ago, averaged per week
+    trending = (a - b) / b if a > 100 and b > 1 else 0
+
+    Returns value in the format of::
+
+        {'all': <global trending score>,
+         <region_slug>: <regional trending score>,
+         ...}
 
     """
-    chunk_size = 100
+    client = get_monolith_client()
 
-    ids = list(Webapp.objects.filter(status=mkt.STATUS_PUBLIC,
-                                     disabled_by_user=False)
-                     .values_list('id', flat=True))
+    query = {
+        'query': {
+            'filtered': {
+                'query': {'match_all': {}},
+                'filter': {'term': {'app-id': app_id}}
+            }
+        },
+        'aggregations': _trending_aggregations(),
+        'size': 0
+    }
 
-    for chunk in chunked(ids, chunk_size):
+    try:
+        res = client.raw(query)
+    except ValueError as e:
+        task_log.error('Error response from Monolith: {0}'.format(e))
+        return {}
 
-        count = 0
-        times = []
-        reindex_ids = []
+    if 'aggregations' not in res:
+        task_log.error('No installs for app {}'.format(app_id))
+        return {}
 
-        for app in Webapp.objects.filter(id__in=chunk).no_transforms():
+    return _trending_scores(res['aggregations'])
 
-            reindex = False
-            count += 1
-            now = datetime.now()
-            t_start = time.time()
 
-            scores = _get_trending(app.id)
+def _get_trending_for_apps(app_ids):
+    """
+    Like `_get_trending` but for all the apps in `app_ids` at once.
 
-            # Update global trending, then per-region trending below.
-            value = scores.get('all')
-            if value > 0:
-                reindex = True
-                trending, created = app.trending.get_or_create(
-                    region=0, defaults={'value': value})
-                if not created:
-                    trending.update(value=value, modified=now)
-            else:
-                # The value is <= 0 so the app is not trending. Let's remove it
-                # from the trending table.
-                app.trending.filter(region=0).delete()
-
-            for region in mkt.regions.REGIONS_DICT.values():
-                value = scores.get(region.slug)
-                if value > 0:
-                    reindex = True
-                    trending, created = app.trending.get_or_create(
-                        region=region.id, defaults={'value': value})
-                    if not created:
-                        trending.update(value=value, modified=now)
-                else:
-                    # The value is <= 0 so the app is not trending.
-                    # Let's remove it from the trending table.
-                    app.trending.filter(region=region.id).delete()
-
-            times.append(time.time() - t_start)
-
-            if reindex:
-                reindex_ids.append(app.id)
-
-        # Now reindex the apps that actually have a trending score.
-        if reindex_ids:
-            WebappIndexer.run_indexing(reindex_ids)
-
-        log.info('Trending calculated for %s apps. Avg time overall: '
-                 '%0.2fs' % (count, sum(times) / count))
+    Returns a dict of app id to the trending scores of that app in the format
+    of `_get_trending`.
 
-    # Purge any records that were not updated.
-    #
-    # Note: We force update `modified` even if no data changes so any records
-    # with older modified times can be purged.
-    now = datetime.now()
-    midnight = datetime(year=now.year, month=now.month, day=now.day)
+    """
+    buckets = _query_apps(get_monolith_client(), app_ids,
+                          _trending_aggregations())
+    return dict((app_id, _trending_scores(bucket))
+                for app_id, bucket in buckets.items())
 
-    qs = Trending.objects.filter(modified__lte=midnight)
-    # First get the IDs so we know what to reindex.
-    purged_ids = qs.values_list('addon', flat=True).distinct()
-    # Then delete them.
-    qs.delete()
 
-    for ids in chunked(purged_ids, chunk_size):
-        WebappIndexer.run_indexing(ids)
+@cronjobs.register
+@use_master
+def update_app_trending():
+    """Update trending for all published apps."""
+    _update_scores(Trending, _get_trending_for_apps)
 
 
 @cronjobs.register
@@ -540,10 +592,9 @@ def mkt_gc(**kw):
     """Site-wide garbage collections."""
     log.info('Collecting data to delete')
     logs = (ActivityLog.objects.filter(created__lt=days_ago(90))
-            .exclude(action__in=mkt.LOG_KEEP).values_list('id', flat=True))
+            .exclude(action__in=mkt.LOG_KEEP))
 
-    for chunk in chunked(logs, 100):
-        chunk.sort()
+    for chunk in keyset_chunked(logs, 100):
         log.info('Deleting log entries: %s' % str(chunk))
         delete_logs.delay(chunk)
 
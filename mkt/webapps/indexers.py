@@ -1,7 +1,7 @@
 from operator import attrgetter
 
 from django.core.urlresolvers import reverse
-from django.db.models import Min
+from django.db.models.query import prefetch_related_objects
 
 import commonware.log
 from elasticsearch_dsl import F
@@ -230,20 +230,56 @@ class WebappIndexer(BaseIndexer):
 
         return mapping
 
+    @classmethod
+    def attach_related_data(cls, objs):
+        """
+        Attach everything we need to index apps, using a constant number of
+        queries regardless of the number of apps.
+        """
+        from mkt.versions.models import Version
+        from mkt.webapps.models import (attach_devices, attach_prices,
+                                        attach_translations)
+
+        objs = [obj for obj in objs
+                if not getattr(obj, '_indexing_data_attached', False)]
+        if not objs:
+            return
+
+        for transform in (attach_devices, attach_prices, attach_tags,
+                          attach_translations):
+            transform(objs)
+
+        # Reverse relations are prefetched, extract_document() only accesses
+        # them through all() so that the prefetched results are used.
+        prefetch_related_objects(objs, [
+            '_geodata', '_upsell_from__premium', 'addonexcludedregion',
+            'addonpremium__price', 'addonuser_set', 'content_ratings',
+            'escalationqueue_set', 'popularity', 'previews',
+            'rating_descriptors', 'rating_interactives', 'rereviewqueue_set',
+            'trending', 'versions'])
+
+        # Current and latest versions have been attached by the transformer,
+        # fetch what we need from them.
+        versions = filter(None, [obj.current_version for obj in objs] +
+                          [obj.latest_version for obj in objs])
+        prefetch_related_objects(versions, ['features', 'manifest_json'])
+        attach_trans_dict(Version, versions)
+
+        for obj in objs:
+            obj._indexing_data_attached = True
+
     @classmethod
     def extract_document(cls, pk=None, obj=None):
         """Extracts the ElasticSearch index document for this instance."""
-        from mkt.webapps.models import (AppFeatures, attach_devices,
-                                        attach_prices, attach_translations,
-                                        RatingDescriptors, RatingInteractives)
+        from mkt.webapps.models import (AppFeatures, RatingDescriptors,
+                                        RatingInteractives)
 
         if obj is None:
             obj = cls.get_model().objects.get(pk=pk)
 
-        # Attach everything we need to index apps.
-        for transform in (attach_devices, attach_prices, attach_tags,
-                          attach_translations):
-            transform([obj])
+        # Attach everything we need to index apps, unless this was already
+        # done in bulk by extract_documents().
+        cls.attach_related_data([obj])
 
         latest_version = obj.latest_version
         version = obj.current_version
@@ -283,14 +319,13 @@ class WebappIndexer(BaseIndexer):
             if version else ['*'])
         d['is_priority'] = obj.priority_review
 
-        is_escalated = obj.escalationqueue_set.exists()
-        d['is_escalated'] = is_escalated
-        d['escalation_date'] = (obj.escalationqueue_set.get().created
-                                if is_escalated else None)
-        is_rereviewed = obj.rereviewqueue_set.exists()
-        d['is_rereviewed'] = is_rereviewed
-        d['rereview_date'] = (obj.rereviewqueue_set.get().created
-                              if is_rereviewed else None)
+        escalations = list(obj.escalationqueue_set.all())
+        d['is_escalated'] = bool(escalations)
+        d['escalation_date'] = (escalations[0].created
+                                if escalations else None)
+        rereviews = list(obj.rereviewqueue_set.all())
+        d['is_rereviewed'] = bool(rereviews)
+        d['rereview_date'] = rereviews[0].created if rereviews else None
 
         if latest_version:
             d['latest_version'] = {
@@ -313,8 +348,8 @@ class WebappIndexer(BaseIndexer):
         d['manifest_url'] = obj.get_manifest_url()
         d['package_path'] = obj.get_package_path()
         d['name_sort'] = unicode(obj.name).lower()
-        d['owners'] = [au.user.id for au in
-                       obj.addonuser_set.filter(role=mkt.AUTHOR_ROLE_OWNER)]
+        d['owners'] = [au.user_id for au in obj.addonuser_set.all()
+                       if au.role == mkt.AUTHOR_ROLE_OWNER]
 
         d['previews'] = [{'filetype': p.filetype, 'modified': p.modified,
                           'id': p.id, 'sizes': p.sizes}
@@ -329,9 +364,10 @@ class WebappIndexer(BaseIndexer):
             'average': obj.average_rating,
             'count': obj.total_reviews,
         }
-        d['region_exclusions'] = obj.get_excluded_region_ids()
-        d['reviewed'] = obj.versions.filter(
-            deleted=False).aggregate(Min('reviewed')).get('reviewed__min')
+        d['region_exclusions'] = obj.get_precomputed_excluded_region_ids()
+        all_versions = list(obj.versions.all())
+        d['reviewed'] = min([v.reviewed for v in all_versions
+                             if v.reviewed and not v.deleted] or [None])
 
         # The default locale of the app is considered "supported" by default.
         supported_locales = [obj.default_locale]
@@ -342,8 +378,7 @@ class WebappIndexer(BaseIndexer):
         d['supported_locales'] = list(set(supported_locales))
 
         d['tags'] = getattr(obj, 'tags_list', [])
-        d['tv_featured'] = obj.tags.filter(
-            tag_text='featured-tv').exists()
+        d['tv_featured'] = 'featured-tv' in d['tags']
 
         if obj.upsell and obj.upsell.premium.is_published():
             upsell_obj = obj.upsell.premium
@@ -353,12 +388,13 @@ class WebappIndexer(BaseIndexer):
                 'icon_url': upsell_obj.get_icon_url(128),
                 # TODO: Store all localizations of upsell.name.
                 'name': unicode(upsell_obj.name),
-                'region_exclusions': upsell_obj.get_excluded_region_ids()
+                'region_exclusions':
+                    upsell_obj.get_precomputed_excluded_region_ids()
             }
 
         d['versions'] = [dict(version=v.version,
                               resource_uri=reverse_version(v))
-                         for v in obj.versions.all()]
+                         for v in all_versions]
 
         # Handle localized fields.
         # This adds both the field used for search and the one with
@@ -372,7 +408,8 @@ class WebappIndexer(BaseIndexer):
             d.update(cls.extract_field_translations(obj, field))
 
         if version:
-            attach_trans_dict(version._meta.model, [version])
+            if not hasattr(version, 'translations'):
+                attach_trans_dict(version._meta.model, [version])
             d.update(cls.extract_field_translations(
                 version, 'release_notes', db_field='releasenotes_id'))
         else:
@@ -421,16 +458,7 @@ class WebappIndexer(BaseIndexer):
         qs = Webapp.with_deleted.filter(id__in=ids)
         ES = ES or cls.get_es()
 
-        docs = []
-        for obj in list(qs):
-            try:
-                docs.append(cls.extract_document(obj.id, obj=obj))
-            except Exception as e:
-                log.error('Failed to index webapp {0}: {1}'
-                          .format(obj.id, repr(e)),
-                          # Trying to chase down a cache-machine problem.
-                          exc_info="marketplace:" in str(e))
-
+        docs = cls.extract_documents(qs)
         cls.bulk_index(docs, es=ES, index=index or cls.get_index())
 
     @classmethod
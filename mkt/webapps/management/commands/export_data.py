@@ -1,3 +1,5 @@
+from optparse import make_option
+
 from django.core.management.base import BaseCommand
 
 from mkt.webapps.tasks import export_data
@@ -5,7 +7,15 @@ from mkt.webapps.tasks import export_data
 
 class Command(BaseCommand):
     help = 'Export our data as a tgz for third-parties'
+    option_list = BaseCommand.option_list + (
+        make_option('--name',
+                    help='Name of the tarball, defaults to today\'s date.'),
+        make_option('--resume', action='store_true', default=False,
+                    help='Reuse the app chunks already dumped by a previous '
+                         'export instead of dumping everything again.'),
+    )
 
     def handle(self, *args, **kwargs):
         # Execute as a celery task so we get the right permissions.
-        export_data.delay()
+        export_data.delay(name=kwargs.get('name'),
+                          resume=kwargs.get('resume', False))
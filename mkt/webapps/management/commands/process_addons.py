@@ -8,10 +8,12 @@ from celery import chord, group
 import mkt
 from mkt.site.utils import chunked
 from mkt.webapps.models import Webapp
-from mkt.webapps.tasks import update_manifests, update_supported_locales
+from mkt.webapps.tasks import (update_excluded_regions, update_manifests,
+                               update_supported_locales)
 
 
 tasks = {
+    'update_excluded_regions': {'method': update_excluded_regions},
     'update_manifests': {'method': update_manifests,
                          'qs': [Q(is_packaged=False,
                                   status__in=[mkt.STATUS_PENDING,
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapps', '0006_remove_preview_thumbtype'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webapp',
+            name='excluded_regions_bitmap',
+            field=models.CharField(max_length=1024, null=True, blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -10,7 +10,6 @@ import urlparse
 import uuid
 
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.urlresolvers import reverse
 from django.db import models, transaction
@@ -20,7 +19,6 @@ from django.utils.translation import trans_real as translation
 
 import commonware.log
 import waffle
-from cache_nuggets.lib import memoize, memoize_key
 from django_extensions.db.fields.json import JSONField
 from jingo.helpers import urlparams
 from jinja2.filters import do_dictsort
@@ -46,7 +44,8 @@ from mkt.files.models import File, nfd_str
 from mkt.files.utils import parse_addon, WebAppParser
 from mkt.prices.models import AddonPremium
 from mkt.ratings.models import Review
-from mkt.regions.utils import parse_region
+from mkt.regions.utils import (decode_region_bitmap, encode_region_bitmap,
+                               parse_region)
 from mkt.site.decorators import use_master
 from mkt.site.helpers import absolutify
 from mkt.site.mail import send_mail
@@ -374,6 +373,30 @@ class WebappManager(ManagerBase):
             '%s_status' % column_prefix: mkt.STATUS_PENDING,
         }).order_by('-%s_nominated' % column_prefix)
 
+    def available_in_region(self, region):
+        """
+        Apps that are not excluded from `region` by their addon excluded
+        regions or geodata flags, according to their precomputed
+        `excluded_regions_bitmap`. Unlike search, paid apps stay available in
+        regions without their price tier.
+
+        Apps whose bitmap hasn't been computed yet fall back to the checks
+        of get_excluded_in(), done with subqueries.
+        """
+        region = parse_region(region)
+        aers = AddonExcludedRegion.objects.filter(
+            region=region.id).values('addon')
+        not_computed = ~Q(id__in=aers)
+        geodata_qs = geodata_exclusion_q(region)
+        if geodata_qs:
+            not_computed &= ~Q(id__in=Geodata.objects.filter(
+                geodata_qs).values('addon'))
+        return self.filter(
+            Q(excluded_regions_bitmap__isnull=False) | not_computed).extra(
+            where=['(addons.excluded_regions_bitmap IS NULL OR '
+                   "SUBSTRING(addons.excluded_regions_bitmap, %s, 1) != '1')"],
+            params=[region.id + 1])
+
     def rated(self):
         """IARC."""
         return self.exclude(content_ratings__isnull=True)
@@ -494,6 +517,11 @@ class Webapp(UUIDModelMixin, OnChangeMixin, ModelBase):
     # Initially, for desktop games.
     hosted_url = models.URLField(max_length=255, blank=True, null=True)
 
+    # Denormalized get_excluded_region_ids(), see encode_region_bitmap().
+    # Null until the app's exclusions have been computed.
+    excluded_regions_bitmap = models.CharField(max_length=1024, null=True,
+                                               blank=True)
+
     objects = WebappManager()
     with_deleted = WebappManager(include_deleted=True)
 
@@ -1660,21 +1688,17 @@ class Webapp(UUIDModelMixin, OnChangeMixin, ModelBase):
 
         Note: free and in-app are not included in this.
         """
-        excluded = set(self.addonexcludedregion
-                           .values_list('region', flat=True))
-
-        if self.is_premium():
-            all_regions = set(mkt.regions.ALL_REGION_IDS)
-            # Find every region that does not have payments supported
-            # and add that into the exclusions.
-            #
-            # All the regions that are currently paid for an app.
-            price_ids = self.get_price_region_ids()
-            if RESTOFWORLD.id in excluded or RESTOFWORLD.id not in price_ids:
-                # If the "rest of the world" is excluded or its not in the
-                # list of valid price ids then we need to exclude all
-                # countries that don't have payments.
-                excluded = excluded.union(all_regions.difference(price_ids))
+        excluded = set(self.get_listing_excluded_region_ids())
+        return sorted(excluded.union(self.get_unpriced_region_ids(excluded)))
+
+    def get_listing_excluded_region_ids(self):
+        """
+        Return IDs of regions for which this app is excluded by its addon
+        excluded regions and geodata flags, i.e. what get_excluded_in()
+        checks.
+        """
+        # Use all() so that exclusions prefetched by the indexer are used.
+        excluded = set(aer.region for aer in self.addonexcludedregion.all())
 
         geo = self.geodata
         if geo.region_de_iarc_exclude or geo.region_de_usk_exclude:
@@ -1684,6 +1708,49 @@ class Webapp(UUIDModelMixin, OnChangeMixin, ModelBase):
 
         return sorted(list(excluded))
 
+    def get_unpriced_region_ids(self, excluded):
+        """
+        Return IDs of regions this premium app is excluded from because they
+        don't have its price tier set, given the `excluded` listing regions.
+        """
+        if not self.is_premium():
+            return []
+        all_regions = set(mkt.regions.ALL_REGION_IDS)
+        # Find every region that does not have payments supported
+        # and add that into the exclusions.
+        #
+        # All the regions that are currently paid for an app.
+        price_ids = self.get_price_region_ids()
+        if RESTOFWORLD.id in excluded or RESTOFWORLD.id not in price_ids:
+            # If the "rest of the world" is excluded or its not in the
+            # list of valid price ids then we need to exclude all
+            # countries that don't have payments.
+            return sorted(all_regions.difference(price_ids))
+        return []
+
+    def get_precomputed_excluded_region_ids(self):
+        """
+        Return IDs of regions for which this app is excluded, as stored by
+        update_excluded_regions(), falling back to get_excluded_region_ids()
+        for apps that haven't been computed yet.
+        """
+        if self.excluded_regions_bitmap is not None:
+            return decode_region_bitmap(self.excluded_regions_bitmap)
+        return self.get_excluded_region_ids()
+
+    def update_excluded_regions(self):
+        """
+        Recompute the regions this app is excluded from and store them in
+        `excluded_regions_bitmap`. Regions only excluded for lack of a price
+        are flagged apart, as available_in_region() doesn't filter on them.
+        """
+        listing = self.get_listing_excluded_region_ids()
+        unpriced = self.get_unpriced_region_ids(listing)
+        self.update(
+            excluded_regions_bitmap=encode_region_bitmap(listing, unpriced),
+            _signal=False)
+        return sorted(set(listing).union(unpriced))
+
     def get_price_region_ids(self):
         tier = self.get_tier()
         if tier:
@@ -2303,6 +2370,15 @@ def watch_status(old_attr={}, new_attr={}, instance=None, sender=None, **kw):
                       % addon.id)
 
 
+@Webapp.on_change
+def watch_premium_type(old_attr={}, new_attr={}, instance=None, sender=None,
+                       **kw):
+    """Paid apps are excluded from regions without their price tier."""
+    if (old_attr.get('id') and
+            old_attr.get('premium_type') != new_attr.get('premium_type')):
+        instance.update_excluded_regions()
+
+
 @Webapp.on_change
 def watch_disabled(old_attr={}, new_attr={}, instance=None, sender=None, **kw):
     attrs = dict((k, v) for k, v in old_attr.items()
@@ -2391,24 +2467,30 @@ class AddonExcludedRegion(ModelBase):
         return mkt.regions.REGIONS_CHOICES_ID_DICT.get(self.region)
 
 
-@memoize(prefix='get_excluded_in')
-def get_excluded_in(region_id):
+def geodata_exclusion_q(region):
     """
-    Return IDs of Webapp objects excluded from a particular region or excluded
-    due to Geodata flags.
+    Return a Q matching the Geodata of apps excluded from `region` by their
+    Geodata flags, or an empty Q if there are none for that region.
     """
-    aers = list(AddonExcludedRegion.objects.filter(region=region_id)
-                .values_list('addon', flat=True))
-
-    # For pre-IARC unrated games in Brazil/Germany.
     geodata_qs = Q()
-    region = parse_region(region_id)
+    # For pre-IARC unrated games in Brazil/Germany.
     if region in (mkt.regions.BRA, mkt.regions.DEU):
         geodata_qs |= Q(**{'region_%s_iarc_exclude' % region.slug: True})
     # For USK_RATING_REFUSED apps in Germany.
     if region == mkt.regions.DEU:
         geodata_qs |= Q(**{'region_de_usk_exclude': True})
+    return geodata_qs
+
+
+def get_excluded_in(region_id):
+    """
+    Return IDs of Webapp objects excluded from a particular region or excluded
+    due to Geodata flags.
+    """
+    aers = list(AddonExcludedRegion.objects.filter(region=region_id)
+                .values_list('addon', flat=True))
 
+    geodata_qs = geodata_exclusion_q(parse_region(region_id))
     geodata_exclusions = []
     if geodata_qs:
         geodata_exclusions = list(Geodata.objects.filter(geodata_qs)
@@ -2416,12 +2498,39 @@ def get_excluded_in(region_id):
     return set(aers + geodata_exclusions)
 
 
+def update_excluded_regions_for(instance):
+    """Recompute the excluded regions of the app `instance` belongs to."""
+    try:
+        app = instance.addon
+    except ObjectDoesNotExist:
+        # The app is being deleted.
+        return
+    app.update_excluded_regions()
+
+
 @receiver(models.signals.post_save, sender=AddonExcludedRegion,
-          dispatch_uid='clean_memoized_exclusions')
-def clean_memoized_exclusions(sender, **kw):
+          dispatch_uid='save_excluded_region_bitmap')
+@receiver(models.signals.post_delete, sender=AddonExcludedRegion,
+          dispatch_uid='delete_excluded_region_bitmap')
+def update_excluded_regions_aer(sender, instance, **kw):
     if not kw.get('raw'):
-        cache.delete_many([memoize_key('get_excluded_in', k)
-                           for k in mkt.regions.ALL_REGION_IDS])
+        update_excluded_regions_for(instance)
+
+
+@receiver(models.signals.post_save, sender=AddonPremium,
+          dispatch_uid='save_premium_region_bitmap')
+@receiver(models.signals.post_delete, sender=AddonPremium,
+          dispatch_uid='delete_premium_region_bitmap')
+def update_excluded_regions_premium(sender, instance, **kw):
+    if kw.get('raw'):
+        return
+    try:
+        # Don't let a premium cached before this change hide the new tier.
+        instance.addon._premium = (
+            None if kw['signal'] is models.signals.post_delete else instance)
+    except ObjectDoesNotExist:
+        return
+    update_excluded_regions_for(instance)
 
 
 class IARCInfo(ModelBase):
@@ -2781,3 +2890,18 @@ for region in (mkt.regions.BRA, mkt.regions.DEU):
 # Save geodata translations when a Geodata instance is saved.
 models.signals.pre_save.connect(save_signal, sender=Geodata,
                                 dispatch_uid='geodata_translations')
+
+GEODATA_EXCLUSION_FIELDS = frozenset(['region_br_iarc_exclude',
+                                      'region_de_iarc_exclude',
+                                      'region_de_usk_exclude'])
+
+
+@receiver(models.signals.post_save, sender=Geodata,
+          dispatch_uid='save_geodata_region_bitmap')
+def update_excluded_regions_geodata(sender, instance, **kw):
+    # A new Geodata has no exclusion flags set yet.
+    if kw.get('raw') or kw.get('created'):
+        return
+    update_fields = kw.get('update_fields')
+    if update_fields is None or GEODATA_EXCLUSION_FIELDS & update_fields:
+        update_excluded_regions_for(instance)
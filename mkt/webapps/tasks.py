@@ -5,7 +5,10 @@ import logging
 import os
 import shutil
 import subprocess
+import tarfile
 import tempfile
+import time
+from cStringIO import StringIO
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
@@ -27,13 +30,14 @@ from mkt.constants.regions import RESTOFWORLD
 from mkt.developers.models import ActivityLog
 from mkt.developers.tasks import _fetch_manifest, validator
 from mkt.files.models import FileUpload
+from mkt.prices.models import price_matrix
 from mkt.reviewers.models import RereviewQueue
 from mkt.site.decorators import use_master
 from mkt.site.helpers import absolutify
 from mkt.site.mail import send_mail_jinja
 from mkt.site.storage_utils import (copy_stored_file, local_storage,
                                     private_storage, public_storage,
-                                    walk_storage)
+                                    rename_stored_file, walk_storage)
 from mkt.site.utils import JSONEncoder, chunked
 from mkt.users.models import UserProfile
 from mkt.users.utils import get_task_user
@@ -318,7 +322,22 @@ def update_supported_locales(ids, **kw):
                 _log(app, u'Updating supported locales failed.', exc_info=True)
 
 
-@post_request_task(acks_late=True)
+@post_request_task(acks_late=True, merge_ids='list')
+@use_master
+def update_excluded_regions(ids, **kw):
+    """
+    Recompute the excluded regions of apps, e.g. after a change to their
+    price tier, and reindex them.
+    """
+    # Make sure the region lookups see the price tier change.
+    price_matrix.reset()
+    for chunk in chunked(ids, 50):
+        for app in Webapp.objects.filter(id__in=chunk):
+            app.update_excluded_regions()
+    index_webapps(ids)
+
+
+@post_request_task(acks_late=True, merge_ids='list')
 @use_master
 def index_webapps(ids, **kw):
     # DEPRECATED: call WebappIndexer.index_ids directly.
@@ -334,7 +353,7 @@ def index_webapps(ids, **kw):
         WebappIndexer.index_ids(list(webapps), no_delay=True)
 
 
-@post_request_task(acks_late=True)
+@post_request_task(acks_late=True, merge_ids='list')
 @use_master
 def unindex_webapps(ids, **kw):
     # DEPRECATED: call WebappIndexer.unindexer directly.
@@ -342,36 +361,52 @@ def unindex_webapps(ids, **kw):
     WebappIndexer.unindexer(ids)
 
 
-@task
-def dump_app(id, **kw):
-    from mkt.webapps.serializers import AppSerializer
-    target_dir = os.path.join(settings.DUMPED_APPS_PATH, 'apps',
-                              str(id / 1000))
-    target_file = os.path.join(target_dir, str(id) + '.json')
-
-    try:
-        obj = Webapp.objects.get(pk=id)
-    except Webapp.DoesNotExist:
-        task_log.info(u'Webapp does not exist: {0}'.format(id))
-        return
-
+def _dump_request():
     req = RequestFactory().get('/')
     req.user = AnonymousUser()
     req.REGION = RESTOFWORLD
+    return req
 
-    task_log.info('Dumping app {0} to {1}'.format(id, target_file))
-    res = AppSerializer(obj, context={'request': req}).data
-    with private_storage.open(target_file, 'w') as fileobj:
-        json.dump(res, fileobj, cls=JSONEncoder)
-    return target_file
+
+def _dump_app_path(id):
+    """Path of an app inside the apps/ directory of the dump."""
+    return os.path.join('apps', str(id / 1000), str(id) + '.json')
+
+
+def _dump_chunk_path(ids):
+    return os.path.join(settings.DUMPED_APPS_PATH, 'chunks',
+                        '%s-%s.json' % (ids[0], ids[-1]))
 
 
 @task(ignore_result=False)
-def dump_apps(ids, **kw):
+def dump_apps(ids, resume=False, **kw):
+    """
+    Serializes a chunk of apps as newline-delimited JSON in a single chunk
+    file in private storage, which is what compress_export reads back.
+
+    The apps are loaded with one query, going through the Webapp transformer.
+    The chunk is written to a temporary file first and only renamed to its
+    final name once complete. When `resume` is True and the chunk file
+    already exists it is kept as is, so that a failed export can be restarted
+    without redoing every chunk.
+    """
+    from mkt.webapps.serializers import AppSerializer
+    target_file = _dump_chunk_path(ids)
+    if resume and private_storage.exists(target_file):
+        task_log.info(u'Skipping already dumped apps {0} to {1}.'
+                      .format(ids[0], ids[-1]))
+        return target_file
+
     task_log.info(u'Dumping apps {0} to {1}. [{2}]'
                   .format(ids[0], ids[-1], len(ids)))
-    for id in ids:
-        dump_app(id)
+    context = {'request': _dump_request()}
+    tmp_file = target_file + '.tmp'
+    with private_storage.open(tmp_file, 'w') as fileobj:
+        for obj in Webapp.objects.filter(pk__in=ids).order_by('pk'):
+            res = AppSerializer(obj, context=context).data
+            fileobj.write(json.dumps(res, cls=JSONEncoder) + '\n')
+    rename_stored_file(tmp_file, target_file, storage=private_storage)
+    return target_file
 
 
 def rm_directory(path):
@@ -379,104 +414,93 @@ def rm_directory(path):
         shutil.rmtree(path)
 
 
-def dump_all_apps_tasks():
+def dump_all_apps_chunks():
     all_pks = (Webapp.objects.visible()
                              .values_list('pk', flat=True)
                              .order_by('pk'))
-    return [dump_apps.si(pks) for pks in chunked(all_pks, 100)]
+    return list(chunked(all_pks, 100))
 
 
 @task
-def export_data(name=None):
+def export_data(name=None, resume=False):
     today = datetime.datetime.today().strftime('%Y-%m-%d')
     if name is None:
         name = today
 
-    # Clean up the path where we'll store the individual json files from each
-    # app dump (which are in apps/ inside DUMPED_APPS_PATH).
-    path_to_cleanup = os.path.join(settings.DUMPED_APPS_PATH, 'apps')
-    task_log.info('Cleaning up path {0}'.format(settings.DUMPED_APPS_PATH))
-    try:
-        for dirpath, dirnames, filenames in walk_storage(
-                path_to_cleanup, storage=private_storage):
-            for filename in filenames:
-                private_storage.delete(os.path.join(dirpath, filename))
-    except OSError:
-        # Ignore if the directory does not exist.
-        pass
-
-    # Run all dump_apps task in parallel, and once it's done, add extra files
-    # and run compression.
-    chord(dump_all_apps_tasks(),
-          compress_export.si(tarball_name=name, date=today)).apply_async()
-
-
-def compile_extra_files(target_directory, date):
-    # Put some .txt files in place. This is done locally only, it's only useful
-    # before the tar command is run.
-    context = Context({'date': date, 'url': settings.SITE_URL})
-    extra_filenames = ['license.txt', 'readme.txt']
-    for extra_filename in extra_filenames:
-        template = loader.get_template('webapps/dump/apps/%s' % extra_filename)
-        dst = os.path.join(target_directory, extra_filename)
-        with local_storage.open(dst, 'w') as fd:
-            fd.write(template.render(context))
-    return extra_filenames
+    # Clean up the chunk files left by a previous dump, unless we are resuming
+    # it, in which case the chunks already written are reused.
+    if not resume:
+        path_to_cleanup = os.path.join(settings.DUMPED_APPS_PATH, 'chunks')
+        task_log.info('Cleaning up path {0}'.format(path_to_cleanup))
+        try:
+            for dirpath, dirnames, filenames in walk_storage(
+                    path_to_cleanup, storage=private_storage):
+                for filename in filenames:
+                    private_storage.delete(os.path.join(dirpath, filename))
+        except OSError:
+            # Ignore if the directory does not exist.
+            pass
+
+    # Run all dump_apps task in parallel, and once it's done, stream the
+    # chunks into the tarball.
+    chunks = dump_all_apps_chunks()
+    chord([dump_apps.si(pks, resume=resume) for pks in chunks],
+          compress_export.si(
+              tarball_name=name, date=today,
+              chunk_files=[_dump_chunk_path(pks) for pks in chunks])
+          ).apply_async()
+
+
+def _add_to_tarball(tarball, name, content):
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    info.mtime = time.time()
+    tarball.addfile(info, StringIO(content))
 
 
 @task
-def compress_export(tarball_name, date):
-    # We need a temporary directory on the local filesystem that will contain
-    # all files in order to call `tar`.
-    local_source_dir = tempfile.mkdtemp()
-
-    apps_dirpath = os.path.join(settings.DUMPED_APPS_PATH, 'apps')
-
-    # In case apps_dirpath is empty, add a dummy file to make the apps
-    # directory in the tar archive non-empty. It should not happen in prod, but
-    # it's nice to have it to prevent the task from failing entirely.
-    with private_storage.open(
-            os.path.join(apps_dirpath, '0', '.keep'), 'w') as fd:
-        fd.write('.')
-
-    # Now, copy content from private_storage to that temp directory. We don't
-    # need to worry about creating the directories locally, the storage class
-    # does that for us.
-    for dirpath, dirnames, filenames in walk_storage(
-            apps_dirpath, storage=private_storage):
-        for filename in filenames:
-            src_path = os.path.join(dirpath, filename)
-            dst_path = os.path.join(
-                local_source_dir, 'apps', os.path.basename(dirpath), filename)
-            copy_stored_file(
-                src_path, dst_path, src_storage=private_storage,
-                dst_storage=local_storage)
-
-    # Also add extra files to the temp directory.
-    extra_filenames = compile_extra_files(local_source_dir, date)
-
-    # All our files are now present locally, let's generate a local filename
-    # that will contain the final '.tar.gz' before it's copied over to
-    # public storage.
-    local_target_file = tempfile.NamedTemporaryFile(
-        suffix='.tgz', prefix='dumped-apps-')
-
-    # tar ALL the things!
-    cmd = ['tar', 'czf', local_target_file.name, '-C',
-           local_source_dir] + ['apps'] + extra_filenames
-    task_log.info(u'Creating dump {0}'.format(local_target_file.name))
-    subprocess.call(cmd)
+def compress_export(tarball_name, date, chunk_files=()):
+    """
+    Writes the chunks dumped by dump_apps and the extra files straight into a
+    gzipped tar stream in public storage, one apps/<id / 1000>/<id>.json file
+    per app.
 
-    # Now copy the local tgz to the public storage.
+    The stream goes to a temporary file, renamed to the final name once the
+    tarball is complete, so that a failed export never replaces a good one.
+    """
     remote_target_filename = os.path.join(
         settings.DUMPED_APPS_PATH, 'tarballs', '%s.tgz' % tarball_name)
-    copy_stored_file(local_target_file.name, remote_target_filename,
-                     src_storage=local_storage,
-                     dst_storage=public_storage)
-
-    # Clean-up.
-    local_target_file.close()
-    rm_directory(local_source_dir)
+    tmp_target_filename = remote_target_filename + '.tmp'
+    task_log.info(u'Creating dump {0}'.format(remote_target_filename))
+
+    with public_storage.open(tmp_target_filename, 'wb') as fileobj:
+        tarball = tarfile.open(fileobj=fileobj, mode='w|gz')
+        # Always add the apps directory, even if there are no apps to dump.
+        # It should not happen in prod, but it's nice to have it to prevent
+        # consumers from failing entirely.
+        info = tarfile.TarInfo('apps')
+        info.type = tarfile.DIRTYPE
+        info.mode = 0755
+        info.mtime = time.time()
+        tarball.addfile(info)
+
+        for chunk_file in chunk_files:
+            with private_storage.open(chunk_file) as fd:
+                for line in fd:
+                    app_id = json.loads(line)['id']
+                    _add_to_tarball(tarball, _dump_app_path(app_id),
+                                    line.rstrip('\n'))
+
+        context = Context({'date': date, 'url': settings.SITE_URL})
+        for extra_filename in ['license.txt', 'readme.txt']:
+            template = loader.get_template(
+                'webapps/dump/apps/%s' % extra_filename)
+            _add_to_tarball(tarball, extra_filename,
+                            template.render(context).encode('utf-8'))
+        tarball.close()
+
+    rename_stored_file(tmp_target_filename, remote_target_filename,
+                       storage=public_storage)
     return remote_target_filename
 
 
@@ -638,5 +662,6 @@ def set_storefront_data(app_id, disable=False, **kw):
 def delete_logs(items, **kw):
     task_log.info('[%s@%s] Deleting logs'
                   % (len(items), delete_logs.rate_limit))
+    # Deleting goes through the instances, don't resolve their arguments.
     ActivityLog.objects.filter(pk__in=items).exclude(
-        action__in=mkt.LOG_KEEP).delete()
+        action__in=mkt.LOG_KEEP).no_transforms().delete()
@@ -19,8 +19,10 @@ from mkt.site.storage_utils import private_storage, public_storage
 from mkt.users.models import UserProfile
 from mkt.versions.models import Version
 from mkt.webapps import cron
-from mkt.webapps.cron import (_get_installs, _get_trending, clean_old_signed,
-                              mkt_gc, update_app_installs, update_app_trending)
+from mkt.webapps.cron import (_get_installs, _get_installs_for_apps,
+                              _get_trending, _get_trending_for_apps,
+                              clean_old_signed, mkt_gc, update_app_installs,
+                              update_app_trending)
 from mkt.webapps.models import Installs, Trending, Webapp
 
 
@@ -267,9 +269,9 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
     def setUp(self):
         self.app = Webapp.objects.create(status=mkt.STATUS_PUBLIC)
 
-    @mock.patch('mkt.webapps.cron._get_installs')
+    @mock.patch('mkt.webapps.cron._get_installs_for_apps')
     def test_installs_saved(self, _mock):
-        _mock.return_value = {'all': 12.0}
+        _mock.return_value = {self.app.id: {'all': 12.0}}
         update_app_installs()
 
         eq_(get_popularity(self.app), 12.0)
@@ -280,7 +282,7 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
                 eq_(get_popularity(self.app, region=region), 0.0)
 
         # Test running again updates the values as we'd expect.
-        _mock.return_value = {'all': 2.0}
+        _mock.return_value = {self.app.id: {'all': 2.0}}
         update_app_installs()
         eq_(get_popularity(self.app), 2.0)
         for region in mkt.regions.REGIONS_DICT.values():
@@ -289,11 +291,11 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
             else:
                 eq_(get_popularity(self.app, region=region), 0.0)
 
-    @mock.patch('mkt.webapps.cron._get_installs')
+    @mock.patch('mkt.webapps.cron._get_installs_for_apps')
     def test_installs_deleted(self, _mock):
         self.app.trending.get_or_create(region=0, value=12.0)
 
-        _mock.return_value = {'all': 0.0}
+        _mock.return_value = {self.app.id: {'all': 0.0}}
         update_app_installs()
 
         with self.assertRaises(Installs.DoesNotExist):
@@ -328,15 +330,91 @@ class TestUpdateInstalls(mkt.site.tests.TestCase):
 
         eq_(_get_installs(self.app.id), {})
 
+    @mock.patch('mkt.webapps.cron._get_installs_for_apps')
+    def test_installs_saved_in_bulk(self, _mock):
+        app2 = Webapp.objects.create(status=mkt.STATUS_PUBLIC)
+        self.app.popularity.create(region=0, value=1.0)
+        self.app.popularity.create(region=mkt.regions.BRA.id, value=5.0)
+        _mock.return_value = {
+            self.app.id: {'all': 12.0, 'br': 5.0},
+            app2.id: {'all': 3.0},
+        }
+        update_app_installs()
+        eq_(_mock.call_count, 1)
+        eq_(sorted(_mock.call_args[0][0]), sorted([self.app.id, app2.id]))
+        eq_(get_popularity(self.app), 12.0)
+        eq_(get_popularity(self.app, region=mkt.regions.BRA), 5.0)
+        eq_(get_popularity(app2), 3.0)
+
+    def test_changed_scores_updated_in_bulk(self):
+        apps = [self.app] + [Webapp.objects.create(status=mkt.STATUS_PUBLIC)
+                             for i in range(2)]
+        for app in apps:
+            app.popularity.create(region=0, value=1.0)
+        scores = dict((app.id, {'all': float(app.id)}) for app in apps)
+        ids = [app.id for app in apps]
+        # One query to fetch the existing rows, one to update them.
+        with self.assertNumQueries(2):
+            cron._save_scores(Installs, ids, scores, datetime.now())
+        for app in apps:
+            eq_(app.popularity.get(region=0).value, float(app.id))
+
+    @mock.patch('mkt.webapps.cron.get_monolith_client')
+    def test_get_installs_for_apps(self, _mock):
+        client = mock.Mock()
+        client.raw.return_value = {
+            'aggregations': {
+                'app': {
+                    'buckets': [
+                        {
+                            'key': self.app.id,
+                            'popular': {'total_installs': {'value': 123}},
+                            'region': {
+                                'buckets': [
+                                    {
+                                        'key': 'br',
+                                        'popular': {
+                                            'total_installs': {'value': 12}
+                                        }
+                                    }
+                                ]
+                            }
+                        },
+                        {
+                            'key': 42,
+                            'popular': {'total_installs': {'value': 1}},
+                        }
+                    ]
+                }
+            }
+        }
+        _mock.return_value = client
+
+        eq_(_get_installs_for_apps([self.app.id, 42, 43]),
+            {self.app.id: {'all': 123.0, 'br': 12.0}, 42: {'all': 1.0}})
+        eq_(client.raw.call_count, 1)
+        query = client.raw.call_args[0][0]
+        eq_(query['query']['filtered']['filter'],
+            {'terms': {'app-id': [self.app.id, 42, 43]}})
+        eq_(query['aggregations']['app']['terms']['size'], 3)
+
+    @mock.patch('mkt.webapps.cron.get_monolith_client')
+    def test_get_installs_for_apps_error(self, _mock):
+        client = mock.Mock()
+        client.raw.side_effect = ValueError
+        _mock.return_value = client
+
+        eq_(_get_installs_for_apps([self.app.id]), {})
+
 
 class TestUpdateTrending(mkt.site.tests.TestCase):
 
     def setUp(self):
         self.app = Webapp.objects.create(status=mkt.STATUS_PUBLIC)
 
-    @mock.patch('mkt.webapps.cron._get_trending')
+    @mock.patch('mkt.webapps.cron._get_trending_for_apps')
     def test_trending_saved(self, _mock):
-        _mock.return_value = {'all': 12.0}
+        _mock.return_value = {self.app.id: {'all': 12.0}}
         update_app_trending()
 
         eq_(get_trending(self.app), 12.0)
@@ -347,7 +425,7 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
                 eq_(get_trending(self.app, region=region), 0.0)
 
         # Test running again updates the values as we'd expect.
-        _mock.return_value = {'all': 2.0}
+        _mock.return_value = {self.app.id: {'all': 2.0}}
         update_app_trending()
         eq_(get_trending(self.app), 2.0)
         for region in mkt.regions.REGIONS_DICT.values():
@@ -356,11 +434,11 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
             else:
                 eq_(get_trending(self.app, region=region), 0.0)
 
-    @mock.patch('mkt.webapps.cron._get_trending')
+    @mock.patch('mkt.webapps.cron._get_trending_for_apps')
     def test_trending_deleted(self, _mock):
         self.app.trending.get_or_create(region=0, value=12.0)
 
-        _mock.return_value = {'all': 0.0}
+        _mock.return_value = {self.app.id: {'all': 0.0}}
         update_app_trending()
 
         with self.assertRaises(Trending.DoesNotExist):
@@ -475,3 +553,24 @@ class TestUpdateTrending(mkt.site.tests.TestCase):
         _mock.return_value = client
 
         eq_(_get_trending(self.app.id), {})
+
+    @mock.patch('mkt.webapps.cron.get_monolith_client')
+    def test_get_trending_for_apps(self, _mock):
+        client = mock.Mock()
+        trending = self._return_value_with_regions(102, 102, 255, 102)
+        not_trending = self._return_value(99, 2)
+        trending['aggregations']['key'] = self.app.id
+        not_trending['aggregations']['key'] = 42
+        client.raw.return_value = {
+            'aggregations': {
+                'app': {
+                    'buckets': [trending['aggregations'],
+                                not_trending['aggregations']]
+                }
+            }
+        }
+        _mock.return_value = client
+
+        eq_(_get_trending_for_apps([self.app.id, 42]),
+            {self.app.id: {'all': 2.0, 'br': 6.5}, 42: {}})
+        eq_(client.raw.call_count, 1)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 
 import json
 import mock
@@ -92,6 +93,26 @@ class TestWebappIndexer(TestCase):
         eq_(doc['latest_version']['has_editor_comment'], False)
         eq_(doc['latest_version']['has_info_request'], False)
 
+    def test_extract_documents(self):
+        app2 = app_factory()
+        obj, doc = self._get_doc()
+        docs = WebappIndexer.extract_documents(
+            Webapp.objects.filter(pk__in=[self.app.pk, app2.pk]))
+        eq_(sorted(d['id'] for d in docs), sorted([self.app.pk, app2.pk]))
+        eq_([d for d in docs if d['id'] == self.app.pk][0], doc)
+
+    def test_extract_documents_num_queries(self):
+        def count_queries(ids):
+            qs = Webapp.objects.filter(pk__in=ids)
+            with CaptureQueriesContext(connection) as context:
+                WebappIndexer.extract_documents(qs)
+            return len(context.captured_queries)
+
+        app2 = app_factory()
+        app3 = app_factory()
+        eq_(count_queries([self.app.pk]),
+            count_queries([self.app.pk, app2.pk, app3.pk]))
+
     def test_extract_category(self):
         self.app.update(categories=['books'])
         obj, doc = self._get_doc()
@@ -40,6 +40,7 @@ from mkt.files.models import File
 from mkt.files.tests.test_models import UploadTest as BaseUploadTest
 from mkt.files.utils import WebAppParser
 from mkt.prices.models import AddonPremium, Price, PriceCurrency
+from mkt.regions.utils import decode_region_bitmap
 from mkt.reviewers.models import EscalationQueue, QUEUE_TARAKO, RereviewQueue
 from mkt.site.fixtures import fixture
 from mkt.site.helpers import absolutify
@@ -272,7 +273,7 @@ class TestWebapp(WebappTestCase):
         app = Webapp()
         eq_(app.guess_is_offline(), False)
 
-    @mock.patch('mkt.webapps.models.cache.get')
+    @mock.patch('django.core.cache.cache.get')
     def test_is_offline_when_packaged(self, mock_get):
         mock_get.return_value = ''
         eq_(Webapp(is_packaged=True).guess_is_offline(), True)
@@ -1518,6 +1519,56 @@ class TestExclusions(TestCase):
         ok_(mkt.regions.BRA.id in excluded)
         ok_(mkt.regions.DEU.id in excluded)
 
+    def get_bitmap(self):
+        return Webapp.objects.get(pk=self.app.pk).excluded_regions_bitmap
+
+    def test_bitmap_excluded_region(self):
+        eq_(decode_region_bitmap(self.get_bitmap()),
+            self.app.get_excluded_region_ids())
+        self.app.addonexcludedregion.get(region=mkt.regions.USA.id).delete()
+        self.app.update(premium_type=mkt.ADDON_FREE)
+        eq_(self.get_bitmap(), '')
+
+    def test_bitmap_geodata(self):
+        self.app.update(premium_type=mkt.ADDON_FREE)
+        self.geodata.update(region_de_usk_exclude=True)
+        eq_(decode_region_bitmap(self.get_bitmap()),
+            sorted([mkt.regions.DEU.id, mkt.regions.USA.id]))
+
+    def test_bitmap_premium(self):
+        self.make_tier()
+        eq_(decode_region_bitmap(self.get_bitmap()),
+            self.app.get_excluded_region_ids())
+        ok_(mkt.regions.NIC.id not in self.app.get_excluded_region_ids())
+
+    def test_bitmap_price_currency(self):
+        self.make_tier()
+        self.row.update(paid=False)
+        ok_(mkt.regions.NIC.id in decode_region_bitmap(self.get_bitmap()))
+
+    def test_bitmap_unpriced_still_available(self):
+        self.make_tier()
+        self.row.update(paid=False)
+        bitmap = self.get_bitmap()
+        eq_(decode_region_bitmap(bitmap, flags='1'), [mkt.regions.USA.id])
+        ok_(mkt.regions.NIC.id in decode_region_bitmap(bitmap))
+        # The API only hides apps excluded from the region, not unpriced ones.
+        eq_(list(Webapp.objects.available_in_region(mkt.regions.NIC)),
+            [self.app])
+        eq_(list(Webapp.objects.available_in_region(mkt.regions.USA)), [])
+
+    def test_precomputed(self):
+        app = Webapp.objects.get(pk=self.app.pk)
+        app.get_excluded_region_ids = mock.Mock()
+        eq_(app.get_precomputed_excluded_region_ids(),
+            decode_region_bitmap(self.get_bitmap()))
+        assert not app.get_excluded_region_ids.called
+
+    def test_precomputed_fallback(self):
+        self.app.update(excluded_regions_bitmap=None, _signal=False)
+        eq_(self.app.get_precomputed_excluded_region_ids(),
+            self.app.get_excluded_region_ids())
+
 
 class TestPackagedAppManifestUpdates(mkt.site.tests.TestCase):
     # Note: More extensive tests for `.update_names` are above.
@@ -1621,6 +1672,30 @@ class TestWebappManager(TestCase):
         eq_(Webapp.objects.count(), 2)
         eq_(list(Webapp.objects.rated()), [rated])
 
+    def test_available_in_region(self):
+        app = app_factory()
+        excluded = app_factory()
+        excluded.addonexcludedregion.create(region=mkt.regions.BRA.id)
+        eq_(list(Webapp.objects.available_in_region(mkt.regions.BRA)),
+            [app])
+        self.assertSetEqual(
+            Webapp.objects.available_in_region(mkt.regions.USA),
+            [app, excluded])
+
+    def test_available_in_region_not_computed(self):
+        app = app_factory()
+        excluded = app_factory()
+        excluded.addonexcludedregion.create(region=mkt.regions.BRA.id)
+        geodata_excluded = app_factory()
+        geodata_excluded.geodata.update(region_de_usk_exclude=True)
+        Webapp.objects.update(excluded_regions_bitmap=None)
+        self.assertSetEqual(
+            Webapp.objects.available_in_region(mkt.regions.BRA),
+            [app, geodata_excluded])
+        self.assertSetEqual(
+            Webapp.objects.available_in_region(mkt.regions.DEU),
+            [app, excluded])
+
 
 class TestManifest(BaseWebAppTest):
 
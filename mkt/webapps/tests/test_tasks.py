@@ -29,7 +29,7 @@ from mkt.users.models import UserProfile
 from mkt.versions.models import Version
 from mkt.webapps.cron import dump_user_installs_cron
 from mkt.webapps.models import AddonUser, Webapp
-from mkt.webapps.tasks import (dump_app, export_data,
+from mkt.webapps.tasks import (compress_export, dump_apps, export_data,
                                notify_developers_of_failure, pre_generate_apk,
                                PreGenAPKError, rm_directory, update_manifests)
 
@@ -513,16 +513,6 @@ class TestUpdateManifest(mkt.site.tests.TestCase):
         ok_(_iarc.called)
 
 
-class TestDumpApps(mkt.site.tests.TestCase):
-    fixtures = fixture('webapp_337141')
-
-    def test_dump_app(self):
-        path = dump_app(337141)
-        with private_storage.open(path, 'r') as fd:
-            result = json.load(fd)
-        eq_(result['id'], 337141)
-
-
 class TestDumpUserInstalls(mkt.site.tests.TestCase):
     fixtures = fixture('user_2519', 'webapp_337141')
 
@@ -658,9 +648,9 @@ class TestExportData(mkt.site.tests.TestCase):
             self.tarfile_file.close()
         super(TestExportData, self).tearDown()
 
-    def create_export(self, name):
+    def create_export(self, name, resume=False):
         with self.settings(DUMPED_APPS_PATH=self.export_directory):
-            export_data(name=name)
+            export_data(name=name, resume=resume)
         tarball_path = os.path.join(self.export_directory,
                                     'tarballs',
                                     name + '.tgz')
@@ -682,27 +672,77 @@ class TestExportData(mkt.site.tests.TestCase):
         # Make sure we didn't touch old tarballs by accident.
         assert public_storage.exists(self.existing_tarball)
 
-    @mock.patch('mkt.webapps.tasks.dump_app')
-    def test_not_public(self, dump_app):
+    @mock.patch('mkt.site.storage_utils.shutil.copyfileobj')
+    def test_export_renamed_in_place(self, copyfileobj):
+        self.create_export('tarball-name')
+        # The chunks and the tarball are renamed, not copied back.
+        ok_(not copyfileobj.called)
+        tarball_path = os.path.join(self.export_directory, 'tarballs',
+                                    'tarball-name.tgz')
+        ok_(not public_storage.exists(tarball_path + '.tmp'))
+
+    def test_not_public(self):
         app = Webapp.objects.get(pk=337141)
         app.update(status=mkt.STATUS_PENDING)
-        self.create_export('tarball-name')
-        assert not dump_app.called
+        tarball = self.create_export('tarball-name')
+        assert self.app_path not in tarball.getnames()
+        assert 'apps' in tarball.getnames()
 
     def test_removed(self):
         # At least one public app must exist for dump_apps to run.
         app_factory(name='second app', status=mkt.STATUS_PUBLIC)
-        app_path = os.path.join(self.export_directory, self.app_path)
         app = Webapp.objects.get(pk=337141)
         app.update(status=mkt.STATUS_PUBLIC)
-        self.create_export('tarball-name')
-        assert private_storage.exists(app_path)
+        tarball = self.create_export('tarball-name')
+        assert self.app_path in tarball.getnames()
 
         app.update(status=mkt.STATUS_PENDING)
-        self.create_export('tarball-name')
-        assert not private_storage.exists(app_path)
+        tarball = self.create_export('tarball-name')
+        assert self.app_path not in tarball.getnames()
 
-    @mock.patch('mkt.webapps.tasks.dump_app')
-    def test_public(self, dump_app):
-        self.create_export('tarball-name')
-        assert dump_app.called
+    def test_app_content(self):
+        tarball = self.create_export('tarball-name')
+        result = json.load(tarball.extractfile(self.app_path))
+        eq_(result['id'], 337141)
+
+    def test_failed_export_keeps_tarball(self):
+        tarball_path = os.path.join(self.export_directory, 'tarballs',
+                                    'tarball-name.tgz')
+        with public_storage.open(tarball_path, 'w') as fd:
+            fd.write('good')
+        with mock.patch('mkt.webapps.tasks.loader.get_template') as get:
+            get.side_effect = ValueError
+            with self.settings(DUMPED_APPS_PATH=self.export_directory):
+                with self.assertRaises(ValueError):
+                    compress_export(tarball_name='tarball-name',
+                                    date='2004-08-15')
+        with public_storage.open(tarball_path) as fd:
+            eq_(fd.read(), 'good')
+
+    def test_resume(self):
+        with self.settings(DUMPED_APPS_PATH=self.export_directory):
+            chunk_file = dump_apps([337141])
+        with private_storage.open(chunk_file, 'w') as fd:
+            fd.write(json.dumps({'id': 337141, 'name': 'resumed'}) + '\n')
+
+        tarball = self.create_export('tarball-name', resume=True)
+        result = json.load(tarball.extractfile(self.app_path))
+        eq_(result['name'], 'resumed')
+
+        # Without resume the chunk is dumped again.
+        tarball = self.create_export('tarball-name')
+        result = json.load(tarball.extractfile(self.app_path))
+        ok_(result['name'] != 'resumed')
+
+    def test_resume_partial_chunk(self):
+        with self.settings(DUMPED_APPS_PATH=self.export_directory):
+            chunk_file = dump_apps([337141])
+        private_storage.delete(chunk_file)
+        # A dump that died mid-write only leaves its temporary file behind.
+        with private_storage.open(chunk_file + '.tmp', 'w') as fd:
+            fd.write('{"id": 3371')
+
+        tarball = self.create_export('tarball-name', resume=True)
+        result = json.load(tarball.extractfile(self.app_path))
+        eq_(result['id'], 337141)
+        ok_(not private_storage.exists(chunk_file + '.tmp'))
@@ -21,7 +21,7 @@ from mkt.developers.forms import AppFormMedia, IARCGetAppInfoForm
 from mkt.files.models import FileUpload
 from mkt.regions import get_region
 from mkt.submit.views import PreviewViewSet
-from mkt.webapps.models import AddonUser, get_excluded_in, Webapp
+from mkt.webapps.models import AddonUser, Webapp
 from mkt.webapps.serializers import AppSerializer
 
 
@@ -40,8 +40,7 @@ class AppViewSet(CORSMixin, SlugOrIdMixin, MarketplaceView,
                               RestAnonymousAuthentication]
 
     def get_queryset(self):
-        return Webapp.objects.all().exclude(
-            id__in=get_excluded_in(get_region().id))
+        return Webapp.objects.available_in_region(get_region())
 
     def get_base_queryset(self):
         return Webapp.objects.all()
@@ -1,5 +1,7 @@
 import calendar
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
 import sys
 from time import gmtime, time
@@ -8,12 +10,14 @@ from wsgiref.handlers import format_date_time
 
 import jwt
 from browserid.errors import ExpiredSignatureError
+from browserid.utils import unbundle_certs_and_assertion
+from django.core.cache import cache
 from django_statsd.clients import statsd
 from receipts import certs
 
 from lib.cef_loggers import receipt_cef
-from lib.crypto.receipt import sign
-from lib.utils import static_url
+from lib.crypto.receipt import sign, sign_many
+from lib.utils import purchase_cache_key, static_url
 
 from services.utils import settings
 
@@ -30,11 +34,78 @@ import receipts  # noqa
 status_codes = {
     200: '200 OK',
     204: '204 OK',
+    400: '400 Bad Request',
     405: '405 Method Not Allowed',
     500: '500 Internal Server Error',
 }
 
 
+# Keys and verifiers are expensive to create, so each process keeps them for
+# settings.WEBAPPS_RECEIPT_VERIFIER_TIMEOUT seconds, as (value, loaded_at)
+# pairs: keys by path and verifiers by issuer. The verifiers keep the
+# certificates of the issuers they fetched, so rebuilding them picks up a
+# rotated or revoked issuer certificate.
+_keys = {}
+_verifiers = {}
+
+# Receipts sent to <verify path>batch/ are verified together.
+BATCH_PATH = 'batch/'
+BATCH_MAX_RECEIPTS = 50
+
+
+class PurchaseCache(object):
+    """
+    Caches the purchase rows looked up by the checks, in each process for
+    settings.WEBAPPS_RECEIPT_PURCHASE_LOCAL_CACHE_TIMEOUT seconds and in
+    memcached for settings.WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT seconds.
+
+    Only found purchases are cached, so new purchases are seen right away.
+    The marketplace removes purchases from memcached when they change, see
+    mkt.prices.models.
+    """
+
+    def __init__(self):
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, kind, *ids):
+        if not settings.WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT:
+            return None
+        key = purchase_cache_key(kind, *ids)
+        with self.lock:
+            expires, row = self.local.pop(key, (0, None))
+            if expires > time():
+                self.local[key] = (expires, row)
+                statsd.incr('services.verify.purchase_cache.local_hit')
+                return row
+        row = cache.get(key)
+        if row is not None:
+            statsd.incr('services.verify.purchase_cache.hit')
+            self.set_local(key, row)
+        return row
+
+    def set(self, row, kind, *ids):
+        timeout = settings.WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT
+        if not timeout:
+            return
+        key = purchase_cache_key(kind, *ids)
+        cache.set(key, tuple(row), timeout)
+        self.set_local(key, tuple(row))
+
+    def set_local(self, key, row):
+        timeout = settings.WEBAPPS_RECEIPT_PURCHASE_LOCAL_CACHE_TIMEOUT
+        expires = time() + timeout
+        with self.lock:
+            self.local.pop(key, None)
+            self.local[key] = (expires, row)
+            if (len(self.local) >
+                    settings.WEBAPPS_RECEIPT_PURCHASE_LOCAL_CACHE_SIZE):
+                self.local.popitem(last=False)
+
+
+purchase_cache = PurchaseCache()
+
+
 class VerificationError(Exception):
     pass
 
@@ -60,16 +131,41 @@ class Verify:
         # This is so the unit tests can override the connection.
         self.conn, self.cursor = None, None
 
+        # Purchases looked up in advance by verify_batch, keyed by (app id,
+        # uuid) and by contribution id, with the rows the checks would get.
+        self.app_purchases, self.inapp_purchases = None, None
+
+        # When set by verify_batch, expired receipts are queued there as
+        # (result, receipt data) to be signed together.
+        self.signing_queue = None
+
     def check_full(self):
         """
         This is the default that verify will use, this will
         do the entire stack of checks.
         """
+        try:
+            self.check_receipt()
+        except InvalidReceipt, err:
+            return self.invalid(str(err))
+
+        return self.check_full_purchase()
+
+    def check_receipt(self):
+        """
+        Decodes the receipt and does the checks of check_full that don't
+        need the database.
+        """
         receipt_domain = urlparse(static_url('WEBAPPS_RECEIPT_URL')).netloc
+        self.decoded = self.decode()
+        self.check_type('purchase-receipt')
+        self.check_url(receipt_domain)
+
+    def check_full_purchase(self):
+        """
+        The rest of check_full, once check_receipt passed.
+        """
         try:
-            self.decoded = self.decode()
-            self.check_type('purchase-receipt')
-            self.check_url(receipt_domain)
             self.check_purchase()
         except InvalidReceipt, err:
             return self.invalid(str(err))
@@ -240,15 +336,11 @@ class Verify:
         """
         Verifies that the inapp has been purchased.
         """
-        self.setup_db()
-        sql = """SELECT i.guid, c.type FROM stats_contributions c
-                 JOIN inapp_products i ON i.id=c.inapp_product_id
-                 WHERE c.id = %(contribution_id)s LIMIT 1;"""
-        self.cursor.execute(
-            sql,
-            {'contribution_id': self.get_contribution_id()}
-        )
-        result = self.cursor.fetchone()
+        contribution_id = self.get_contribution_id()
+        if self.inapp_purchases is not None:
+            result = self.inapp_purchases.get(contribution_id)
+        else:
+            result = self.get_inapp_purchase(contribution_id)
         if not result:
             log_info('Invalid in-app receipt, no purchase')
             raise InvalidReceipt('NO_PURCHASE')
@@ -257,6 +349,25 @@ class Verify:
         self.check_purchase_type(purchase_type)
         self.check_inapp_product(contribution_inapp_id)
 
+    def get_inapp_purchase(self, contribution_id):
+        """
+        Returns the (inapp guid, type) row of the contribution, or None.
+        """
+        result = purchase_cache.get('inapp', contribution_id)
+        if result is not None:
+            return result
+
+        with statsd.timer('services.verify.db'):
+            self.setup_db()
+            sql = """SELECT i.guid, c.type FROM stats_contributions c
+                     JOIN inapp_products i ON i.id=c.inapp_product_id
+                     WHERE c.id = %(contribution_id)s LIMIT 1;"""
+            self.cursor.execute(sql, {'contribution_id': contribution_id})
+            result = self.cursor.fetchone()
+        if result:
+            purchase_cache.set(result, 'inapp', contribution_id)
+        return result
+
     def check_inapp_product(self, contribution_inapp_id):
         if contribution_inapp_id != self.get_inapp_id():
             log_info('Invalid receipt, inapp_id does not match')
@@ -266,19 +377,36 @@ class Verify:
         """
         Verifies that the app has been purchased by the user.
         """
-        self.setup_db()
-        sql = """SELECT type FROM addon_purchase
-                 WHERE addon_id = %(app_id)s
-                 AND uuid = %(uuid)s LIMIT 1;"""
-        self.cursor.execute(sql, {'app_id': self.get_app_id(),
-                                  'uuid': self.get_user()})
-        result = self.cursor.fetchone()
+        app_id, uuid = self.get_app_id(), self.get_user()
+        if self.app_purchases is not None:
+            result = self.app_purchases.get((app_id, uuid))
+        else:
+            result = self.get_app_purchase(app_id, uuid)
         if not result:
             log_info('Invalid app receipt, no purchase')
             raise InvalidReceipt('NO_PURCHASE')
 
         self.check_purchase_type(result[0])
 
+    def get_app_purchase(self, app_id, uuid):
+        """
+        Returns the (type,) row of the purchase of the app, or None.
+        """
+        result = purchase_cache.get('app', app_id, uuid)
+        if result is not None:
+            return result
+
+        with statsd.timer('services.verify.db'):
+            self.setup_db()
+            sql = """SELECT type FROM addon_purchase
+                     WHERE addon_id = %(app_id)s
+                     AND uuid = %(uuid)s LIMIT 1;"""
+            self.cursor.execute(sql, {'app_id': app_id, 'uuid': uuid})
+            result = self.cursor.fetchone()
+        if result:
+            purchase_cache.set(result, 'app', app_id, uuid)
+        return result
+
     def check_purchase_type(self, purchase_type):
         """
         Verifies that the purchase type is of a valid type.
@@ -351,11 +479,130 @@ class Verify:
                 'sign',
                 'Expired signing request'
             )
-            return {'status': 'expired',
-                    'receipt': sign(self.decoded)}
+            if self.signing_queue is not None:
+                result = {'status': 'expired'}
+                self.signing_queue.append((result, self.decoded))
+                return result
+            with statsd.timer('services.verify.sign'):
+                receipt = sign(self.decoded)
+            return {'status': 'expired', 'receipt': receipt}
         return {'status': 'expired'}
 
 
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def fetch_app_purchases(cursor, keys):
+    """
+    Looks up the purchases of the (app id, uuid) pairs in `keys` with a
+    single query. Returns a dict of (app id, uuid) to a (type,) row.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    app_ids = sorted(set(app_id for app_id, uuid in keys))
+    uuids = sorted(set(uuid for app_id, uuid in keys))
+    sql = """SELECT addon_id, uuid, type FROM addon_purchase
+             WHERE addon_id IN (%s) AND uuid IN (%s);""" % (
+        _placeholders(app_ids), _placeholders(uuids))
+    cursor.execute(sql, app_ids + uuids)
+    purchases = {}
+    for app_id, uuid, purchase_type in cursor.fetchall():
+        if (app_id, uuid) in keys:
+            purchases.setdefault((app_id, uuid), (purchase_type,))
+    return purchases
+
+
+def fetch_inapp_purchases(cursor, contribution_ids):
+    """
+    Looks up the in-app purchases of `contribution_ids` with a single query.
+    Returns a dict of contribution id to an (inapp guid, type) row.
+    """
+    contribution_ids = sorted(set(contribution_ids))
+    if not contribution_ids:
+        return {}
+    sql = """SELECT c.id, i.guid, c.type FROM stats_contributions c
+             JOIN inapp_products i ON i.id=c.inapp_product_id
+             WHERE c.id IN (%s);""" % _placeholders(contribution_ids)
+    cursor.execute(sql, contribution_ids)
+    return dict((contribution_id, (guid, purchase_type))
+                for contribution_id, guid, purchase_type in cursor.fetchall())
+
+
+def verify_batch(receipt_list, environ, cursor=None):
+    """
+    Does check_full on each of `receipt_list`, looking up all their purchases
+    with one query per table. Returns the results in the same order.
+    """
+    verifiers = [Verify(receipt, environ) for receipt in receipt_list]
+    results = [None] * len(verifiers)
+    app_keys, contribution_ids = [], []
+    for i, verifier in enumerate(verifiers):
+        try:
+            verifier.check_receipt()
+        except InvalidReceipt, err:
+            results[i] = verifier.invalid(str(err))
+            continue
+        try:
+            if 'contrib' in verifier.get_storedata():
+                contribution_ids.append(verifier.get_contribution_id())
+            else:
+                app_keys.append((verifier.get_app_id(), verifier.get_user()))
+        except InvalidReceipt:
+            # check_full_purchase will fail the same way below.
+            pass
+
+    app_purchases, inapp_purchases = {}, {}
+    for key in app_keys:
+        row = purchase_cache.get('app', *key)
+        if row is not None:
+            app_purchases[key] = row
+    for contribution_id in contribution_ids:
+        row = purchase_cache.get('inapp', contribution_id)
+        if row is not None:
+            inapp_purchases[contribution_id] = row
+    app_keys = [key for key in app_keys if key not in app_purchases]
+    contribution_ids = [contribution_id for contribution_id in contribution_ids
+                        if contribution_id not in inapp_purchases]
+
+    if app_keys or contribution_ids:
+        with statsd.timer('services.verify.db'):
+            conn = None
+            if cursor is None:
+                conn = mypool.connect()
+                cursor = conn.cursor()
+            try:
+                fetched_app = fetch_app_purchases(cursor, app_keys)
+                fetched_inapp = fetch_inapp_purchases(cursor,
+                                                      contribution_ids)
+            finally:
+                if conn is not None:
+                    # Give the connection back to the pool.
+                    conn.close()
+        for key, row in fetched_app.items():
+            purchase_cache.set(row, 'app', *key)
+        for contribution_id, row in fetched_inapp.items():
+            purchase_cache.set(row, 'inapp', contribution_id)
+        app_purchases.update(fetched_app)
+        inapp_purchases.update(fetched_inapp)
+
+    signing_queue = []
+    for i, verifier in enumerate(verifiers):
+        if results[i] is None:
+            verifier.app_purchases = app_purchases
+            verifier.inapp_purchases = inapp_purchases
+            verifier.signing_queue = signing_queue
+            results[i] = verifier.check_full_purchase()
+
+    if signing_queue:
+        with statsd.timer('services.verify.sign'):
+            signed = sign_many([data for result, data in signing_queue])
+        for (result, data), receipt in zip(signing_queue, signed):
+            result['receipt'] = receipt
+    return results
+
+
 def get_headers(length):
     return [('Access-Control-Allow-Origin', '*'),
             ('Access-Control-Allow-Methods', 'POST'),
@@ -366,6 +613,59 @@ def get_headers(length):
             ('Last-Modified', format_date_time(time()))]
 
 
+def _get_loaded(loaded, key, load):
+    """
+    Returns the value cached under `key` in `loaded`, calling `load` to
+    (re)create it when missing or older than the verifier timeout.
+    """
+    now = time()
+    value, loaded_at = loaded.get(key, (None, 0))
+    if (value is None or
+            now - loaded_at >= settings.WEBAPPS_RECEIPT_VERIFIER_TIMEOUT):
+        value = load()
+        loaded[key] = (value, now)
+    return value
+
+
+def get_receipt_key(path):
+    """
+    Returns the private key at `path`, loading it at most once per verifier
+    timeout.
+    """
+    return _get_loaded(_keys, path, lambda: jwt.rsa_load(path))
+
+
+def get_receipt_issuer(receipt):
+    """
+    Returns the issuer of the root certificate of `receipt` if it is one of
+    the valid issuers, None otherwise.
+    """
+    try:
+        certificates = unbundle_certs_and_assertion(receipt)[0]
+        issuer = certs.parse_jwt(certificates[0]).payload.get('iss')
+    except (IndexError, KeyError, ValueError):
+        # The verifier reports malformed receipts.
+        return None
+    valid_issuers = settings.SIGNING_VALID_ISSUERS
+    if isinstance(issuer, basestring) and (
+            issuer in valid_issuers or
+            urlparse(issuer).netloc in valid_issuers):
+        return issuer
+    return None
+
+
+def get_receipt_verifier(issuer):
+    """
+    Returns the receipt verifier for receipts from `issuer`, creating it at
+    most once per verifier timeout so that the certificates it fetched are
+    reused, but not forever. Invalid issuers share the None verifier, which
+    rejects them.
+    """
+    return _get_loaded(
+        _verifiers, issuer, lambda: certs.ReceiptVerifier(
+            valid_issuers=settings.SIGNING_VALID_ISSUERS))
+
+
 def decode_receipt(receipt):
     """
     Cracks the receipt using the private key. This will probably change
@@ -373,8 +673,7 @@ def decode_receipt(receipt):
     """
     with statsd.timer('services.decode'):
         if settings.SIGNING_SERVER_ACTIVE:
-            verifier = certs.ReceiptVerifier(
-                valid_issuers=settings.SIGNING_VALID_ISSUERS)
+            verifier = get_receipt_verifier(get_receipt_issuer(receipt))
             try:
                 result = verifier.verify(receipt)
             except ExpiredSignatureError:
@@ -384,7 +683,7 @@ def decode_receipt(receipt):
                 raise VerificationError()
             return jwt.decode(receipt.split('~')[1], verify=False)
         else:
-            key = jwt.rsa_load(settings.WEBAPPS_RECEIPT_KEY)
+            key = get_receipt_key(settings.WEBAPPS_RECEIPT_KEY)
             raw = jwt.decode(receipt, key,
                              algorithms=settings.SUPPORTED_JWT_ALGORITHMS)
     return raw
@@ -421,6 +720,28 @@ def receipt_check(environ):
     return output
 
 
+def receipt_batch_check(environ):
+    with statsd.timer('services.verify_batch'):
+        data = environ['wsgi.input'].read()
+        try:
+            receipt_list = json.loads(data)
+        except ValueError:
+            return 400, ''
+        if (not isinstance(receipt_list, list) or
+                len(receipt_list) > BATCH_MAX_RECEIPTS or
+                not all(isinstance(r, basestring) for r in receipt_list)):
+            return 400, ''
+        # The receipts are checked against the path of the single receipt
+        # verifier.
+        path = environ['PATH_INFO'][:-len(BATCH_PATH)]
+        try:
+            return 200, json.dumps(
+                verify_batch(receipt_list, dict(environ, PATH_INFO=path)))
+        except Exception:
+            log_exception('<none>')
+            return 500, ''
+
+
 def application(environ, start_response):
     body = ''
     path = environ.get('PATH_INFO', '')
@@ -429,7 +750,9 @@ def application(environ, start_response):
     else:
         # Only allow POST per verifier spec but also OPTIONS for CORS.
         method = environ.get('REQUEST_METHOD')
-        if method == 'POST':
+        if method == 'POST' and path.endswith('/' + BATCH_PATH):
+            status, body = receipt_batch_check(environ)
+        elif method == 'POST':
             status, body = receipt_check(environ)
         elif method == 'OPTIONS':
             status = 204
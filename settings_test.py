@@ -58,8 +58,11 @@ ES_DEFAULT_NUM_REPLICAS = 0
 # See the following URL on why we set num_shards to 1 for tests:
 # http://www.elasticsearch.org/guide/en/elasticsearch/guide/current/relevance-is-broken.html
 ES_DEFAULT_NUM_SHARDS = 1
+ES_REINDEXING_CHECK_INTERVAL = 0
+FEED_CACHE_TIMEOUT = 0
 IARC_MOCK = True
 IN_TEST_SUITE = True
+MONOLITH_BUFFER_FLUSH_SIZE = 1
 INSTALLED_APPS += ('mkt.translations.tests.testapp',)
 PASSWORD_HASHERS = (
     'django.contrib.auth.hashers.MD5PasswordHasher',
@@ -67,6 +70,8 @@ PASSWORD_HASHERS = (
 PAYMENT_PROVIDERS = ['bango', 'reference']
 # This is a precaution in case something isn't mocked right.
 PRE_GENERATE_APK_URL = 'http://you-should-never-load-this.com/'
+PRICE_MATRIX_CHECK_INTERVAL = 0
+REVIEWER_QUEUE_STATS_TIMEOUT = 0
 RUN_ES_TESTS = True
 SEND_REAL_EMAIL = True
 SITE_URL = 'http://testserver'
@@ -74,3 +79,4 @@ STATIC_URL = SITE_URL + '/'
 TASK_USER_ID = '4043307'
 TEMPLATE_DEBUG = False
 VIDEO_LIBRARIES = ['lib.video.dummy']
+WEBAPPS_RECEIPT_PURCHASE_CACHE_TIMEOUT = 0